@@ -0,0 +1,305 @@
+import copy
+import curses
+
+import numpy as np
+
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI, InputExhausted
+from game_code.systems.list_menu import choice_keys
+from game_code.world.world_builder import WorldBuilder
+
+
+class LabyrinthEnv:
+    """
+    A reset/step environment around Game for training and evaluating automated players.
+    Actions are a fixed list of indices that are turned into the same key presses a human would make,
+    and observations are compact integer arrays describing the player and the room they are in.
+    """
+    DIRECTIONS = ("north", "south", "east", "west")
+    FIGHT_ACTIONS = ("attack", "heal", "retreat")
+    MAX_SLOTS = 8  # number of selectable room items and storage items
+    MAX_STEPS = 500
+    WIN_ROOM = "system_kernel"
+
+    # rewards
+    WIN_REWARD = 1.0
+    DEATH_REWARD = -1.0
+    INVALID_REWARD = -0.01
+
+    # observation layout
+    OBS_ROOM, OBS_HP, OBS_MAX_HP, OBS_ATK, OBS_WEIGHT, OBS_MAX_WEIGHT, OBS_MED_USES, OBS_MONSTER_HP, \
+        OBS_EXITS, OBS_LOCKED, OBS_PUZZLE, OBS_COMBAT = range(12)
+    OBS_HEADER = 12
+
+    def __init__(self, max_steps=MAX_STEPS, answers=None):
+        self.max_steps = max_steps
+
+        # the vocabularies are taken from a template world so the spaces stay fixed between resets
+        template = WorldBuilder()
+        template.build()
+        self.room_ids = {room.name: i for i, room in enumerate(template.rooms.values())}
+        self.item_ids = {name: i for i, name in enumerate(self.collect_item_names(template))}
+        self.monster_ids = {}
+        for room in template.rooms.values():
+            for name in room.monsters:
+                self.monster_ids[name] = len(self.monster_ids)
+        if answers is None:
+            answers = sorted({room.puzzle.solution for room in template.rooms.values() if room.puzzle})
+        self.answers = tuple(answers)
+
+        self.actions = self.build_actions()
+        self.item_words = self.words_for(len(self.item_ids))
+        self.monster_words = self.words_for(len(self.monster_ids))
+        self.obs_size = self.OBS_HEADER + 2 * self.item_words + self.monster_words
+
+        self.game = None
+        self.ui = None
+        self.steps = 0
+
+    @staticmethod
+    def collect_item_names(world):
+        """
+        Collect the names of every item in a world, including puzzle and monster rewards and what they can drop.
+        :param world: A WorldBuilder that has been built.
+        :return: The item names in the order they were found.
+        """
+        names = {}
+        for room in world.rooms.values():
+            for name in room.items:
+                names[name] = None
+            if room.puzzle and room.puzzle.reward:
+                names[room.puzzle.reward.name] = None
+            for monster in room.monsters.values():
+                if monster.reward:
+                    names[monster.reward.name] = None
+            tables = [monster.loot for monster in room.monsters.values()]
+            if room.puzzle:
+                tables.append(room.puzzle.loot)
+            for loot in tables:
+                if loot is not None:
+                    for item in loot.prototypes():
+                        names[item.name] = None
+        return list(names)
+
+    @staticmethod
+    def words_for(bits):
+        """
+        :return: The number of 32-bit words needed to hold a bitset.
+        """
+        return (bits + 31) // 32
+
+    def build_actions(self):
+        """
+        Build the discrete action space as a list of (kind, argument) pairs.
+        :return: The list of actions where the index is the action id.
+        """
+        actions = [("move", d) for d in self.DIRECTIONS]
+        actions.append(("scan", None))
+        actions += [("take", i) for i in range(self.MAX_SLOTS)]
+        actions += [("use", i) for i in range(self.MAX_SLOTS)]
+        actions += [("fight", a) for a in self.FIGHT_ACTIONS]
+        actions += [("answer", a) for a in self.answers]
+        return actions
+
+    @property
+    def n_actions(self):
+        return len(self.actions)
+
+    def reset(self, seed=None):
+        """
+        Start a new game.
+        :param seed: Seed for the game's random stream.
+        :return: The first observation and an info dictionary.
+        """
+        self.ui = HeadlessUI()
+        self.game = Game(ui=self.ui, seed=seed)
+        self.game.initialise_game()
+        self.steps = 0
+        return self.observe(), {}
+
+    def fork(self):
+        """
+        Branch the environment using Game.fork, so actions on the copy don't affect this one.
+        :return: The forked environment.
+        """
+        env = copy.copy(self)
+        env.game = self.game.fork()
+        env.ui = env.game.ui
+        return env
+
+    def step(self, action):
+        """
+        Play one action.
+        :param action: The index of the action in the action space.
+        :return: observation, reward, terminated, truncated, info
+        """
+        kind, arg = self.actions[action]
+        self.steps += 1
+        self.ui.clear_input()
+
+        valid = self.play(kind, arg)
+
+        player = self.game.player
+        terminated = False
+        reward = 0.0 if valid else self.INVALID_REWARD
+        if not player.is_alive():
+            self.game.game_over = True
+            terminated = True
+            reward = self.DEATH_REWARD
+        elif player.current_room.name == self.WIN_ROOM:
+            terminated = True
+            reward = self.WIN_REWARD
+
+        truncated = not terminated and self.steps >= self.max_steps
+        info = {"valid": valid, "room": player.current_room.name}
+        return self.observe(), reward, terminated, truncated, info
+
+    def play(self, kind, arg):
+        """
+        Translate an action into key presses or combat turns and run it through the game.
+        :return: False if the action could not be done in the current state, True otherwise.
+        """
+        game = self.game
+        room = game.player.current_room
+
+        # while a fight is going on the only way out is to win, die or retreat
+        if game.active_combat is not None and kind != "fight":
+            return False
+
+        if kind == "move":
+            key = {"north": curses.KEY_UP, "south": curses.KEY_DOWN,
+                   "east": curses.KEY_RIGHT, "west": curses.KEY_LEFT}[arg]
+            self.run(game.input_handler.handle, key)
+        elif kind == "scan":
+            self.run(game.input_handler.handle, "r")
+        elif kind == "take":
+            if arg >= len(room.items):
+                return False
+            self.ui.push_input(*choice_keys(arg + 1, len(room.items)))
+            self.run(game.input_handler.handle, "t")
+        elif kind == "use":
+            if arg >= len(game.player.storage):
+                return False
+            # storage menu -> item -> first action (equip for weapons and meds, use for everything else)
+            self.ui.push_input(*choice_keys(arg + 1, len(game.player.storage)), "1")
+            self.run(game.input_handler.handle, "s")
+        elif kind == "fight":
+            return self.fight(arg)
+        elif kind == "answer":
+            if room.puzzle is None:
+                return False
+            self.ui.push_input(arg)
+            self.run(game.input_handler.handle, "p")
+        return True
+
+    def fight(self, action):
+        """
+        Play a single combat turn, starting a fight with the room's monster if there isn't one going on.
+        :param action: "attack", "heal" or "retreat".
+        :return: False if there is nothing to fight, True otherwise.
+        """
+        game = self.game
+        room = game.player.current_room
+
+        if game.active_combat is None:
+            if not room.monsters:
+                return False
+            self.run(game.do_fight, next(iter(room.monsters)))
+            if game.active_combat is None:
+                return True  # the fight was over before it started, e.g. the player is already dead
+
+        combat = game.active_combat
+        if self.run(combat.take_turn, action) == "retreat":
+            game.active_combat = None
+        elif not combat.player.is_alive() or not combat.monster.is_alive():
+            game.active_combat = None
+            self.run(combat.handle_combat_end, combat.monster, room)
+        return True
+
+    @staticmethod
+    def run(handler, *args):
+        """
+        Run a game handler until it finishes or asks for more input than the action provided.
+        :return: The handler's return value, or None if it ran out of input.
+        """
+        try:
+            return handler(*args)
+        except InputExhausted:
+            return None
+
+    def set_bits(self, obs, offset, ids, names):
+        for name in names:
+            i = ids.get(name)
+            if i is not None:
+                obs[offset + i // 32] |= np.uint32(1 << (i % 32))
+
+    def observe(self):
+        """
+        Encode the current game state.
+        :return: A uint32 array of size obs_size.
+        """
+        player = self.game.player
+        room = player.current_room
+        obs = np.zeros(self.obs_size, dtype=np.uint32)
+
+        obs[self.OBS_ROOM] = self.room_ids.get(room.name, len(self.room_ids))
+        obs[self.OBS_HP] = player.hp
+        obs[self.OBS_MAX_HP] = player.max_hp
+        obs[self.OBS_ATK] = player.attack_power
+        obs[self.OBS_WEIGHT] = player.weight
+        obs[self.OBS_MAX_WEIGHT] = player.max_weight
+        obs[self.OBS_MED_USES] = player.equipped_med.uses if player.equipped_med else 0
+        if room.monsters:
+            obs[self.OBS_MONSTER_HP] = next(iter(room.monsters.values())).hp
+
+        exits = locked = 0
+        for i, direction in enumerate(self.DIRECTIONS):
+            if direction in room.exits:
+                exits |= 1 << i
+            if direction in room.locked_exits:
+                locked |= 1 << i
+        obs[self.OBS_EXITS] = exits
+        obs[self.OBS_LOCKED] = locked
+        obs[self.OBS_PUZZLE] = room.puzzle is not None
+        obs[self.OBS_COMBAT] = self.game.active_combat is not None
+
+        offset = self.OBS_HEADER
+        self.set_bits(obs, offset, self.item_ids, player.storage)
+        offset += self.item_words
+        self.set_bits(obs, offset, self.item_ids, room.items)
+        offset += self.item_words
+        self.set_bits(obs, offset, self.monster_ids, room.monsters)
+        return obs
+
+    def action_mask(self):
+        """
+        :return: A boolean array marking which actions can currently do something.
+        """
+        game = self.game
+        room = game.player.current_room
+        in_combat = game.active_combat is not None
+        mask = np.zeros(self.n_actions, dtype=bool)
+        for i, (kind, arg) in enumerate(self.actions):
+            if kind == "fight":
+                mask[i] = in_combat or bool(room.monsters)
+            elif in_combat:
+                continue
+            elif kind == "move":
+                mask[i] = arg in room.exits
+            elif kind == "take":
+                mask[i] = arg < len(room.items)
+            elif kind == "use":
+                mask[i] = arg < len(game.player.storage)
+            elif kind == "answer":
+                mask[i] = room.puzzle is not None
+            else:
+                mask[i] = True
+        return mask
+
+    def describe_action(self, action):
+        """
+        :return: A readable name for an action, e.g. "take 2" or "fight attack".
+        """
+        kind, arg = self.actions[action]
+        return kind if arg is None else f"{kind} {arg}"
+
@@ -0,0 +1,210 @@
+"""
+Monte Carlo tree search autoplayer built on LabyrinthEnv.fork.
+
+Run from the repository root:
+    python -m game_code.ai.mcts --episodes 10
+"""
+import argparse
+import math
+import random
+import time
+from collections import deque
+
+from game_code.ai.labyrinth_env import LabyrinthEnv
+
+
+class Node:
+    """
+    A node of the search tree holding a forked environment after the action that led to it.
+    """
+    __slots__ = ("env", "parent", "action", "children", "untried", "visits", "value", "terminal")
+
+    def __init__(self, env, parent=None, action=None, terminal=False):
+        self.env = env
+        self.parent = parent
+        self.action = action
+        self.children = []
+        self.untried = [] if terminal else list(env.action_mask().nonzero()[0])
+        self.visits = 0
+        self.value = 0.0
+        self.terminal = terminal
+
+
+class MCTSPlayer:
+    """
+    Picks actions by growing a search tree of forked games (UCT), with random rollouts scored by the
+    game result or, when a rollout doesn't finish, by how close the player got to the kernel.
+    """
+    EXPLORATION = 1.4
+    PROGRESS_WEIGHT = 0.5  # value of standing in the kernel room without finishing the rollout
+
+    def __init__(self, iterations=100, rollout_depth=15, seed=None):
+        self.iterations = iterations
+        self.rollout_depth = rollout_depth
+        self.rng = random.Random(seed)
+        self.distances = None
+        self.forks = 0
+        self.fork_seconds = 0.0
+
+    def fork(self, env):
+        start = time.perf_counter()
+        forked = env.fork()
+        self.fork_seconds += time.perf_counter() - start
+        self.forks += 1
+        return forked
+
+    def room_distances(self, env):
+        """
+        Breadth-first distances from every room to the kernel room, ignoring locks and monsters.
+        :return: Dictionary of room name to number of moves.
+        """
+        rooms = {room.name: room for room in env.game.world.rooms.values()}
+        reverse = {name: [] for name in rooms}
+        for room in rooms.values():
+            for neighbour in room.exits.values():
+                reverse[neighbour.name].append(room.name)
+
+        distances = {env.WIN_ROOM: 0}
+        queue = deque([env.WIN_ROOM])
+        while queue:
+            name = queue.popleft()
+            for previous in reverse[name]:
+                if previous not in distances:
+                    distances[previous] = distances[name] + 1
+                    queue.append(previous)
+        return distances
+
+    def evaluate(self, env):
+        """
+        Score a state that a rollout stopped in before the game ended.
+        :return: A value between 0 and PROGRESS_WEIGHT.
+        """
+        furthest = max(self.distances.values()) or 1
+        distance = self.distances.get(env.game.player.current_room.name, furthest)
+        player = env.game.player
+        health = player.hp / player.max_hp
+        return self.PROGRESS_WEIGHT * (1 - distance / furthest) * (0.5 + 0.5 * health)
+
+    def choose(self, env):
+        """
+        Search from the current state of an environment.
+        :param env: The environment, which is not changed.
+        :return: The index of the chosen action.
+        """
+        if self.distances is None:
+            self.distances = self.room_distances(env)
+
+        root = Node(self.fork(env))
+        for _ in range(self.iterations):
+            node = self.select(root)
+            if node.untried:
+                node = self.expand(node)
+            self.backpropagate(node, self.rollout(node))
+
+        if not root.children:
+            return int(self.rng.choice(env.action_mask().nonzero()[0]))
+        return int(max(root.children, key=lambda child: child.visits).action)
+
+    def select(self, node):
+        """
+        Walk down fully expanded nodes picking the child with the best upper confidence bound.
+        """
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.value / child.visits
+                       + self.EXPLORATION * math.sqrt(log_visits / child.visits))
+        return node
+
+    def expand(self, node):
+        """
+        Play one untried action from a node on a fork of its game.
+        :return: The new child node.
+        """
+        action = node.untried.pop(self.rng.randrange(len(node.untried)))
+        env = self.fork(node.env)
+        _, _, terminated, truncated, _ = env.step(action)
+        child = Node(env, node, action, terminal=terminated or truncated)
+        node.children.append(child)
+        return child
+
+    def rollout(self, node):
+        """
+        Play random useful actions from a node until the game ends or the depth runs out.
+        :return: The value of the rollout.
+        """
+        if node.terminal:
+            return self.terminal_value(node.env)
+
+        env = self.fork(node.env)
+        for _ in range(self.rollout_depth):
+            actions = env.action_mask().nonzero()[0]
+            _, reward, terminated, truncated, _ = env.step(int(self.rng.choice(actions)))
+            if terminated:
+                return reward
+            if truncated:
+                break
+        return self.evaluate(env)
+
+    def terminal_value(self, env):
+        player = env.game.player
+        if not player.is_alive():
+            return env.DEATH_REWARD
+        if player.current_room.name == env.WIN_ROOM:
+            return env.WIN_REWARD
+        return self.evaluate(env)
+
+    @staticmethod
+    def backpropagate(node, value):
+        while node is not None:
+            node.visits += 1
+            node.value += value
+            node = node.parent
+
+
+def autoplay(episodes=10, iterations=100, rollout_depth=15, max_steps=300, seed=0):
+    """
+    Play whole games with the MCTS player.
+    :return: Dictionary with the win rate, forks per second and average episode length.
+    """
+    player = MCTSPlayer(iterations, rollout_depth, seed=seed)
+    env = LabyrinthEnv(max_steps=max_steps)
+    wins = 0
+    steps = 0
+    start = time.perf_counter()
+
+    for episode in range(episodes):
+        env.reset(seed=seed + episode)
+        while True:
+            _, reward, terminated, truncated, _ = env.step(player.choose(env))
+            steps += 1
+            if terminated or truncated:
+                wins += reward == env.WIN_REWARD
+                break
+
+    elapsed = time.perf_counter() - start
+    return {
+        "episodes": episodes,
+        "win_rate": wins / episodes,
+        "average_steps": steps / episodes,
+        "forks": player.forks,
+        "forks_per_second": player.forks / player.fork_seconds if player.fork_seconds else 0.0,
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--episodes", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=15)
+    parser.add_argument("--max-steps", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = autoplay(args.episodes, args.iterations, args.depth, args.max_steps, args.seed)
+    for key, value in report.items():
+        print(f"{key:>18}: {value:.3f}" if isinstance(value, float) else f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import multiprocessing as mp
+
+import numpy as np
+
+from game_code.ai.labyrinth_env import LabyrinthEnv
+
+
+class VectorLabyrinthEnv:
+    """
+    Steps N independent LabyrinthEnv games in lockstep inside one process.
+    Finished games are reset automatically, so every call to step returns one row per game.
+    """
+
+    def __init__(self, num_envs, max_steps=LabyrinthEnv.MAX_STEPS, stride=None):
+        """
+        :param stride: How far a game's seed moves on each reset, which is the number of games seeded from the
+        same base seed; more than num_envs when this is one worker's chunk of a ProcessVectorLabyrinthEnv.
+        """
+        self.envs = [LabyrinthEnv(max_steps=max_steps) for _ in range(num_envs)]
+        self.num_envs = num_envs
+        self.stride = stride or num_envs
+        self.n_actions = self.envs[0].n_actions
+        self.obs_size = self.envs[0].obs_size
+        self.seeds = [None] * num_envs
+
+    def reset(self, seed=None):
+        """
+        Reset every game, where game i is seeded with seed + i.
+        :param seed: The base seed, or None for random games.
+        :return: Observations of shape (N, obs_size) and an info dictionary.
+        """
+        obs = np.empty((self.num_envs, self.obs_size), dtype=np.uint32)
+        for i, env in enumerate(self.envs):
+            self.seeds[i] = None if seed is None else seed + i
+            obs[i], _ = env.reset(seed=self.seeds[i])
+        return obs, {}
+
+    def step(self, actions):
+        """
+        Play one action in every game.
+        :param actions: Sequence of N action indices.
+        :return: observations, rewards, terminated, truncated, info where info["final_room"] holds the room
+        name of each game that finished on this step.
+        """
+        obs = np.empty((self.num_envs, self.obs_size), dtype=np.uint32)
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        final_room = [None] * self.num_envs
+
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            obs[i], rewards[i], terminated[i], truncated[i], info = env.step(int(action))
+            if terminated[i] or truncated[i]:
+                final_room[i] = info["room"]
+                if self.seeds[i] is not None:
+                    self.seeds[i] += self.stride  # the next game gets a fresh seed that is still reproducible
+                obs[i], _ = env.reset(seed=self.seeds[i])
+
+        return obs, rewards, terminated, truncated, {"final_room": final_room}
+
+    def action_masks(self):
+        """
+        :return: A boolean array of shape (N, n_actions) of the currently useful actions.
+        """
+        return np.stack([env.action_mask() for env in self.envs])
+
+    def close(self):
+        pass
+
+
+def worker(conn, num_envs, max_steps, stride):
+    """
+    Runs a VectorLabyrinthEnv in a child process and answers commands sent over a pipe.
+    :param conn: The child's end of the pipe.
+    :param num_envs: Number of games owned by this worker.
+    :param max_steps: Step limit of each game.
+    :param stride: The number of games across every worker, which seeds move by.
+    :return: None
+    """
+    env = VectorLabyrinthEnv(num_envs, max_steps, stride)
+    while True:
+        command, data = conn.recv()
+        if command == "reset":
+            conn.send(env.reset(seed=data))
+        elif command == "step":
+            conn.send(env.step(data))
+        elif command == "masks":
+            conn.send(env.action_masks())
+        elif command == "seeds":
+            conn.send(env.seeds)
+        elif command == "close":
+            conn.close()
+            return
+
+
+class ProcessVectorLabyrinthEnv:
+    """
+    Steps N independent games in lockstep across a pool of worker processes.
+    The games are split into one contiguous chunk per worker, so a single pipe round trip
+    steps a whole chunk and the results are joined back into arrays of N rows.
+    """
+
+    def __init__(self, num_envs, num_workers=None, max_steps=LabyrinthEnv.MAX_STEPS):
+        num_workers = min(num_workers or mp.cpu_count(), num_envs)
+        self.num_envs = num_envs
+        sizes = [num_envs // num_workers + (i < num_envs % num_workers) for i in range(num_workers)]
+        self.bounds = np.cumsum([0] + sizes)
+
+        probe = LabyrinthEnv(max_steps=max_steps)
+        self.n_actions = probe.n_actions
+        self.obs_size = probe.obs_size
+
+        ctx = mp.get_context("spawn" if "fork" not in mp.get_all_start_methods() else "fork")
+        self.conns = []
+        self.processes = []
+        for size in sizes:
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=worker, args=(child, size, max_steps, num_envs), daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    def reset(self, seed=None):
+        """
+        Reset every game, where game i is seeded with seed + i.
+        :return: Observations of shape (N, obs_size) and an info dictionary.
+        """
+        for start, conn in zip(self.bounds, self.conns):
+            conn.send(("reset", None if seed is None else seed + int(start)))
+        return np.concatenate([conn.recv()[0] for conn in self.conns]), {}
+
+    def step(self, actions):
+        """
+        Play one action in every game.
+        :param actions: Sequence of N action indices.
+        :return: observations, rewards, terminated, truncated, info (see VectorLabyrinthEnv.step)
+        """
+        actions = np.asarray(actions)
+        for i, conn in enumerate(self.conns):
+            conn.send(("step", actions[self.bounds[i]:self.bounds[i + 1]]))
+        results = [conn.recv() for conn in self.conns]
+
+        obs, rewards, terminated, truncated = (np.concatenate([r[k] for r in results]) for k in range(4))
+        final_room = [room for r in results for room in r[4]["final_room"]]
+        return obs, rewards, terminated, truncated, {"final_room": final_room}
+
+    def action_masks(self):
+        for conn in self.conns:
+            conn.send(("masks", None))
+        return np.concatenate([conn.recv() for conn in self.conns])
+
+    @property
+    def seeds(self):
+        """
+        :return: The seed of each game's current episode, as VectorLabyrinthEnv.seeds.
+        """
+        for conn in self.conns:
+            conn.send(("seeds", None))
+        return [seed for conn in self.conns for seed in conn.recv()]
+
+    def close(self):
+        """
+        Stop the worker processes.
+        :return: None
+        """
+        for conn in self.conns:
+            try:
+                conn.send(("close", None))
+                conn.close()
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=1)
+        self.conns = []
+        self.processes = []
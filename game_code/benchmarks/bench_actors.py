@@ -0,0 +1,55 @@
+"""
+Benchmarks room actors: players random-walk a large generated world and the number of live actors should follow
+the rooms players are in, not the size of the world.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_actors
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from game_code.systems.room_actors import ActorWorld
+from game_code.world.world_generator import WorldGenerator
+
+
+async def walk(world, player, steps, rng, peak):
+    for _ in range(steps):
+        room = player[1].current_room
+        await world.move(*player, rng.choice(sorted(room.exits)))
+        await world.look(*player)
+        peak[0] = max(peak[0], len(world.actors))
+
+
+async def run(size, players, steps, seed=0):
+    """
+    Walk players through a generated world at the same time.
+    :return: Seconds taken, messages sent, peak number of actors and actors left at the end.
+    """
+    world = ActorWorld(WorldGenerator(size, seed=seed, cache_size=players * 2))
+    joined = [await world.join(f"p{i}") for i in range(players)]
+    peak = [0]
+    start = time.perf_counter()
+    await asyncio.gather(*(walk(world, player, steps, random.Random(seed + i), peak)
+                           for i, player in enumerate(joined)))
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0)
+    return elapsed, players * steps * 3, peak[0], len(world.actors)  # a move is two messages and a look one
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--players", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--steps", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'players':>8} {'messages/s':>11} {'peak actors':>12} {'actors left':>12}")
+    for players in args.players:
+        elapsed, messages, peak, left = asyncio.run(run(args.size, players, args.steps))
+        print(f"{players:>8} {messages / elapsed:>11.0f} {peak:>12} {left:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmarks driving a game over the control socket: a route of moves sent one command per round trip, pipelined
+without waiting for answers, and as a single batch.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_control
+"""
+import argparse
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from game_code.game import Game
+from game_code.systems.control import ControlServer
+from game_code.systems.remote_ui import RemoteUI
+
+
+def route(moves):
+    """
+    Back and forth between the boot sector and the lost cache.
+    :return: List of move commands.
+    """
+    return [{"cmd": "move", "direction": "north" if i % 2 == 0 else "south"} for i in range(moves)]
+
+
+def run(moves):
+    """
+    Play the route each way against one running game.
+    :return: Dictionary of mode to seconds for the whole route.
+    """
+    folder = tempfile.TemporaryDirectory()
+    path = os.path.join(folder.name, "control.sock")
+    ui = RemoteUI(lambda data: None, height=40, width=120)
+    ui.start_screen()
+    game = Game(ui=ui, seed=1)
+    game.intro = False
+    server = ControlServer(game, path)
+    server.start()
+    thread = threading.Thread(target=game.run, daemon=True)
+    thread.start()
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    replies = client.makefile("r", encoding="utf-8")
+    commands = route(moves)
+    timings = {}
+
+    start = time.perf_counter()
+    for command in commands:
+        client.sendall(json.dumps(command).encode("utf-8") + b"\n")
+        json.loads(replies.readline())
+    timings["one at a time"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    client.sendall(b"".join(json.dumps(command).encode("utf-8") + b"\n" for command in commands))
+    for _ in commands:
+        json.loads(replies.readline())
+    timings["pipelined"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    client.sendall(json.dumps({"batch": commands}).encode("utf-8") + b"\n")
+    reply = json.loads(replies.readline())
+    timings["batch"] = time.perf_counter() - start
+    assert reply["ok"] and len(reply["results"]) == moves
+
+    client.sendall(b'{"batch": [{"cmd": "action", "name": "pause"}, {"cmd": "key", "key": "q"}]}\n')
+    thread.join()
+    replies.close()
+    client.close()
+    server.stop()
+    folder.cleanup()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--moves", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'mode':>14} {'total ms':>9} {'us/move':>8}")
+    for mode, seconds in run(args.moves).items():
+        print(f"{mode:>14} {seconds * 1e3:>9.1f} {seconds / args.moves * 1e6:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
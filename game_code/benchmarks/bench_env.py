@@ -0,0 +1,52 @@
+"""
+Benchmarks environment steps per second for the in-process and the process pool vectorized environments.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_env
+"""
+import argparse
+import time
+
+import numpy as np
+
+from game_code.ai.vector_env import ProcessVectorLabyrinthEnv, VectorLabyrinthEnv
+
+
+def run(env, steps, seed=0):
+    """
+    Step an environment with random valid actions.
+    :return: Environment steps per second (N games x steps / seconds).
+    """
+    rng = np.random.default_rng(seed)
+    env.reset(seed=seed)
+    start = time.perf_counter()
+    for _ in range(steps):
+        masks = env.action_masks()
+        # pick a random valid action for every game at once
+        scores = rng.random(masks.shape) * masks
+        env.step(scores.argmax(axis=1))
+    elapsed = time.perf_counter() - start
+    return env.num_envs * steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 64, 1024])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"{'N':>6} {'sync steps/s':>14} {'pool steps/s':>14}")
+    for n in args.sizes:
+        steps = max(10, args.steps * 64 // max(n, 64))
+        sync = run(VectorLabyrinthEnv(n), steps)
+        pool_env = ProcessVectorLabyrinthEnv(n, args.workers)
+        try:
+            pool = run(pool_env, steps)
+        finally:
+            pool_env.close()
+        print(f"{n:>6} {sync:>14.0f} {pool:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmarks the idle session keeper: adding, touching and forgetting many sessions, and the ticks that warn and
+hibernate them, with stand-in sessions so the timers alone are measured; then hibernating and waking real
+sessions, with the size of a hibernated session on disk.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_idle --sessions 200000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from game_code.game import Game
+from game_code.systems.control import parse
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.systems.idle_sessions import IdleKeeper
+from game_code.systems.session_server import Session
+
+
+class Stub:
+    """
+    A session that only remembers whether it is hibernated.
+    """
+    hibernated = False
+
+    def hibernate(self, path):
+        self.hibernated = True
+        return True
+
+    def wake(self):
+        self.hibernated = False
+
+
+def timers(count):
+    """
+    Keep many sessions through a warning and hibernation, touching half of them on every tick.
+    :return: Dictionary of operation to (count, seconds).
+    """
+    clock = [0]
+    folder = tempfile.TemporaryDirectory()
+    keeper = IdleKeeper(folder.name, warn_after=30, hibernate_after=60, timeout=3600, clock=lambda: clock[0])
+    sessions = [Stub() for _ in range(count)]
+    timings = {}
+
+    start = time.perf_counter()
+    for session in sessions:
+        keeper.add(session)
+    timings["add"] = (count, time.perf_counter() - start)
+
+    touched = ticks = 0
+    touching = advancing = 0.0
+    for second in range(1, 111):
+        start = time.perf_counter()
+        for session in sessions[second % 2::2] if second < 45 else ():
+            keeper.touch(session)
+            touched += 1
+        touching += time.perf_counter() - start
+        clock[0] = second
+        start = time.perf_counter()
+        keeper.advance()
+        advancing += time.perf_counter() - start
+        ticks += 1
+    timings["touch"] = (touched, touching)
+    timings["tick"] = (ticks, advancing)
+
+    start = time.perf_counter()
+    for session in sessions:
+        keeper.forget(session)
+    timings["forget"] = (count, time.perf_counter() - start)
+    assert keeper.counts["hibernated"] == count and len(keeper) == 0
+    folder.cleanup()
+    return timings
+
+
+def hibernation(count):
+    """
+    Hibernate and wake sessions that have fought, picked up items and moved.
+    :return: Dictionary of operation to (count, seconds), and the mean bytes of a hibernated session.
+    """
+    template = Game(ui=HeadlessUI()).pristine()
+    folder = tempfile.TemporaryDirectory()
+    sessions = []
+    for seed in range(count):
+        session = Session(template, seed)
+        for request in ({"batch": [{"cmd": "action", "name": "take"}, {"cmd": "choose", "index": 2},
+                                   {"cmd": "key", "key": "1"}]},
+                        {"batch": [{"cmd": "move", "direction": "south"}, {"cmd": "move", "direction": "east"},
+                                   {"cmd": "choose", "index": 1}]}):
+            session.play(parse(json.dumps(request)))
+        sessions.append(session)
+
+    start = time.perf_counter()
+    for number, session in enumerate(sessions):
+        session.hibernate(os.path.join(folder.name, f"session-{number}.idle"))
+    hibernating = time.perf_counter() - start
+    size = sum(os.path.getsize(session.path) for session in sessions) / count
+
+    start = time.perf_counter()
+    for session in sessions:
+        session.wake()
+    waking = time.perf_counter() - start
+    folder.cleanup()
+    return {"hibernate": (count, hibernating), "wake": (count, waking)}, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=200000, help="stand-in sessions with timers")
+    parser.add_argument("--hibernate", type=int, default=500, help="real sessions hibernated and woken")
+    args = parser.parse_args()
+
+    timings = timers(args.sessions)
+    more, size = hibernation(args.hibernate)
+    timings.update(more)
+    print(f"{'operation':>10} {'count':>8} {'total ms':>9} {'us each':>8}")
+    for operation, (count, seconds) in timings.items():
+        print(f"{operation:>10} {count:>8} {seconds * 1e3:>9.1f} {seconds / count * 1e6:>8.2f}")
+    print(f"a hibernated session takes {size:.0f} bytes on disk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmarks item memory: flyweight items only hold their prototype and their own state, so a million meds or logs
+should take a fraction of the memory of items that each carry every field.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_items
+"""
+import argparse
+import gc
+import tracemalloc
+
+from game_code.entities.items.lore import Lore
+from game_code.entities.items.med import Med
+
+
+class FullItem:
+    """
+    An item laid out as before prototypes: every field in the item's own __dict__.
+    """
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+KINDS = {
+    "med": (Med, dict(name="stim_patch", description="A single-use patch that mends a little corruption.",
+                      weight=3, heal=100, uses=1, max_uses=1)),
+    "lore": (Lore, dict(name="stray_cache.log", description="A scrap of a log.", weight=4,
+                        content="Someone kept writing after the cache was sealed. " * 8)),
+}
+
+
+def measure(make, count):
+    """
+    :return: Bytes allocated per item while count items are alive.
+    """
+    gc.collect()
+    tracemalloc.start()
+    items = [make() for _ in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return size / count
+
+
+def run(kind, count):
+    """
+    :return: Bytes per item for flyweight and full items.
+    """
+    cls, fields = KINDS[kind]
+    flyweight = measure(lambda: cls(**fields), count)
+    # a dict copy per item, as each item used to set its own attributes
+    full = measure(lambda: FullItem(**fields), count)
+    return flyweight, full
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1000000)
+    args = parser.parse_args()
+
+    print(f"{'kind':>5} {'items':>8} {'flyweight B':>12} {'full B':>7} {'saved MB':>9}")
+    for kind in KINDS:
+        flyweight, full = run(kind, args.count)
+        print(f"{kind:>5} {args.count:>8} {flyweight:>12.0f} {full:>7.0f} {(full - flyweight) * args.count / 1e6:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""
+Load tests the session server (see systems/session_server.py) with scripted bots, each an asyncio task with a
+connection of its own. Bots walk routes, take items, fight through the combat prompts and answer puzzles; a bot
+whose game ends starts a new session. The number of bots follows a ramp profile of (seconds, bots) stages, e.g.
+"0:0,10:2000,30:2000,35:0" ramps to 2000 bots over ten seconds, holds them for twenty and ramps down.
+
+Reports throughput, action latency percentiles (p50, p99, p999), and the server's memory and CPU per session,
+and writes them as JSON, which --compare checks against the report of another commit.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_load --profile 0:0,10:2000,30:2000 --report load.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROUTES = [
+    ["south", "east", "east", "south", "north", "west", "west", "north"],  # fights the glitch_beast, data_wraith
+    ["north", "south", "east", "west", "south", "north"],  # the lost cache's puzzle
+]
+ANSWERS = {"reconstruction": "0", "faded_data": "echo"}  # puzzle name to answer
+HEAL_BELOW = 200  # HP under which a bot heals instead of attacking
+
+
+def parse_profile(text):
+    """
+    Read a ramp profile.
+    :param text: Comma separated "seconds:bots" stages, in time order.
+    :return: List of (seconds, bots).
+    """
+    stages = [tuple(float(part) for part in stage.split(":")) for stage in text.split(",")]
+    if not stages or any(later[0] < earlier[0] for earlier, later in zip(stages, stages[1:])):
+        raise ValueError(f"stages must be in time order: {text}")
+    return [(seconds, int(bots)) for seconds, bots in stages]
+
+
+def bots_at(profile, seconds):
+    """
+    The number of bots the profile wants at a time, interpolated between its stages.
+    :return: The number of bots.
+    """
+    if seconds <= profile[0][0]:
+        return profile[0][1]
+    for (start, low), (end, high) in zip(profile, profile[1:]):
+        if seconds <= end:
+            if end == start:
+                return high
+            return round(low + (high - low) * (seconds - start) / (end - start))
+    return profile[-1][1]
+
+
+def percentile(ordered, fraction):
+    """
+    :param ordered: Sorted samples.
+    :param fraction: E.g. 0.99.
+    :return: The nearest-rank percentile, or None without samples.
+    """
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+class Results:
+    """
+    What the bots measured: latencies by kind of action, actions per second, sessions and errors.
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)  # kind of action to nanoseconds per round trip
+        self.seconds = defaultdict(int)  # whole seconds since the start to actions completed in it
+        self.sessions = 0  # sessions played to the end
+        self.deaths = 0
+        self.errors = defaultdict(int)  # error to count
+        self.start = time.perf_counter()
+
+    def record(self, kind, nanoseconds):
+        self.latencies[kind].append(nanoseconds)
+        self.seconds[int(time.perf_counter() - self.start)] += 1
+
+    def summary(self, ordered):
+        return {
+            "count": len(ordered),
+            "p50_ms": percentile(ordered, 0.5) / 1e6,
+            "p99_ms": percentile(ordered, 0.99) / 1e6,
+            "p999_ms": percentile(ordered, 0.999) / 1e6,
+            "max_ms": ordered[-1] / 1e6,
+        }
+
+
+class Bot:
+    """
+    One scripted player, which plays sessions one after another until it is cancelled.
+    """
+
+    def __init__(self, number, address, results, actions, think):
+        """
+        :param number: The bot's number, which picks its route.
+        :param address: The server's (host, port).
+        :param actions: The actions a session plays before the bot leaves and starts a new one.
+        :param think: Seconds the bot waits between actions.
+        """
+        self.number = number
+        self.address = address
+        self.results = results
+        self.actions = actions
+        self.think = think
+        self.reader = self.writer = None
+
+    async def run(self):
+        while True:
+            try:
+                self.reader, self.writer = await asyncio.open_connection(*self.address, limit=1 << 20)
+            except OSError as error:
+                self.results.errors[f"connect: {error.strerror or error}"] += 1
+                await asyncio.sleep(0.1)
+                continue
+            try:
+                await self.session()
+                self.results.sessions += 1
+            except (ConnectionError, asyncio.IncompleteReadError) as error:
+                self.results.errors[type(error).__name__] += 1
+            finally:
+                self.writer.close()
+
+    async def act(self, kind, request):
+        """
+        Send a request and wait for its answer.
+        :param kind: The kind of action, which latencies are reported by.
+        :return: The snapshot of the game.
+        """
+        start = time.perf_counter_ns()
+        self.writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionResetError("the server closed the session")
+            answer = json.loads(line)
+            if "event" not in answer:  # e.g. an idle warning, see SessionServer
+                break
+        self.results.record(kind, time.perf_counter_ns() - start)
+        if not answer["ok"]:
+            self.results.errors[answer.get("error", "failed command")] += 1
+        return answer["state"]
+
+    async def session(self):
+        route = ROUTES[self.number % len(ROUTES)]
+        taken, solved = set(), set()
+        state = await self.act("state", {"cmd": "state"})
+        step = 0
+        for _ in range(self.actions):
+            if state["game_over"]:
+                self.results.deaths += 1
+                return
+            room = state["room"]
+            if state["screen"] == "CombatScreen":
+                choice = 2 if state["hud"]["hp"] < HEAL_BELOW and state["hud"]["med"] else 1
+                state = await self.act("fight", {"cmd": "choose", "index": choice})
+            elif state["screen"] != "GameScreen":
+                state = await self.act("menu", {"cmd": "key", "key": "b"})
+            elif room["puzzle"] and room["name"] not in solved:
+                solved.add(room["name"])
+                state = await self.act("puzzle", {"batch": [
+                    {"cmd": "action", "name": "solve"},
+                    {"cmd": "answer", "text": ANSWERS.get(room["puzzle"], "?")},
+                ]})
+            elif room["items"] and room["name"] not in taken:
+                if len(room["items"]) == 1:
+                    taken.add(room["name"])
+                state = await self.act("take", {"batch": [
+                    {"cmd": "action", "name": "take"},
+                    {"cmd": "choose", "index": 1},
+                    {"cmd": "key", "key": "1"},  # equip it, if the game asks
+                ]})
+            else:
+                state = await self.act("move", {"cmd": "move", "direction": route[step % len(route)]})
+                step += 1
+            if self.think:
+                await asyncio.sleep(self.think)
+
+
+async def sample(address):
+    """
+    Read the server's counters over a connection of its own.
+    :return: The stats dictionary, see SessionServer.stats.
+    """
+    reader, writer = await asyncio.open_connection(*address)
+    try:
+        writer.write(b'{"cmd": "stats"}\n')
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+
+
+async def load(address, profile, actions, think):
+    """
+    Run bots against the server, following the profile.
+    :return: The Results and the server samples taken every second, as (seconds, bots, stats).
+    """
+    results = Results()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = []
+    samples = [(0.0, 0, await sample(address))]
+    next_sample = 1.0
+    number = 0
+    while True:
+        elapsed = loop.time() - start
+        if elapsed >= profile[-1][0]:
+            break
+        target = bots_at(profile, elapsed)
+        while len(tasks) < target:
+            tasks.append(asyncio.create_task(Bot(number, address, results, actions, think).run()))
+            number += 1
+        while len(tasks) > target:
+            tasks.pop().cancel()
+        if elapsed >= next_sample:
+            samples.append((elapsed, len(tasks), await sample(address)))
+            next_sample += 1.0
+        await asyncio.sleep(0.05)
+    samples.append((loop.time() - start, len(tasks), await sample(address)))
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return results, samples
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results, samples, args, duration):
+    """
+    Sum the results up.
+    :return: The report, a dictionary that can be written as JSON.
+    """
+    every = sorted(latency for latencies in results.latencies.values() for latency in latencies)
+    first, last = samples[0][2], samples[-1][2]
+    actions = len(every)
+    server_actions = last["actions"] - first["actions"]
+    cpu = last["cpu"] - first["cpu"]
+    started = last["started"] - first["started"]
+    # session-seconds the server hosted, from the sessions connected at each sample
+    hosted = sum((later[0] - earlier[0]) * earlier[2]["sessions"] for earlier, later in zip(samples, samples[1:]))
+    busiest = max(samples, key=lambda entry: entry[2]["sessions"])
+    memory = (busiest[2]["rss"] - first["rss"]) / busiest[2]["sessions"] if busiest[2]["sessions"] else None
+    return {
+        "commit": commit(),
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {"profile": [list(stage) for stage in args.profile], "actions": args.actions,
+                   "think": args.think},
+        "duration_s": duration,
+        "actions": actions,
+        "throughput_per_s": actions / duration,
+        "peak_throughput_per_s": max(results.seconds.values(), default=0),
+        "latency": results.summary(every) if every else None,
+        "by_action": {kind: results.summary(sorted(latencies)) for kind, latencies in results.latencies.items()},
+        "sessions": {"started": started, "played_out": results.sessions, "deaths": results.deaths,
+                     "peak": max(entry[2]["sessions"] for entry in samples)},
+        "errors": dict(results.errors),
+        "server": {
+            "rss_start_mb": first["rss"] / 2 ** 20,
+            "rss_peak_mb": max(entry[2]["rss"] for entry in samples) / 2 ** 20,
+            "memory_per_session_kb": memory / 1024 if memory is not None else None,
+            "cpu_s": cpu,
+            "cpu_us_per_action": cpu / server_actions * 1e6 if server_actions else None,
+            "cpu_ms_per_session": cpu / started * 1e3 if started else None,
+            "cpu_percent_per_session": cpu / hosted * 100 if hosted else None,
+        },
+        "timeline": [{"t": round(seconds, 2), "bots": bots, "sessions": stats["sessions"],
+                      "rss_mb": round(stats["rss"] / 2 ** 20, 1)} for seconds, bots, stats in samples],
+    }
+
+
+COMPARED = [  # (label, path in the report, whether higher is better)
+    ("throughput/s", ("throughput_per_s",), True),
+    ("p50 ms", ("latency", "p50_ms"), False),
+    ("p99 ms", ("latency", "p99_ms"), False),
+    ("p999 ms", ("latency", "p999_ms"), False),
+    ("KB/session", ("server", "memory_per_session_kb"), False),
+    ("cpu us/action", ("server", "cpu_us_per_action"), False),
+    ("cpu ms/session", ("server", "cpu_ms_per_session"), False),
+]
+
+
+def lookup(data, path):
+    for key in path:
+        data = data.get(key) if isinstance(data, dict) else None
+    return data
+
+
+def compare(old, new):
+    """
+    Print the main figures of two reports side by side.
+    :return: None
+    """
+    print(f"\n{'':>15} {old.get('commit') or 'old':>12} {new.get('commit') or 'new':>12} {'change':>9}")
+    for label, path, higher_is_better in COMPARED:
+        before, after = lookup(old, path), lookup(new, path)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        worse = change < 0 if higher_is_better else change > 0
+        mark = " worse" if worse and abs(change) >= 5 else ""
+        print(f"{label:>15} {before:>12.2f} {after:>12.2f} {change:>+8.1f}%{mark}")
+
+
+def start_server():
+    """
+    Start a session server in a child process, on a free port.
+    :return: The process and its (host, port).
+    """
+    server = subprocess.Popen([sys.executable, "-m", "game_code.systems.session_server", "--port", "0"],
+                              stdout=subprocess.PIPE, text=True)
+    line = server.stdout.readline()
+    if not line.startswith("listening on "):
+        server.kill()
+        raise RuntimeError(f"the server didn't start: {line!r}")
+    host, port = line.split()[-1].rsplit(":", 1)
+    return server, (host, int(port))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", type=parse_profile, default=parse_profile("0:0,5:1000,15:1000"),
+                        help='ramp stages "seconds:bots,...", e.g. 0:0,10:2000,30:2000')
+    parser.add_argument("--actions", type=int, default=60, help="actions per session before a bot starts anew")
+    parser.add_argument("--think", type=float, default=0.05, help="seconds a bot waits between actions")
+    parser.add_argument("--server", help="host:port of a running server; one is started if not given")
+    parser.add_argument("--report", help="write the JSON report here")
+    parser.add_argument("--compare", help="a report of another commit to compare with")
+    args = parser.parse_args()
+
+    try:
+        import resource
+        _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))  # a socket per bot
+    except (ImportError, ValueError, OSError):
+        pass
+
+    server = None
+    if args.server:
+        host, port = args.server.rsplit(":", 1)
+        address = (host, int(port))
+    else:
+        server, address = start_server()
+    try:
+        start = time.perf_counter()
+        results, samples = asyncio.run(load(address, args.profile, args.actions, args.think))
+        summary = report(results, samples, args, time.perf_counter() - start)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latency = summary["latency"] or {}
+    print(f"{summary['actions']} actions in {summary['duration_s']:.1f} s: {summary['throughput_per_s']:.0f}/s "
+          f"(peak {summary['peak_throughput_per_s']}/s), {summary['sessions']['peak']} sessions at peak")
+    print(f"{'action':>8} {'count':>8} {'p50 ms':>8} {'p99 ms':>8} {'p999 ms':>8} {'max ms':>8}")
+    for kind, figures in sorted(summary["by_action"].items()) + [("all", latency)]:
+        if figures:
+            print(f"{kind:>8} {figures['count']:>8} {figures['p50_ms']:>8.2f} {figures['p99_ms']:>8.2f} "
+                  f"{figures['p999_ms']:>8.2f} {figures['max_ms']:>8.2f}")
+    server_figures = summary["server"]
+    for label, key in [("memory KB/session", "memory_per_session_kb"), ("cpu us/action", "cpu_us_per_action"),
+                       ("cpu ms/session", "cpu_ms_per_session"), ("cpu %/session", "cpu_percent_per_session")]:
+        if server_figures[key] is not None:
+            print(f"{label:>18} {server_figures[key]:.3f}")
+    if summary["errors"]:
+        print("errors:", summary["errors"])
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(json.load(file), summary)
+
+
+if __name__ == "__main__":
+    main()
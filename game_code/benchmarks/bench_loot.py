@@ -0,0 +1,48 @@
+"""
+Benchmarks loot tables: drawing from the alias table should cost the same for any table size, unlike
+random.choices, which searches the cumulative weights on every draw.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_loot
+"""
+import argparse
+import random
+import time
+
+from game_code.entities.items.lore import Lore
+from game_code.systems.loot_table import LootTable, stream
+
+
+def run(size, draws, seed=0):
+    """
+    Draw from a table of random weights with the alias table and with random.choices.
+    :return: Nanoseconds per draw for both.
+    """
+    rng = random.Random(seed)
+    weights = [rng.randint(1, 100) for _ in range(size)]
+    table = LootTable((weight, Lore(f"log_{i}", "", weight=1, content="")) for i, weight in enumerate(weights))
+
+    start = time.perf_counter()
+    table.sample(stream(seed, "loot"), draws)
+    alias = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stream(seed, "loot").choices(range(size), weights, k=draws)
+    choices = time.perf_counter() - start
+    return alias / draws * 1e9, choices / draws * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 64, 4096, 262144])
+    parser.add_argument("--draws", type=int, default=1000000)
+    args = parser.parse_args()
+
+    print(f"{'entries':>8} {'alias ns':>9} {'choices ns':>11}")
+    for size in args.sizes:
+        alias, choices = run(size, args.draws)
+        print(f"{size:>8} {alias:>9.0f} {choices:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmarks list menus: opening a menu, turning a page and filtering should not depend on how many items are
+drawn, only on the page size and the matches.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_menu
+"""
+import argparse
+import curses
+import time
+
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.systems.list_menu import ListMenu
+
+
+def timed(ui, items, *keys):
+    """
+    Open a menu and press keys, drawing it again whenever it changes, as its ListScreen does.
+    :return: Milliseconds taken.
+    """
+    start = time.perf_counter()
+    menu = ListMenu(ui, items, "Pick an item:")
+    menu.lines()
+    for key in keys:
+        if menu.handle(key) == "changed":
+            menu.lines()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    args = parser.parse_args()
+
+    ui = HeadlessUI()
+    print(f"{'items':>7} {'open ms':>8} {'10 pages ms':>12} {'filter ms':>10}")
+    for size in args.sizes:
+        items = {f"fragment_{i}.log": i for i in range(size)}
+        opened = timed(ui, items)
+        pages = timed(ui, items, *[curses.KEY_NPAGE] * 10)
+        filtered = timed(ui, items, "/", "7", "7", "7")
+        print(f"{size:>7} {opened:>8.2f} {pages:>12.2f} {filtered:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmarks wandering monsters: the cost of a tick should follow the monsters that are due, and checking an exit
+for a blocker should cost the same however many monsters are in the room.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_monsters
+"""
+import argparse
+import random
+import timeit
+
+from game_code.entities.characters.monster import Monster
+from game_code.systems.monster_scheduler import MonsterScheduler
+from game_code.world.world_generator import WorldGenerator
+
+
+def run(monsters, rooms, ticks, seed=0):
+    """
+    Scatter wandering monsters over the loaded rooms of a generated world and tick them.
+    :return: Milliseconds per tick, monster moves per tick, and nanoseconds to check an exit with the index and
+    by scanning the room's monsters, in the busiest room.
+    """
+    world = WorldGenerator(rooms, seed=seed, cache_size=rooms)
+    world.build()
+    loaded = [world.resolve(world.room(i)) for i in range(rooms)]
+    scheduler = MonsterScheduler(world, seed=seed)
+    rng = random.Random(seed)
+    for i in range(monsters):
+        monster = Monster(f"drone_{i}", "", hp=100, max_hp=100, attack_power=10, reward=None)
+        scheduler.add(monster, rng.choice(loaded), rng.choice(("wander", "patrol")), period=rng.randint(1, 8),
+                      route=("north", "east", "south", "west"))
+
+    moves = 0
+
+    def tick():
+        nonlocal moves
+        moves += len(scheduler.tick())
+
+    tick_seconds = timeit.timeit(tick, number=ticks) / ticks
+
+    room = max(loaded, key=lambda room: len(room.monsters))
+    room.add_monster(Monster("guard", "", hp=100, max_hp=100, attack_power=10, reward=None,
+                             blocks_exit=next(iter(room.exits))))
+    direction = next(iter(room.exits))
+    lookups = 10000
+    index = timeit.timeit(lambda: room.blocker(direction), number=lookups) / lookups
+    scan = timeit.timeit(lambda: next((monster for monster in room.monsters.values()
+                                       if monster.blocks_exit == direction), None), number=lookups) / lookups
+    return tick_seconds * 1000, moves / ticks, index * 1e9, scan * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--monsters", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--rooms", type=int, default=2500)
+    parser.add_argument("--ticks", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'monsters':>9} {'tick ms':>8} {'moves/tick':>11} {'index ns':>9} {'scan ns':>9}")
+    for monsters in args.monsters:
+        tick_ms, moves, index_ns, scan_ns = run(monsters, args.rooms, args.ticks)
+        print(f"{monsters:>9} {tick_ms:>8.2f} {moves:>11.0f} {index_ns:>9.0f} {scan_ns:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmarks the bytes a remote session sends per action: changing rooms, updating the HUD and typing a log line.
+Each is compared with sending the whole screen on every refresh, as a renderer without a shadow framebuffer would.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_remote
+"""
+import argparse
+from collections import Counter
+
+from game_code.game import Game
+from game_code.systems.remote_ui import RemoteUI
+
+
+def run(height, width, compress, rounds):
+    """
+    Play each action several times in a remote session.
+    :return: Dictionary of action to (actions, bytes sent, bytes the whole screens would take).
+    """
+    sent, whole = Counter(), Counter()
+    action = None
+
+    def send(data):
+        sent[action] += len(data)
+        whole[action] += len(ui.screen.keyframe().encode("utf-8"))
+
+    ui = RemoteUI(send, height, width, compress)
+    ui.delay = lambda seconds: None
+    ui.set_typing_speed(0)
+    ui.start_screen()
+    game = Game(ui=ui)
+    player = game.player
+    player.set_current_room(game.world.build())
+    rooms = list(game.world.rooms.values())
+    ui.redraw_game(player.current_room, player)
+    ui.get_key()
+
+    counts = Counter()
+    for i in range(rounds):
+        action = "room change"
+        ui.redraw_game(rooms[i % len(rooms)], player)
+        ui.get_key()  # the game waits for the next key, which sends the frame
+        counts[action] += 1
+
+        action = "hud update"
+        player.hp -= 1
+        ui.draw_hud(player)
+        ui.get_key()
+        counts[action] += 1
+
+        action = "typed line"
+        ui.display_text(f"You take {i % 50} damage from the glitch_beast.", typing=True)
+        ui.get_key()
+        counts[action] += 1
+    return {name: (counts[name], sent[name], whole[name]) for name in counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--height", type=int, default=40)
+    parser.add_argument("--width", type=int, default=120)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    plain = run(args.height, args.width, False, args.rounds)
+    packed = run(args.height, args.width, True, args.rounds)
+    print(f"{'action':>12} {'whole screen B':>15} {'diff B':>8} {'diff+zlib B':>12}")
+    for name, (count, sent, whole) in plain.items():
+        print(f"{name:>12} {whole / count:>15.0f} {sent / count:>8.0f} {packed[name][1] / count:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmarks restart-to-playable latency: the time from choosing restart until the new run's room is drawn.
+A restart forks the cached world template, so it should stay far below the 50 ms budget however much the
+previous run changed. The old path built a new game, and in the terminal also set up curses again and
+replayed the typed intro, which takes seconds on its own.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_restart
+"""
+import argparse
+import time
+
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI
+
+BUDGET_MS = 50
+
+
+def play(game):
+    """
+    Change some state before restarting: take the items of the first room, walk on and get hurt.
+    :return: None
+    """
+    for item in list(game.player.current_room.items.values()):
+        game.ui.push_input("2")  # don't equip
+        game.take_item(item)
+    game.move("south")
+    game.player.hp -= 100
+
+
+def run(restarts):
+    """
+    Restart a game many times, and start as many new games the old way.
+    :return: Lists of milliseconds per restart and per new game.
+    """
+    game = Game(ui=HeadlessUI(), seed=0)
+    game.initialise_game()
+    restart_times = []
+    for _ in range(restarts):
+        play(game)
+        start = time.perf_counter()
+        game = game.restart()
+        game.initialise_game()
+        restart_times.append((time.perf_counter() - start) * 1000)
+
+    new_times = []
+    for _ in range(restarts):
+        start = time.perf_counter()
+        Game(ui=HeadlessUI(), seed=0).initialise_game()
+        new_times.append((time.perf_counter() - start) * 1000)
+    return restart_times, new_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--restarts", type=int, default=1000)
+    args = parser.parse_args()
+
+    restart_times, new_times = run(args.restarts)
+    print(f"{'path':>8} {'first ms':>9} {'median ms':>10} {'max ms':>7}")
+    for name, times in (("restart", restart_times), ("new game", new_times)):
+        ordered = sorted(times)
+        print(f"{name:>8} {times[0]:>9.3f} {ordered[len(ordered) // 2]:>10.3f} {ordered[-1]:>7.3f}")
+    print(f"restart within {BUDGET_MS} ms budget: {max(restart_times) < BUDGET_MS}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmarks save size, full save time, autosave (delta) time and load time on the stock world and on generated worlds.
+Generated worlds only save the rooms that are loaded, so a walk that changes every room it passes comes first.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_save
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.world.world_generator import WorldGenerator
+
+
+def new_game(path, size):
+    game = Game(ui=HeadlessUI(), save_path=path)
+    if size:
+        game.world = WorldGenerator(size, seed=0)
+    start = time.perf_counter()
+    game.initialise_game()
+    return game, time.perf_counter() - start
+
+
+def walk(game, steps, seed=0):
+    """
+    Take a random walk through a generated world, changing every room on the way so it has to be saved.
+    """
+    rng = random.Random(seed)
+    player = game.player
+    for _ in range(steps):
+        room = player.current_room
+        room.kernel_unlock = True
+        player.current_room = game.world.resolve(room.exits[rng.choice(sorted(room.exits))])
+
+
+def run(size, steps, folder):
+    """
+    Save a world, change one room and autosave it, then load it back.
+    :param size: Number of generated rooms, or 0 for the stock world.
+    :param steps: Length of the walk through a generated world before saving.
+    :return: Dictionary of measurements.
+    """
+    path = os.path.join(folder, f"save_{size}.bin")
+    game, build = new_game(path, size)
+    if size:
+        walk(game, steps)
+
+    start = time.perf_counter()
+    game.save()
+    save = time.perf_counter() - start
+
+    room = game.player.current_room
+    room.kernel_unlock = True
+    start = time.perf_counter()
+    game.saves.checkpoint(game)  # encodes on this thread, writes on the autosave thread
+    checkpoint = time.perf_counter() - start
+    game.saves.close()
+
+    _, load = new_game(path, size)  # builds the world and applies the save
+    return {
+        "rooms": size or len(game.world.rooms),
+        "saved": len(list(game.world.current_rooms())),
+        "size": os.path.getsize(path),
+        "delta": os.path.getsize(path + ".log"),
+        "save": save,
+        "checkpoint": checkpoint,
+        "load": load - build,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1000, 100000, 10000000])
+    parser.add_argument("--steps", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'rooms':>8} {'saved':>6} {'save bytes':>11} {'delta bytes':>12} {'save ms':>9} {'autosave ms':>12} {'load ms':>9}")
+    with tempfile.TemporaryDirectory() as folder:
+        for size in args.sizes:
+            result = run(size, args.steps, folder)
+            print(f"{result['rooms']:>8} {result['saved']:>6} {result['size']:>11} {result['delta']:>12} {result['save'] * 1000:>9.2f} "
+                  f"{result['checkpoint'] * 1000:>12.3f} {result['load'] * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmarks sharded worlds: sessions random-walk a generated world split over more and more worker processes.
+Throughput should grow close to linearly with the number of shards, up to the number of cores.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_shards
+"""
+import argparse
+import curses
+import functools
+import os
+import random
+import time
+
+from game_code.systems.sharding import ShardedWorld, cut_edges, partition
+from game_code.world.world_generator import WorldGenerator
+
+ARROWS = (curses.KEY_UP, curses.KEY_DOWN, curses.KEY_LEFT, curses.KEY_RIGHT)
+
+
+def run(size, shards, sessions, rounds, keys, seed=0):
+    """
+    Random-walk sessions through a world split into shards.
+    :return: Keys played per second, handoffs and exits cut by the partition.
+    """
+    factory = functools.partial(WorldGenerator, size, seed)
+    graph = WorldGenerator(size, seed).graph()
+    owner = partition(graph, shards)
+    world = ShardedWorld(factory, shards, owner)
+    try:
+        # start the sessions spread over the world, as players of a big world would be
+        rng = random.Random(seed)
+        ids = [world.join(f"p{i}", f"sector_{rng.randrange(size)}") for i in range(sessions)]
+        start = time.perf_counter()
+        for _ in range(rounds):
+            world.step({session: [rng.choice(ARROWS) for _ in range(keys)] for session in ids})
+        elapsed = time.perf_counter() - start
+        return sessions * rounds * keys / elapsed, world.handoffs, cut_edges(graph, owner)
+    finally:
+        world.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--shards", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--sessions", type=int, default=400)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--keys", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'shards':>7} {'keys/s':>9} {'speedup':>8} {'handoffs':>9} {'cut exits':>10}")
+    base = None
+    for shards in args.shards:
+        rate, handoffs, cut = run(args.size, shards, args.sessions, args.rounds, args.keys)
+        base = base or rate
+        print(f"{shards:>7} {rate:>9.0f} {rate / base:>8.2f} {handoffs:>9} {cut:>10}")
+
+
+if __name__ == "__main__":
+    main()
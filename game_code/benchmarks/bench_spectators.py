@@ -0,0 +1,100 @@
+"""
+Benchmarks spectator fan-out: the time the game's thread spends publishing each frame to hundreds of viewers,
+against encoding the frame separately for each viewer, with a shadow framebuffer per viewer.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_spectators
+"""
+import argparse
+import socket
+import time
+
+from game_code.entities.characters.player import Player
+from game_code.entities.room import Room
+from game_code.game import Game
+from game_code.systems.remote_ui import RemoteScreen, RemoteUI
+from game_code.systems.spectators import SpectatorHub
+
+
+def drain(clients):
+    for client in clients:
+        try:
+            while client.recv(1 << 20):
+                pass
+        except BlockingIOError:
+            pass
+
+
+def run(viewers, rounds):
+    """
+    Play a session with viewers watching, timing each publish and the same frames encoded for each viewer.
+    :return: Microseconds per frame for the hub and for per-viewer encoding, frames and resyncs.
+    """
+    ui = RemoteUI(lambda data: None, height=40, width=120)
+    ui.toggle_typing(False)
+    ui.start_screen()
+    hub = SpectatorHub(ui.screen)
+    pairs = [socket.socketpair() for _ in range(viewers)]
+    clients = [client for _, client in pairs]
+    for client in clients:
+        client.setblocking(False)
+    spectators = [hub.add(server) for server, _ in pairs]
+
+    naive = [socket.socketpair() for _ in range(viewers)]
+    naive_clients = [client for _, client in naive]
+    for server, client in naive:
+        server.setblocking(False)
+        client.setblocking(False)
+    screens = [RemoteScreen(server.send, 40, 120) for server, _ in naive]
+
+    frames, hub_time, naive_time = [], 0.0, 0.0
+    publish = hub.publish
+
+    def timed(frame):
+        nonlocal hub_time
+        start = time.perf_counter()
+        publish(frame)
+        hub_time += time.perf_counter() - start
+        frames.append(frame)
+
+    hub.publish = timed
+    player = Player(*Game.PLAYER)
+    for i in range(rounds):
+        ui.redraw_game(Room(f"room_{i % 11}", f"ROOM {i % 11}\n" + "~" * (i % 11 * 7)), player)
+        player.hp -= 1
+        ui.draw_hud(player)
+        ui.display_text(f"You take {i % 50} damage from the glitch_beast.")
+        ui.get_key()
+
+        start = time.perf_counter()
+        for screen in screens:
+            screen.rows = list(ui.screen.rows)
+            screen.dirty.update(range(screen.height))
+            screen.flush()
+        naive_time += time.perf_counter() - start
+        drain(clients)
+        drain(naive_clients)
+        hub.pump()
+
+    resyncs = sum(spectator.resyncs for spectator in spectators)
+    hub.close()
+    for server, client in naive + pairs:
+        server.close()
+        client.close()
+    return hub_time / len(frames) * 1e6, naive_time / rounds * 1e6, len(frames), resyncs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--viewers", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'viewers':>8} {'hub us/frame':>13} {'per viewer us':>14} {'encode each us/frame':>21} {'resyncs':>8}")
+    for viewers in args.viewers:
+        hub, naive, frames, resyncs = run(viewers, args.rounds)
+        print(f"{viewers:>8} {hub:>13.0f} {hub / viewers:>14.2f} {naive:>21.0f} {resyncs:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmarks startup: the time from launching Python until the welcome screen's first frame, and until the game is
+playable, for start.py and for game.py. Each launch runs with -X importtime, and the imports that finish before the
+first frame are reported, so a module that is imported eagerly again shows up here.
+The UI is headless, so the time curses takes to set up the terminal is not included.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_startup
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHILD = {
+    # start.py: the welcome is shown while the game loads in the background
+    "start": """
+from game_code.start import Loader
+ui = FrameUI()
+loader = Loader(ui, save_path=SAVE_PATH)
+loader.start()
+ui.print_welcome()
+game = loader.result()
+game.initialise_game()
+""",
+    # game.py: everything is imported and the world built before the welcome
+    "game": """
+from game_code.game import Game
+game = Game(ui=FrameUI(), save_path=SAVE_PATH)
+game.initialise_game()
+""",
+}
+
+PRELUDE = """
+import sys, time
+from game_code.systems.headless_ui import HeadlessUI
+
+def mark(name):
+    sys.stderr.write(f"@{name} {time.time()}\\n")  # one write, so lines of the loading thread stay whole
+
+class FrameUI(HeadlessUI):
+    def print_welcome(self):
+        mark("frame")
+
+SAVE_PATH = sys.argv[1]
+"""
+
+
+def launch(path, save_path):
+    """
+    Start one game in a new interpreter.
+    :return: Seconds to the first frame, seconds until playable, and the imports before the first frame as a list
+    of (microseconds, module).
+    """
+    code = PRELUDE + CHILD[path] + "mark('ready')\n"
+    start = time.time()
+    done = subprocess.run([sys.executable, "-X", "importtime", "-c", code, save_path],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    marks, imports = {}, []
+    for line in done.stderr.splitlines():
+        if line.startswith("@"):
+            name, when = line[1:].split()
+            marks[name] = float(when) - start
+        elif line.startswith("import time:") and "frame" not in marks:
+            own, _, module = line[len("import time:"):].split("|")
+            if own.strip().isdigit():
+                imports.append((int(own), module.strip()))
+    return marks["frame"], marks["ready"], imports
+
+
+def run(path, launches):
+    """
+    Launch a path several times.
+    :return: Median milliseconds to the first frame and until playable, and the imports of the last launch.
+    """
+    frames, readies = [], []
+    with tempfile.TemporaryDirectory() as folder:
+        for _ in range(launches):
+            frame, ready, imports = launch(path, os.path.join(folder, "save.bin"))
+            frames.append(frame * 1000)
+            readies.append(ready * 1000)
+    return statistics.median(frames), statistics.median(readies), imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--launches", type=int, default=9)
+    parser.add_argument("--top", type=int, default=5, help="slowest imports before the first frame to list")
+    parser.add_argument("--budget", type=float, help="fail if start.py's first frame takes longer (ms)")
+    args = parser.parse_args()
+
+    results = {path: run(path, args.launches) for path in CHILD}
+    print(f"{'path':>6} {'first frame ms':>15} {'playable ms':>12} {'imports ms':>11} {'modules':>8}")
+    for path, (frame, ready, imports) in results.items():
+        own = sum(us for us, _ in imports) / 1000
+        print(f"{path:>6} {frame:>15.1f} {ready:>12.1f} {own:>11.1f} {len(imports):>8}")
+
+    print("\nslowest imports before start.py's first frame:")
+    for us, module in sorted(results["start"][2], reverse=True)[:args.top]:
+        print(f"{us / 1000:>8.2f} ms  {module}")
+
+    if args.budget is not None and results["start"][0] > args.budget:
+        print(f"\nfirst frame is over the {args.budget} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmarks startup time and memory of generated worlds, which should depend on the rooms visited, not the world size.
+
+Run from the repository root:
+    python -m game_code.benchmarks.bench_world
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.world.world_generator import WorldGenerator
+
+
+def run(size, steps, seed=0):
+    """
+    Start a game in a generated world and take a random walk through it.
+    :return: Startup seconds, memory after startup, memory after the walk (bytes) and loaded rooms.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    game = Game(ui=HeadlessUI())
+    game.world = WorldGenerator(size, seed=seed)
+    game.initialise_game()
+    startup = time.perf_counter() - start
+    startup_memory = tracemalloc.get_traced_memory()[0]
+
+    rng = random.Random(seed)
+    player = game.player
+    for _ in range(steps):
+        room = player.current_room
+        player.current_room = game.world.resolve(room.exits[rng.choice(sorted(room.exits))])
+    walk_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return startup, startup_memory, walk_memory, len(game.world.loaded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 10000000])
+    parser.add_argument("--steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'rooms':>9} {'startup ms':>11} {'startup KiB':>12} {'walk KiB':>9} {'loaded':>7}")
+    for size in args.sizes:
+        startup, startup_memory, walk_memory, loaded = run(size, args.steps)
+        print(f"{size:>9} {startup * 1000:>11.2f} {startup_memory / 1024:>12.0f} {walk_memory / 1024:>9.0f} {loaded:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ class Character(Entity):
     A character in the game that has health and attack power.
     They can attack other characters and can be checked if they are alive or not.
     """
+    TRACKED = frozenset({"hp", "max_hp", "attack_power"})
 
     def __init__(self, name, description, hp, max_hp, attack_power):
         super().__init__(name, description)
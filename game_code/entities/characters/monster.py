@@ -1,3 +1,5 @@
+import copy
+
 from game_code.entities.character import Character
 
 
@@ -7,7 +9,24 @@ class Monster(Character):
     they can block exits and carry rewards for the player to pick up and use.
     """
 
-    def __init__(self, name, description, hp, max_hp, attack_power, reward, blocks_exit=None):
+    def __init__(self, name, description, hp, max_hp, attack_power, reward, blocks_exit=None, loot=None,
+                 behaviour=None, route=(), period=1, respawn=None):
         super().__init__(name, description, hp, max_hp, attack_power)
         self.reward = reward
         self.blocks_exit = blocks_exit # the exit that the monster blocks
+        self.loot = loot  # LootTable rolled for an extra drop when the monster is defeated
+        # how the monster moves around the world once the game schedules it, see MonsterScheduler.add
+        self.behaviour = behaviour  # None for monsters that stay where they were placed
+        self.route = tuple(route)
+        self.period = period
+        self.respawn = respawn
+
+    def copy(self):
+        """
+        Copies the monster (its hp changes in combat) along with its reward.
+        :return: The copy of the monster.
+        """
+        monster = copy.copy(self)
+        if self.reward:
+            monster.reward = self.reward.copy()
+        return monster
@@ -1,3 +1,5 @@
+import copy
+
 from game_code.entities.character import Character
 from game_code.entities.items.med import Med
 from game_code.entities.items.upgrade import Upgrade
@@ -9,17 +11,34 @@ class Player(Character):
     The user-controlled character, who can move through rooms,
     use items, pick up items and rewards, and engage combat with monsters.
     """
+    TRACKED = Character.TRACKED | {"current_room", "weight", "max_weight", "scannable",
+                                   "equipped_weapon", "equipped_med"}
 
     def __init__(self, name, description, hp, max_hp, attack_power):
         super().__init__(name, description, hp, max_hp, attack_power)
         self.current_room = None
-        self.storage = {}  # list of class Item
+        self.storage = {}  # item name to the item, or a stack of items of that name
         self.weight = 0
         self.equipped_med = None
         self.max_weight = 64
         self.scannable = False  # when true the player can read logs
         self.equipped_weapon = None  # what weapon the player is currently holding
 
+    def copy(self):
+        """
+        Copies the player and their storage, keeping the equipped items pointing at the copied ones.
+        The current room is left shared, so the forked world must resolve it to its own room.
+        :return: The copy of the player.
+        """
+        player = copy.copy(self)
+        player.tracker = None  # the copy is tracked once a game adopts it
+        player.storage = {name: item.copy() for name, item in self.storage.items()}
+        if self.equipped_weapon:
+            player.equipped_weapon = player.storage.get(self.equipped_weapon.name, self.equipped_weapon)
+        if self.equipped_med:
+            player.equipped_med = player.storage.get(self.equipped_med.name, self.equipped_med.copy())
+        return player
+
     def set_current_room(self, room):
         """
         Set the current room to where the player is moving to.
@@ -30,31 +49,52 @@ class Player(Character):
 
     def pick_up(self, item):
         """
-        Pick up an item and add it to the player's storage.
-        :param item: Item in which the player picks up.
+        Pick up an item and add it to the player's storage, stacking it with any item of the same name.
+        :param item: Item (or stack) in which the player picks up.
         :return: True if the item has been picked up, otherwise False (too heavy).
         """
+        stack = self.storage.get(item.name)
+        if stack is item:
+            return True  # already held, so nothing is added
+        weight = item.weight * item.count
         # check if the weight exceeds the storage capacity
-        if (self.weight + item.weight) > self.max_weight:
+        if (self.weight + weight) > self.max_weight:
             return False
-        self.storage[item.name] = item
-        self.weight += item.weight
+        if stack is not None:
+            stack.stack(item)
+        else:
+            if self.tracker is not None:
+                self.tracker.add(item, ("storage", item.name), self.storage)
+            self.storage[item.name] = item
+        self.weight += weight
 
-        if item.name in self.current_room.items:
-            self.current_room.remove_item(item)  # remove item from room
+        if self.current_room.items.get(item.name) is item:
+            self.current_room.remove_item(item)  # remove item from room, not a floor item of the same name
 
         return True
 
     def remove_item(self, item):
         """
-        Removes a specified item from storage and drops it in the current room.
-        If the player has an item equipped then it is unequipped first before removing it.
+        Removes one of a specified item from storage and drops it in the current room.
+        If the player has an item equipped then it is unequipped first before removing the last one.
         :param item: The item that will be removed from storage
         :return: The string message updating the user on the storage capacity or the item wasn't found.
         """
         add_to_room = True
         lines = []
-        if item.name in self.storage:
+        stack = self.storage.get(item.name)
+        if stack is not None and stack.count > 1:
+            # one item leaves the stack, which stays equipped; a spent med is replaced by the next one
+            prev_weight = self.weight
+            self.weight -= stack.weight
+            if getattr(stack, "uses", None) == 0:
+                stack.uses = stack.max_uses
+            elif not isinstance(stack, Upgrade):
+                self.current_room.add_item(stack.unit())
+            stack.count -= 1
+            return (f"{item.name} removed, {stack.count} left. \nCapacity updated: {prev_weight} - {stack.weight} --> "
+                    f"{self.weight}/{self.max_weight} bytes.\n")
+        if stack is not None:
             # unequip anything that is equipped
             if self.equipped_weapon:
                 if item.name == self.equipped_weapon.name:
@@ -71,7 +111,9 @@ class Player(Character):
             item_weight = self.storage[item.name].weight
             prev_weight = self.weight
             self.weight -= item_weight
-            self.storage.pop(item.name)
+            removed = self.storage.pop(item.name)
+            if self.tracker is not None:
+                self.tracker.remove(removed, ("storage", item.name), self.storage)
             if add_to_room:
                 self.current_room.add_item(item)  # add the item to the room
             lines.append(
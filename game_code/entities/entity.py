@@ -1,8 +1,41 @@
+from game_code.systems.asset_pack import AssetText
+
+
 class Entity:
     """
     An entity is any object that is in the game world where they have a name and a description.
+    Changes to the attributes listed in TRACKED are reported to the entity's tracker (such as the game's
+    StateHash) so it can stay up to date without walking the whole world.
+    The description can be an Asset, which keeps the text in the asset pack until it is shown.
     """
+    __slots__ = ()  # subclasses without __slots__ have a __dict__ as usual
+    TRACKED = frozenset()  # attributes that are part of the game state
+    OWNED = frozenset()  # tracked attributes holding entities that belong to this one
+    tracker = None
+    scope = ()
+    description = AssetText()
+
     def __init__(self, name, description=None):
         self.name = name
         self.description = description
 
+    def __setattr__(self, name, value):
+        if self.tracker is not None and name in self.TRACKED:
+            self.tracker.changed(self, name, self.tracked(name), value)
+        object.__setattr__(self, name, value)
+
+    def tracked(self, name):
+        """
+        The value of a tracked attribute, read without side effects such as a room loading its contents.
+        :return: The value, or None if it isn't set.
+        """
+        return self.__dict__.get(name)
+
+    def copy(self):
+        """
+        Returns a copy that is safe to hand to a forked game. Entities that never change after the world
+        is built are shared, so the default is the entity itself.
+        :return: The entity or a copy of it.
+        """
+        return self
+
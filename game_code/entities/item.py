@@ -1,15 +1,128 @@
+import copy
+import weakref
+
 from game_code.entities.entity import Entity
+from game_code.systems.asset_pack import Asset
+
+
+class Prototype:
+    """
+    The fields that every item of a kind with the same contents shares, such as its name, description and weight.
+    Prototypes are interned, so a million copies of the same med share one prototype and each copy only holds
+    its own uses.
+    """
+    __slots__ = ("kind", "fields", "__weakref__")
+    interned = weakref.WeakValueDictionary()
+
+    def __init__(self, kind, fields):
+        self.kind = kind
+        self.fields = fields
+
+    @classmethod
+    def of(cls, kind, fields):
+        """
+        The shared prototype for these fields, made the first time they are seen.
+        :param kind: The item class.
+        :param fields: Dictionary of field name to value.
+        :return: The Prototype.
+        """
+        key = (kind, tuple(fields.items()))
+        try:
+            prototype = cls.interned.get(key)
+        except TypeError:  # a field that can't be hashed, so the item gets a prototype of its own
+            return cls(kind, fields)
+        if prototype is None:
+            prototype = cls.interned[key] = cls(kind, fields)
+        return prototype
+
+    def replace(self, name, value):
+        """
+        The prototype with one field changed, leaving every other item of this prototype as it was.
+        :return: The Prototype.
+        """
+        return Prototype.of(self.kind, {**self.fields, name: value})
+
+    def __reduce__(self):
+        # a loaded or received item joins the prototypes of this process
+        return Prototype.of, (self.kind, self.fields)
+
+
+class Shared:
+    """
+    An item attribute that lives on the item's prototype. Setting it gives that one item a changed prototype.
+    Assets are decoded when read, as with AssetText.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, item, owner=None):
+        if item is None:
+            return self
+        value = item.prototype.fields[self.name]
+        return value.text() if isinstance(value, Asset) else value
+
+    def __set__(self, item, value):
+        object.__setattr__(item, "prototype", item.prototype.replace(self.name, value))
 
 
 class Item(Entity):
     """
     An item in the world with a specific weight,
     where the use method is overridden by a specified item type.
+    Items are flyweights: what never changes is kept on a shared Prototype, and the item itself only holds its
+    prototype, its place in the state hash and, for subclasses, the attributes listed in their __slots__.
+    An item can be a stack of count items of the same name, which weighs count times the item's weight.
     """
+    __slots__ = ("prototype", "tracker", "scope", "count")
+    TRACKED = frozenset({"count"})
+    name = Shared()
+    description = Shared()
+    weight = Shared()
+
+    def __init__(self, name, description, weight, **fields):
+        """
+        :param fields: The shared fields of a subclass, such as a weapon's damage.
+        """
+        object.__setattr__(self, "tracker", None)
+        object.__setattr__(self, "scope", ())
+        object.__setattr__(self, "count", 1)
+        object.__setattr__(self, "prototype", Prototype.of(
+            type(self), {"name": name, "description": description, "weight": weight, **fields}))
+
+    def copy(self):
+        """
+        Stacks change, so each fork needs its own; the copy shares the prototype, so it is only a few slots.
+        :return: A shallow copy of the item.
+        """
+        return copy.copy(self)
+
+    def unit(self):
+        """
+        A single item of this stack, e.g. one dropped from the player's storage. The stack itself is unchanged.
+        :return: The new, untracked item.
+        """
+        unit = copy.copy(self)
+        for name, value in (("tracker", None), ("scope", ()), ("count", 1)):
+            object.__setattr__(unit, name, value)
+        return unit
+
+    def stack(self, other):
+        """
+        Add another item (or stack) of the same name to this stack.
+        :param other: The item, which is left as it was.
+        :return: None
+        """
+        self.count += other.count
+
+    def tracked(self, name):
+        return getattr(self, name, None)
 
-    def __init__(self, name, description, weight):
-        super().__init__(name, description)
-        self.weight = weight
+    def __setstate__(self, state):
+        # copies and pickles restore the slots directly, as there is no tracker to tell yet
+        _, slots = state
+        for name, value in slots.items():
+            object.__setattr__(self, name, value)
 
     def use(self, player):
         """
@@ -1,12 +1,14 @@
-from game_code.entities.item import Item
+from game_code.entities.item import Item, Shared
 
 class Key(Item):
     """
     Defines keys for unlocking exits towards rooms in the game.
     """
+    __slots__ = ()
+    key_id = Shared()
+
     def __init__(self, name, description, weight, key_id):
-        super().__init__(name, description, weight)
-        self.key_id = key_id
+        super().__init__(name, description, weight, key_id=key_id)
 
     def use(self, player):
         """
@@ -46,25 +48,11 @@ class Key(Item):
 
 
         # used to unlock phantom node
-        # this node exits straight to the gatekeeper node from data well and updates the description
-        # to make it look like it appeared
+        # this node exits straight to the gatekeeper node from data well, and unlocking it reveals
+        # the exit in the room's description
         if self.key_id == "unlock_c0":
             if current_room.name == "boot_sector":
                 current_room.unlock_exit("east")
-                current_room.update_description(
-                    """
-| BOOT SECTOR |
-
-System booting...
-[ Initialising user shell ]
-[ Loading visual layer    ]
-[ Syncing input streams   ]
-
-A plain-looking room forms around you, like the world is still loading.
- Bits of code fall from the ceiling. Something small glints on the floor.
-
-Exits: NORTH -> Lost Cache, SOUTH -> Glitch Pit, EAST -> Phantom Node
-                    """)
                 return "A hidden doorway flickers open to the east...", "remove"
             return "The phantom key hums faintly, but nothing happens here.", "keep"
         return "The key hums faintly, but nothing happens here.", "keep"
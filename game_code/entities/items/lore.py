@@ -1,12 +1,14 @@
-from game_code.entities.item import Item
+from game_code.entities.item import Item, Shared
 
 class Lore(Item):
     """
     Log files in the game that reveals lore about the story.
     """
+    __slots__ = ()
+    content = Shared()
+
     def __init__(self, name, description, weight, content, req_scanner=False):
-        super().__init__(name, description, weight)
-        self.content = content
+        super().__init__(name, description, weight, content=content)
 
     def use(self, player):
         """
@@ -1,15 +1,38 @@
-from game_code.entities.item import Item
+from game_code.entities.item import Item, Shared
 
 
 class Med(Item):
     """
     Defines the heal item that the player can use to heal and raises their hp back to a certain level.
     """
+    __slots__ = ("uses",)
+    TRACKED = Item.TRACKED | {"uses"}
+    heal = Shared()
+    max_uses = Shared()
+
     def __init__(self, name, description, weight, heal, uses, max_uses):
-        super().__init__(name, description, weight)
-        self.heal = heal
+        super().__init__(name, description, weight, heal=heal, max_uses=max_uses)
         self.uses = uses
-        self.max_uses = max_uses
+
+    def unit(self):
+        """
+        A single, full med of this stack: only the med on top of a stack has been used.
+        :return: The new, untracked med.
+        """
+        unit = super().unit()
+        object.__setattr__(unit, "uses", self.max_uses)
+        return unit
+
+    def stack(self, other):
+        """
+        Add other meds to this stack, pooling their uses so every med but the one on top is full.
+        :param other: The med, which is left as it was.
+        :return: None
+        """
+        uses = self.uses + (self.count - 1) * self.max_uses + other.uses + (other.count - 1) * other.max_uses
+        count = max(1, -(-uses // self.max_uses))
+        self.count = count
+        self.uses = uses - (count - 1) * self.max_uses
 
     def use(self, player):
         """
@@ -1,13 +1,15 @@
-from game_code.entities.item import Item
+from game_code.entities.item import Item, Shared
 
 class Upgrade(Item):
     """
     Defines upgrades in the game that can enhance a players stats or change a certain state.
     This includes upgrading their HP and storage, as well as allowing the player to read logs.
     """
+    __slots__ = ()
+    upgrade_type = Shared()
+
     def __init__(self, name, description, weight, upgrade_type):
-        super().__init__(name, description, weight)
-        self.upgrade_type = upgrade_type
+        super().__init__(name, description, weight, upgrade_type=upgrade_type)
 
     def use(self, player):
         """
@@ -1,10 +1,12 @@
-from game_code.entities.item import Item
+from game_code.entities.item import Item, Shared
 
 
 class Weapon(Item):
     """
     Defines weapons that the player can use in the game against monsters.
     """
+    __slots__ = ()
+    damage = Shared()
+
     def __init__(self, name, description, weight, damage):
-        super().__init__(name, description, weight)
-        self.damage = damage
+        super().__init__(name, description, weight, damage=damage)
@@ -1,13 +1,30 @@
+import copy
+
 from game_code.entities.entity import Entity
+from game_code.systems.asset_pack import AssetText
 
 
 class Puzzle(Entity):
     """
     A puzzle placed in specific rooms in the game in which the player can solve and receive rewards from.
     """
-    def __init__(self, name, prompt, solution, reward=None, description=None):
+    TRACKED = frozenset({"solved"})
+    prompt = AssetText()
+
+    def __init__(self, name, prompt, solution, reward=None, description=None, loot=None):
         super().__init__(name, description)
         self.prompt = prompt
         self.solution = solution
         self.reward = reward
+        self.loot = loot  # LootTable rolled for an extra drop when the puzzle is solved
         self.solved = False
+
+    def copy(self):
+        """
+        Copies the puzzle (it can be solved) along with its reward.
+        :return: The copy of the puzzle.
+        """
+        puzzle = copy.copy(self)
+        if self.reward:
+            puzzle.reward = self.reward.copy()
+        return puzzle
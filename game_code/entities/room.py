@@ -1,20 +1,128 @@
+import copy
+
 from game_code.entities.entity import Entity
 
 
+class Monsters(dict):
+    """
+    The monsters in a room by name, which also keeps an index of the monster blocking each exit, so checking
+    an exit costs O(1) however many monsters are in the room. The index follows every change to the dictionary
+    (including rewinds and loads, which change it directly); a monster's blocks_exit must not change while it is
+    in a room.
+    """
+
+    def __init__(self, monsters=()):
+        super().__init__()
+        self.blockers = {}  # direction to the first monster (in room order) that blocks it
+        for name, monster in dict(monsters).items():
+            self[name] = monster
+
+    def __reduce__(self):
+        return Monsters, (dict(self),)
+
+    def __setitem__(self, name, monster):
+        old = self.get(name)
+        super().__setitem__(name, monster)
+        if old is not None:
+            self.unblock(old)
+        if monster.blocks_exit is not None:
+            self.blockers.setdefault(monster.blocks_exit, monster)
+
+    def __delitem__(self, name):
+        self.pop(name)
+
+    def pop(self, name, *default):
+        if name not in self:
+            return super().pop(name, *default)
+        monster = super().pop(name)
+        self.unblock(monster)
+        return monster
+
+    def clear(self):
+        super().clear()
+        self.blockers.clear()
+
+    def unblock(self, monster):
+        direction = monster.blocks_exit
+        if self.blockers.get(direction) is not monster:
+            return
+        del self.blockers[direction]
+        for other in self.values():  # only when a blocking monster leaves, which is rare
+            if other.blocks_exit == direction:
+                self.blockers[direction] = other
+                break
+
+
 class Room(Entity):
     """
     A room in the game which contains monsters, items, puzzles, and locked exits.
+    A room can also be a stub that only holds its name; its contents are loaded by its loader
+    the first time they are used (see WorldGenerator).
     """
+    TRACKED = frozenset({"kernel_unlock", "puzzle"})
+    OWNED = frozenset({"puzzle"})
+    CONTENTS = frozenset({"description", "locked", "exits", "items", "monsters", "puzzle", "locked_exits",
+                          "kernel_unlock", "description_updated", "exit_line"})  # attributes a stub loads on first use
 
     def __init__(self, name, description, locked=False, puzzle=None):
         super().__init__(name, description)
         self.locked = locked
         self.exits = {}  # Dictionary of Room entities
         self.items = {}  # List of items in the current room
-        self.monsters = {}  # monsters in the current room
+        self.monsters = Monsters()  # monsters in the current room
         self.puzzle = puzzle
         self.locked_exits = {}  # exits that are locked from the player
         self.kernel_unlock = False  # this check is for the last room
+        self.description_updated = False  # saves only keep descriptions that changed
+        self.exit_line = None  # cached "Exits: ..." line, cleared when the exits change
+
+    @classmethod
+    def stub(cls, name, loader):
+        """
+        Creates a room whose contents are loaded on first use.
+        :param name: The name of the room.
+        :param loader: Object with a materialize(room) method that fills in the room's contents.
+        :return: The room stub.
+        """
+        room = cls.__new__(cls)
+        room.__dict__.update(name=name, loader=loader)
+        return room
+
+    def __getattr__(self, name):
+        # only called for attributes that aren't set, which for a stub means its contents aren't loaded yet
+        loader = self.__dict__.get("loader")
+        if loader is None or name not in Room.CONTENTS or "exits" in self.__dict__:
+            raise AttributeError(name)
+        loader.materialize(self)
+        return getattr(self, name)
+
+    def is_stub(self):
+        return "exits" not in self.__dict__
+
+    def unload(self):
+        """
+        Turns the room back into a stub, dropping its contents; the room must be unchanged since it was loaded.
+        :return: None
+        """
+        for name in Room.CONTENTS:
+            self.__dict__.pop(name, None)
+        self.__dict__.pop("tracker", None)
+        self.__dict__.pop("scope", None)
+
+    def copy(self):
+        """
+        Copies the room's state so it can be changed without affecting other forks of the game.
+        The name, description and neighbouring rooms are shared; the contents are copied.
+        :return: The copy of the room.
+        """
+        room = copy.copy(self)
+        room.tracker = None  # the copy is tracked once a world adopts it
+        room.exits = dict(self.exits)
+        room.items = {name: item.copy() for name, item in self.items.items()}
+        room.monsters = Monsters({name: monster.copy() for name, monster in self.monsters.items()})
+        room.puzzle = self.puzzle.copy() if self.puzzle else None
+        room.locked_exits = dict(self.locked_exits)
+        return room
 
     def set_exit(self, direction, room):
         """
@@ -25,6 +133,7 @@ class Room(Entity):
         :return: None
         """
         self.exits[direction] = room
+        self.exit_line = None
 
     def get_exit(self, direction):
         return self.exits[direction]
@@ -32,9 +141,16 @@ class Room(Entity):
     def add_item(self, item):
         """
             Adds an item to the room.
-        :param item: The item that is added to the room.
+        :param item: The item that is added to the room, stacked with any item of the same name.
         :return: None
         """
+        stack = self.items.get(item.name)
+        if stack is not None:
+            if stack is not item:
+                stack.stack(item)
+            return
+        if self.tracker is not None:
+            self.tracker.add(item, ("item", self.name, item.name), self.items)
         self.items[item.name] = item
 
     def remove_item(self, item):
@@ -43,7 +159,9 @@ class Room(Entity):
         :param item: The item that is removed from the room.
         :return: None
         """
-        self.items.pop(item.name)
+        removed = self.items.pop(item.name)
+        if self.tracker is not None:
+            self.tracker.remove(removed, ("item", self.name, item.name), self.items)
 
     def remove_puzzle(self):
         """
@@ -58,6 +176,10 @@ class Room(Entity):
         :param monster: The Monster that is added.
         :return: None
         """
+        if self.tracker is not None:
+            if monster.name in self.monsters:
+                self.tracker.remove(self.monsters[monster.name], ("monster", self.name, monster.name), self.monsters)
+            self.tracker.add(monster, ("monster", self.name, monster.name), self.monsters)
         self.monsters[monster.name] = monster
 
     def remove_monster(self, monster):
@@ -66,14 +188,40 @@ class Room(Entity):
         :param monster: The monster that is removed.
         :return: None
         """
-        self.monsters.pop(monster.name)
+        removed = self.monsters.pop(monster.name)
+        if self.tracker is not None:
+            self.tracker.remove(removed, ("monster", self.name, monster.name), self.monsters)
+
+    def blocker(self, direction):
+        """
+        The monster blocking an exit.
+        :param direction: The direction of the exit.
+        :return: The monster, or None if the exit isn't blocked.
+        """
+        return self.monsters.blockers.get(direction)
 
     def describe(self):
         """
         Returns description of the room (including items and exits).
         :return: Description string.
         """
-        return self.description
+        exits = self.describe_exits()
+        if not exits:
+            return self.description
+        return f"{self.description.rstrip()}\n\n{exits}\n"
+
+    def describe_exits(self):
+        """
+        The line listing the room's exits, e.g. "Exits: NORTH -> Lost Cache". Exits to secret rooms
+        (rooms that start locked) are hidden until they are unlocked.
+        :return: The exit line, or an empty string if the room has no visible exits.
+        """
+        if self.exit_line is None:
+            visible = [f"{direction.upper()} -> {room.name.replace('_', ' ').title()}"
+                       for direction, room in self.exits.items()
+                       if not (direction in self.locked_exits and room.locked)]
+            self.exit_line = f"Exits: {', '.join(visible)}" if visible else ""
+        return self.exit_line
 
     def lock_exit(self, direction, lock_id):
         """
@@ -83,7 +231,10 @@ class Room(Entity):
         :param lock_id: The lock_id needed to unlock that exit.
         :return: None
         """
+        if self.tracker is not None:
+            self.tracker.lock_changed(self, direction, self.locked_exits.get(direction), lock_id)
         self.locked_exits[direction] = lock_id
+        self.exit_line = None
 
     def unlock_exit(self, direction):
         """
@@ -92,7 +243,10 @@ class Room(Entity):
         :return: None
         """
         if direction in self.locked_exits:
-            self.locked_exits.pop(direction)
+            lock_id = self.locked_exits.pop(direction)
+            self.exit_line = None
+            if self.tracker is not None:
+                self.tracker.lock_changed(self, direction, lock_id, None)
 
     def update_description(self, new_desc):
         """
@@ -101,4 +255,5 @@ class Room(Entity):
         :return: None
         """
         self.description = new_desc
+        self.description_updated = True
 
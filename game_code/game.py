@@ -1,7 +1,7 @@
 import logging
 import os
+import random
 import sys
-import time
 
 # adds the parent directory to the system path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -9,16 +9,48 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from game_code.entities.characters.player import Player
 from game_code.entities.items.med import Med
 from game_code.entities.items.weapon import Weapon
+from game_code.systems import loot_table
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.systems.monster_scheduler import MonsterScheduler
+from game_code.systems.rewind import Rewind
+from game_code.systems.save_manager import SaveError, SaveManager
+from game_code.systems.screens import Screen, ScreenStack
+from game_code.systems.state_hash import StateHash
 from game_code.systems.storage_handler import StorageHandler
 from game_code.systems.text_ui import TextUI
 from game_code.world.world_builder import WorldBuilder
-from game_code.systems.combat import Combat
+from game_code.systems.combat import Combat, CombatScreen
 from game_code.systems.menu import Menu
 from game_code.systems.input_handler import InputHandler
 from game_code.systems.puzzle_handler import PuzzleHandler
 from game_code.systems.movement import Movement
 
-logging.basicConfig(filename="game.log", level=logging.INFO)
+
+class GameScreen(Screen):
+    """
+    The room and HUD, where keys are the game's commands. It is at the bottom of the stack while the game is played,
+    and is redrawn when the screens opened on top of it close.
+    """
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.started = False
+
+    def shown(self):
+        if self.started:
+            self.ui.redraw_game(self.game.player.current_room, self.game.player)
+        self.started = True  # initialise_game has just drawn the room
+
+    def read(self):
+        self.ui.draw_hud(self.game.player)
+        return self.ui.get_key()
+
+    def handle(self, key):
+        self.game.input_handler.handle(key)
+        if self.game.scheduler is not None and key != -1:
+            self.game.tick_monsters()
+        if key == -1:
+            self.ui.delay(0.01)  # reduces cpu load while no key is pressed
 
 
 class Game:
@@ -30,81 +62,219 @@ class Game:
     ESCAPE_CHANCE = 0.6
     INTRO_DELAY = 5
     ROOM_DELAY = 2
-
-    def __init__(self):
-        self.player = Player("Lapel", "", 500, 500, 50)
-        self.ui = TextUI()
+    SAVE_FILE = "savegame.bin"
+    PLAYER = ("Lapel", "", 500, 500, 50)  # name, description, hp, max hp and attack power of a new player
+
+    def __init__(self, ui=None, seed=None, save_path=None):
+        self.seed = seed
+        self.save_path = save_path
+        self.player = Player(*self.PLAYER)
+        self.ui = ui if ui is not None else TextUI()
+        self.rng = random.Random(seed)  # per-game random stream so runs can be replayed from a seed
+        self.loot_rng = loot_table.stream(seed, "loot")  # drops replay from the seed whatever else is rolled
+        self.active_combat = None  # the combat that is currently waiting on the player
         self.world = WorldBuilder()
+        self.state_hash = StateHash()  # tracks the game state as it changes, see state_hash.py
+        self.rewind = Rewind(self.state_hash)
+        self.state_hash.listeners.append(self.rewind)
+        self.saves = SaveManager(save_path) if save_path else None  # autosaves after every move
+        if self.saves is not None:
+            self.state_hash.listeners.append(self.saves)
+        self.scheduler = None  # MonsterScheduler moving monsters after every key, if the world has any that move
         self.game_over = False
         self.menu = Menu(self.ui, self)
+        self.screens = ScreenStack(self)  # the menus and fights that are open, see screens.py
         self.input_handler = InputHandler(self)
         self.storage_handler = StorageHandler(self.ui, self)
         self.puzzle_handler = PuzzleHandler(self.ui, self.player, self)
         self.pause = False
         self.movement = Movement(self.ui, self)
+        self.template = None  # (world, start room, state hash) of a new run, which restarts fork, see restart
+        self.start_room = None  # set once the world is built, which start.py does while the intro is shown
+        self.intro = True  # whether initialise_game shows the welcome, unless it was shown before loading the game
+        self.on_restart = None  # called with the new game on a restart, e.g. so a control socket drives it instead
+
+    def fork(self):
+        """
+        Creates an independent copy of the game state for lookahead and "what if" play.
+        Rooms, items and monsters are shared until one side changes them, and the copy gets its own
+        headless UI, menu and handlers so it can be driven without touching the terminal.
+        :return: The forked game.
+        """
+        game = Game(ui=HeadlessUI())
+        game.world = self.world.fork()
+        game.player = self.player.copy()
+        game.puzzle_handler.player = game.player
+        game.rng.setstate(self.rng.getstate())
+        game.loot_rng.setstate(self.loot_rng.getstate())
+        game.game_over = self.game_over
+        game.state_hash = self.state_hash.copy()
+        game.state_hash.adopt_player(game.player)
+        game.world.state_hash = game.state_hash
+        game.rewind.state_hash = game.state_hash
+        game.state_hash.listeners.append(game.rewind)
+        if self.scheduler is not None:
+            game.scheduler = self.scheduler.fork(game.world, game.player)
+
+        # both games stopped owning their rooms, so the rooms the players stand in are re-resolved
+        for owner in (self, game):
+            room = owner.world.resolve(self.player.current_room)
+            owner.player.current_room = room
+            if self.active_combat is not None:
+                owner.active_combat = Combat(owner.ui, owner.player, room.monsters[self.active_combat.monster.name],
+                                             owner)
+        return game
 
     def run(self):
         """
         Entry point for the game and handles the UI lifecycle safely.
-        :return: The game over menu if the player dies, or a result in which the player can quit or restart the game.
+        Restarts are played in the same screen session instead of setting up the terminal again, see restart.
+        :return: "quit" once the player quits.
         """
         self.ui.start_screen()
         try:
-            result = self.play()
-            if result:
-                return result
-
-            if self.game_over and not self.player.is_alive():
-                logging.info("Player dies")
-                return self.menu.game_over_menu()  # return the menu for when the player dies
+            game = self
+            while game.play_through() == "restart":
+                game = game.restart()
             return "quit"
         finally:
             self.ui.stop_screen()
 
+    def play_through(self):
+        """
+        Play the run until the player quits, restarts or dies.
+        :return: The result of the game over menu if the player dies, otherwise "restart" or "quit".
+        """
+        result = self.play()
+        if not result and self.game_over and not self.player.is_alive():
+            logging.info("Player dies")
+            result = self.menu.game_over_menu()  # return the menu for when the player dies
+
+        if self.saves is not None:
+            if result == "restart" or self.game_over:
+                self.saves.delete()  # a new run starts from scratch
+            else:
+                self.saves.close()  # finish writing queued autosaves
+        return result or "quit"
+
+    def restart(self):
+        """
+        A new run that keeps this game's UI, so the curses session stays open, and skips the intro.
+        Its world is forked from a pristine template that is built on the first restart. Forking costs O(1) and
+        the new run only copies the rooms it changes, so a restart costs O(changed state) instead of a new build.
+        :return: The new game, which is set up when it is played.
+        """
+        logging.info("User starts a new game")
+        game = Game(ui=self.ui, seed=self.seed, save_path=self.save_path)
+        game.template = self.pristine()
+        game.on_restart = self.on_restart
+        if self.on_restart is not None:
+            self.on_restart(game)
+        return game
+
+    def pristine(self):
+        """
+        The state of a new run, built once and shared by every restart after it. It is never played itself.
+        :return: Tuple of the built world, its start room and the state hash of a new player standing in it.
+        """
+        if self.template is None:
+            world = self.world.new()
+            start_room = world.build()
+            player = Player(*self.PLAYER)
+            player.set_current_room(start_room)
+            self.template = (world, start_room, StateHash(self.state_hash.size * 8).compute(player, world))
+        return self.template
+
     def play(self):
         """
-        Main game loop that plays the game and constantly checks if the user has paused the game.
-        :return: None
+        Main game loop, which reads keys for the screen on top of the screen stack until the game is over
+        or the player restarts or quits from the pause menu.
+        :return: "restart" or "quit", or None if the game is over.
         """
         self.initialise_game()
-
-        while not self.game_over:
-            # check for pause
-            if self.pause:
-                # get pause menu
-                action = self.menu.pause_menu()
-                logging.info("User pauses the game")
-
-                # handle menu's return value
-                if action == "restart":
-                    logging.info("User restarts the game")
-                    return "restart"  # exit the play method to immediately restart the game
-                elif action == "quit":
-                    logging.info("User quits the game")
-                    return "quit"  # exit the play method to quit the game
-                # if there's no action, the game is resumed
-
-            self.ui.draw_hud(self.player)
-            key = self.ui.get_key()
-            self.input_handler.handle(key)
-            time.sleep(0.01) # reduces cpu load
-        return None
+        return self.screens.run(GameScreen(self))
 
     def initialise_game(self):
         """
-        Set up the game world and display intro.
+        Set up the game world and display intro. A restarted game forks its world from the template instead
+        and goes straight to the room.
         :return: None
         """
-        start_room = self.world.build()
-        self.player.set_current_room(start_room)
-        self.ui.print_welcome()
-        self.ui.wait_to_start_game()
+        restored = False
+        if self.template is not None:
+            self.fork_template()
+        else:
+            self.player.set_current_room(self.build_world())
+            restored = self.restore()
+            self.state_hash.track(self.player, self.world)
+            if self.intro:
+                self.ui.print_welcome()
+                self.ui.wait_to_start_game()
+        self.scheduler = MonsterScheduler.for_world(self.world, self.player, self.seed)  # where the save left them
         self.ui.draw_room(self.player.current_room.describe())
         self.ui.draw_hud(self.player)
         self.ui.clear_logs()
+        if restored:
+            self.ui.display_text("Checkpoint restored.")
         self.ui.display_text("Press '/' for available commands.")
         self.ui.display_text("Hint: use arrow keys to move and [R] to scan room.")
 
+    def build_world(self):
+        """
+        Build the world, unless it was built ahead of time.
+        :return: The start room.
+        """
+        if self.start_room is None:
+            self.start_room = self.world.build()
+        return self.start_room
+
+    def fork_template(self):
+        """
+        Start from a fork of the template world, taking its state hash instead of walking the world.
+        :return: None
+        """
+        world, start_room, value = self.template
+        self.world = world.fork()
+        self.world.state_hash = self.state_hash
+        self.state_hash.value = value
+        self.player.set_current_room(self.world.resolve(start_room))  # the start room is copied, and tracked
+        self.state_hash.adopt_player(self.player)
+
+    def restore(self):
+        """
+        Load the saved run, if there is one, into the freshly built world.
+        :return: True if a save was loaded, otherwise False.
+        """
+        if self.saves is None:
+            return False
+        try:
+            restored = self.saves.load(self)
+        except (SaveError, OSError) as error:
+            logging.warning(f"Could not load save: {error}")
+            self.saves.delete()
+            return False
+        if restored:
+            logging.info("Save loaded")
+        return restored
+
+    def save(self):
+        """
+        Write a full save of the current run.
+        :return: None
+        """
+        if self.saves is not None:
+            self.saves.save(self)
+            logging.info("Game saved")
+
+    def tick_monsters(self):
+        """
+        Let the scheduled monsters act, telling the player about any that come into their room.
+        :return: None
+        """
+        for monster, _, room in self.scheduler.tick():
+            if room is self.player.current_room:
+                self.ui.display_text(f"{monster.name} wanders in.")
+
     def move(self, direction):
         """
         Move player in the specified direction.
@@ -112,6 +282,8 @@ class Game:
         """
         if self.movement.try_move(self.player, direction):
             logging.info(f"Player moved {direction} to {self.player.current_room.name}")
+            if self.saves is not None:
+                self.saves.checkpoint(self)
             self.ui.clear()
             self.ui.draw_room(self.player.current_room.describe())
 
@@ -124,15 +296,15 @@ class Game:
 
         self.ui.display_text("Scanning", end="")
         for i in range(3):
-            time.sleep(0.5)
+            self.ui.delay(0.5)
             self.ui.display_text(".", end="")
         self.ui.display_text("\n", False)
-        time.sleep(0.5)
+        self.ui.delay(0.5)
 
         if not room.items and not room.monsters and not room.puzzle:
             self.ui.clear_logs()
             self.ui.display_text("The room reveals nothing unusual.")
-            time.sleep(1)
+            self.ui.delay(1)
             self.ui.clear_logs()
             return
 
@@ -179,48 +351,30 @@ class Game:
             self.ui.display_text("There are no items to pick up.")
             return
 
-        selections = self.menu.item_menu(room.items, "Pick an item:")
-
-        key = self.ui.wait_for_key()
-        self.choose_item(key, selections)
+        self.menu.item_menu(room.items, "Pick an item:", self.take_item)
 
-    def choose_item(self, key, selections):
+    def take_item(self, item):
         """
-        Pick the item that the player chooses using a key.
-        :param key: The key that the user presses.
-        :param selections: The items that can be selected.
+        Pick up the item the player chose from the room.
         :return: None
         """
-        if key == "ESC":
-            self.menu.pause_menu()
-
-        # check for valid item selection
-        if key in selections:
-            self.ui.clear_logs()
-            chosen_item = selections[key]
-            picked_up = self.player.pick_up(chosen_item)
-
-            self.decide_pick_up(picked_up, chosen_item)
-            return  # exit menu after inspecting
-
-        # check for exit command
-        if key == "b":
-            self.ui.clear_logs()
-            return
+        self.ui.clear_logs()
+        picked_up = self.player.pick_up(item)
+        self.decide_pick_up(picked_up, item)
 
     def decide_pick_up(self, picked_up, item):
         prev_weight = self.player.weight
         if not picked_up:
             self.ui.display_text(f"{item.name} is too heavy to carry.")
-            time.sleep(1)
+            self.ui.delay(1)
             self.ui.clear_logs()
             self.player.current_room.add_item(item)
             self.ui.display_text(f"{item.name} has fallen to the floor.")
         elif picked_up:
             self.ui.display_text(f"{item.name} added to storage.")
-            self.ui.display_text(f"Storage: {prev_weight} + {item.weight} --> "
+            self.ui.display_text(f"Storage: {prev_weight} + {item.weight * item.count} --> "
                                  f"{self.player.weight}/{self.player.max_weight} bytes")
-            time.sleep(1)
+            self.ui.delay(1)
             self.ui.clear_logs()
             logging.info(f"Player picked up {item.name}")
 
@@ -248,7 +402,7 @@ class Game:
                     elif key == "2":
                         self.ui.clear_logs()
                         break
-                    time.sleep(0.01)
+                    self.ui.delay(0.01)
 
     def heal_player(self):
         """
@@ -291,9 +445,25 @@ class Game:
             return
 
         monster = room.monsters[monster_name]
-        battle = Combat(self.ui, self.player, monster, self)
+        self.active_combat = Combat(self.ui, self.player, monster, self)
         logging.info("Player starts fight")
-        battle.start()
+        self.screens.open(CombatScreen(self, self.active_combat))  # clears active_combat when the fight ends
+
+    def undo(self, steps=1):
+        """
+        Rewind the last actions, such as dropping a key by mistake or a failed retreat.
+        :param steps: The number of actions to rewind.
+        :return: None
+        """
+        undone = self.rewind.undo(steps, self.world)
+        if not undone:
+            self.ui.display_text("Nothing to rewind.")
+            return
+
+        self.game_over = not self.player.is_alive()
+        self.ui.redraw_game(self.player.current_room, self.player)
+        self.ui.display_text(f"Rewound: {', '.join(undone)}")
+        logging.info(f"Player rewinds {len(undone)} action(s)")
 
     def do_use(self, item):
         """
@@ -327,16 +497,11 @@ class Game:
 
 def main():
     """
-    Main entry point for the game.
+    Main entry point for the game. start.py starts faster, by loading the game while the intro is shown.
     """
-    while True:
-        logging.info("User starts a new game")
-        game = Game()
-        result = game.run()
-
-        if result == "quit":
-            break
-        time.sleep(0.01)
+    logging.basicConfig(filename="game.log", level=logging.INFO)
+    logging.info("User starts a new game")
+    Game(save_path=Game.SAVE_FILE).run()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,99 @@
+"""
+Starts the game with the welcome screen drawn as soon as the terminal is set up. Only curses, argparse and the text
+UI are imported before the first frame; the rest of the game is imported, and its world built, on a background thread
+while the intro is typed.
+
+Run from the repository root, optionally recording the run (see systems/recorder.py) or letting tools drive it
+over a Unix socket (see systems/control.py):
+    python game_code/start.py [--record game.cast] [--control game.sock]
+"""
+import argparse
+import os
+import sys
+import threading
+
+# adds the parent directory to the system path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_code.systems.text_ui import TextUI
+
+
+class Loader(threading.Thread):
+    """
+    Imports the game modules, sets up logging and builds the world in the background.
+    """
+
+    def __init__(self, ui, save_path=None, log_file=None):
+        """
+        :param ui: The UI the game will be played in, which is showing the intro meanwhile.
+        :param save_path: The save file, Game.SAVE_FILE by default.
+        :param log_file: The file to log to, if any.
+        """
+        super().__init__(daemon=True)
+        self.ui = ui
+        self.save_path = save_path
+        self.log_file = log_file
+        self.game = None
+        self.error = None  # raised in the thread that waits for the game
+
+    def run(self):
+        try:
+            import logging
+            from game_code.game import Game
+
+            if self.log_file is not None:
+                logging.basicConfig(filename=self.log_file, level=logging.INFO)
+            logging.info("User starts a new game")
+            game = Game(ui=self.ui, save_path=self.save_path or Game.SAVE_FILE)
+            game.build_world()
+            game.intro = False  # shown while loading
+            self.game = game
+        except BaseException as error:
+            self.error = error
+
+    def result(self):
+        """
+        Wait for the game to be loaded.
+        :return: The game, ready to play.
+        """
+        self.join()
+        if self.error is not None:
+            raise self.error
+        return self.game
+
+
+def main():
+    """
+    Fast entry point for the game, which plays the same as game.main.
+    """
+    parser = argparse.ArgumentParser(description="Play the game in the terminal.")
+    parser.add_argument("--record", metavar="PATH", help="record the run as an asciicast")
+    parser.add_argument("--control", metavar="PATH", help="let tools drive the game over this Unix socket")
+    args = parser.parse_args()
+    ui = TextUI()
+    ui.start_screen()
+    recorder = control = None
+    try:
+        if args.record is not None:
+            from game_code.systems.recorder import record
+            recorder = record(ui, args.record)
+        loader = Loader(ui, log_file="game.log")
+        loader.start()
+        ui.print_welcome()
+        ui.wait_to_start_game()
+        game = loader.result()
+        if args.control is not None:
+            from game_code.systems.control import ControlServer
+            control = ControlServer(game, args.control)
+            control.start()
+        game.run()
+    finally:
+        ui.stop_screen()
+        if recorder is not None:
+            recorder.close()
+        if control is not None:
+            control.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Compiles the game's text (room descriptions, ASCII art, lore, puzzle prompts and descriptions) into one pack file
+and reads it back through mmap. The pack is built when the game is packaged, and never written into the package
+at runtime; without an up-to-date pack, e.g. in a checkout, one is compiled into the user's cache folder.
+
+Run from the repository root to rebuild the pack:
+    python -m game_code.systems.asset_pack
+"""
+import mmap
+import os
+import struct
+from functools import lru_cache
+
+ASSET_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+SOURCE_PATH = os.path.join(ASSET_FOLDER, "world.txt")
+PACK_PATH = os.path.join(ASSET_FOLDER, "world.pack")
+CACHE_FOLDER = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                            "game_code")
+CACHE_PATH = os.path.join(CACHE_FOLDER, "world.pack")
+
+MAGIC = b"CLAP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHxxI")  # magic, version, number of assets
+ENTRY = struct.Struct("<IIH")  # text offset, text length, id length; followed by the id
+
+
+class Asset:
+    """
+    A reference to a text in a pack, which entities hold instead of the text itself.
+    """
+    __slots__ = ("pack", "asset_id")
+
+    def __init__(self, pack, asset_id):
+        self.pack = pack
+        self.asset_id = asset_id
+
+    def text(self):
+        return self.pack.text(self.asset_id)
+
+    def __repr__(self):
+        return f"Asset({self.asset_id!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, Asset) and (self.pack.path, self.asset_id) == (other.pack.path, other.asset_id)
+
+    def __hash__(self):
+        return hash((self.pack.path, self.asset_id))
+
+    def __reduce__(self):
+        # another process maps the same pack file instead of receiving the text
+        return open_asset, (self.pack.path, self.asset_id)
+
+
+class AssetText:
+    """
+    An entity attribute holding text or an Asset, which is decoded from the pack each time it is read
+    so only text that is shown is ever decoded.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, entity, owner=None):
+        if entity is None:
+            return self
+        try:
+            value = entity.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+        return value.text() if isinstance(value, Asset) else value
+
+    def __set__(self, entity, value):
+        entity.__dict__[self.name] = value
+
+
+class AssetPack:
+    """
+    A read-only, memory-mapped pack of texts. Only the index is read when the pack is opened; texts are
+    decoded when asked for, and every process that opens the same pack shares its pages in the page cache.
+    """
+
+    def __init__(self, path, data=None):
+        """
+        :param path: The pack file, or None for a pack compiled in memory.
+        :param data: The bytes of a pack compiled in memory, see pack_bytes.
+        """
+        self.path = path
+        if data is None:
+            with open(path, "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = data
+        magic, version, count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} asset pack")
+
+        self.index = {}  # asset id to (offset, length)
+        pos = HEADER.size
+        for _ in range(count):
+            offset, length, id_length = ENTRY.unpack_from(self.data, pos)
+            pos += ENTRY.size
+            self.index[self.data[pos:pos + id_length].decode("utf-8")] = (offset, length)
+            pos += id_length
+
+    def text(self, asset_id):
+        offset, length = self.index[asset_id]
+        return self.data[offset:offset + length].decode("utf-8")
+
+    def __contains__(self, asset_id):
+        return asset_id in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+
+def parse_source(text):
+    """
+    Split an asset source file into its texts. Each text starts after a line "@@ <asset id>" and runs until the
+    next one, and lines before the first asset are comments.
+    :param text: The contents of the source file.
+    :return: Dictionary of asset id to text.
+    """
+    assets = {}
+    asset_id, lines = None, []
+    for line in text.removesuffix("\n").split("\n"):
+        if line.startswith("@@ "):
+            if asset_id is not None:
+                assets[asset_id] = "\n".join(lines)
+            asset_id, lines = line[3:].strip(), []
+        elif asset_id is not None:
+            lines.append(line)
+    if asset_id is not None:
+        assets[asset_id] = "\n".join(lines)
+    return assets
+
+
+def pack_bytes(assets):
+    """
+    Lay texts out as a pack.
+    :param assets: Dictionary of asset id to text.
+    :return: The pack's bytes.
+    """
+    ids = [asset_id.encode("utf-8") for asset_id in assets]
+    texts = [text.encode("utf-8") for text in assets.values()]
+    offset = HEADER.size + sum(ENTRY.size + len(asset_id) for asset_id in ids)
+
+    index = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, len(ids)))
+    for asset_id, text in zip(ids, texts):
+        index += ENTRY.pack(offset, len(text), len(asset_id)) + asset_id
+        offset += len(text)
+    return bytes(index) + b"".join(texts)
+
+
+def compile_pack(assets, path):
+    """
+    Write texts into a pack file, atomically so processes that have the old pack open are unaffected.
+    :param assets: Dictionary of asset id to text.
+    :param path: Where to write the pack.
+    :return: None
+    """
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as file:
+        file.write(pack_bytes(assets))
+    os.replace(temp, path)
+
+
+def fresh(path, source):
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source)
+
+
+@lru_cache(maxsize=None)
+def open_pack(path):
+    """
+    Open a pack; each process maps a pack file once.
+    :return: The AssetPack.
+    """
+    return AssetPack(path)
+
+
+@lru_cache(maxsize=None)
+def load_pack(source=SOURCE_PATH, path=PACK_PATH, cache=CACHE_PATH):
+    """
+    Open the pack built next to its source (see main), which is only read. If it is missing or older than the
+    source, the pack is compiled into the cache instead, or into memory if the cache can't be written.
+    :return: The AssetPack.
+    """
+    if fresh(path, source):
+        return open_pack(path)
+    if fresh(cache, source):
+        return open_pack(cache)
+    with open(source, encoding="utf-8") as file:
+        assets = parse_source(file.read())
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        compile_pack(assets, cache)
+    except OSError:
+        return AssetPack(None, pack_bytes(assets))
+    return open_pack(cache)
+
+
+def open_asset(path, asset_id):
+    # a pack compiled in memory is compiled again by the process that unpickles its assets
+    return Asset(load_pack() if path is None else open_pack(path), asset_id)
+
+
+def asset(asset_id):
+    """
+    Reference a text of the stock world's pack.
+    :param asset_id: The asset id, such as "room/boot_sector".
+    :return: The Asset.
+    """
+    pack = load_pack()
+    if asset_id not in pack:
+        raise KeyError(f"unknown asset {asset_id!r}")
+    return Asset(pack, asset_id)
+
+
+def main():
+    with open(SOURCE_PATH, encoding="utf-8") as file:
+        assets = parse_source(file.read())
+    compile_pack(assets, PACK_PATH)
+    print(f"Compiled {len(assets)} assets into {PACK_PATH}")
+
+
+if __name__ == "__main__":
+    main()
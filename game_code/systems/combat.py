@@ -1,5 +1,6 @@
-import time
-from random import random
+import random
+
+from game_code.systems.screens import Screen
 
 
 class Combat:
@@ -8,9 +9,10 @@ class Combat:
     It features a turn-based combat a player can choose to attack the monster, heal themselves, or escape
     (where they only have a 60% chance of escaping).
     If the player dies, the game is over and if the monster dies, the player receives their reward (if the monster
-    has one)
+    has one). Turns are played by a CombatScreen, one per key.
     """
     ESCAPE_CHANCE = 0.6
+    ACTIONS = {"1": "attack", "2": "heal", "3": "retreat"}
 
     def __init__(self, ui, player, monster, game):
         self.ui = ui
@@ -18,34 +20,30 @@ class Combat:
         self.monster = monster
         self.game = game
 
-    def start(self):
+    def take_turn(self, action):
         """
-        Runs the combat loop in which the player can choose an action every turn.
-        :return: string "retreat" if the player is able to leave the combat early otherwise None.
+        Plays a single round of combat with the chosen action, where the monster strikes back if it survives.
+        :param action: The string action "attack", "heal" or "retreat".
+        :return: string "retreat" if the player escaped otherwise None.
         """
-        self.display_start()
-
-        while self.player.is_alive() and self.monster.is_alive():
-            healed = True
-            action = self.get_action()
-            self.ui.clear_logs()
-
-            if action == "retreat":
-                if self.attempt_retreat(): return "retreat"
-                continue
-            elif action == "heal":
-                healed = self.game.heal_player()
-            elif action == "attack":
-                self.execute_player_attack()
+        healed = True
+        self.ui.clear_logs()
+        if self.game:
+            self.game.rewind.mark(f"{action} {self.monster.name}")
 
-            if self.monster.is_alive() and healed:
-                self.execute_monster_attack()
+        if action == "retreat":
+            if self.attempt_retreat(): return "retreat"
+            return None
+        elif action == "heal":
+            healed = self.game.heal_player()
+        elif action == "attack":
+            self.execute_player_attack()
 
-            self.ui.display_text(f"{self.monster.name} HP: {self.monster.hp}/{self.monster.max_hp}")
-            self.ui.display_text(f"Your HP: {self.player.hp}/{self.player.max_hp}")
-            time.sleep(0.01)
+        if self.monster.is_alive() and healed:
+            self.execute_monster_attack()
 
-        self.handle_combat_end(self.monster, self.player.current_room)
+        self.ui.display_text(f"{self.monster.name} HP: {self.monster.hp}/{self.monster.max_hp}")
+        self.ui.display_text(f"Your HP: {self.player.hp}/{self.player.max_hp}")
         return None
 
     def display_start(self):
@@ -58,25 +56,23 @@ class Combat:
         self.ui.display_text(f"{self.monster.name} HP: {self.monster.hp}/{self.monster.max_hp}")
         self.ui.display_text(f"Your HP: {self.player.hp}/{self.player.max_hp}")
 
-    def get_action(self):
+    def show_actions(self):
         """
-        This allows the user to choose an action according to the three options.
-        :return: The string message action that the user chooses.
+        Show the actions the player can choose from.
+        :return: None
         """
         self.ui.display_text("\nChoose your action:")
         self.ui.display_text("[1] Attack\n[2] Heal\n[3] Retreat")
 
-        while True:
-            key = self.ui.wait_for_key()
-            if key == "1": return "attack"
-            if key == "2": return "heal"
-            if key == "3": return "retreat"
-            if key == -1: continue
-            time.sleep(0.01)
+    def is_over(self):
+        """
+        :return: True once the player or the monster has no HP left.
+        """
+        return not (self.player.is_alive() and self.monster.is_alive())
 
     def execute_player_attack(self):
         """
-        Player attacks the monster in the combat loop and displays the damage given.
+        Player attacks the monster in a combat turn and displays the damage given.
         :return: None
         """
         dmg = self.player.attack(self.monster)
@@ -85,7 +81,7 @@ class Combat:
 
     def execute_monster_attack(self):
         """
-        Monster attack the player in the combat loop and displays the damage given.
+        Monster attack the player in a combat turn and displays the damage given.
         :return:
         """
         dmg = self.monster.attack(self.player)
@@ -97,7 +93,8 @@ class Combat:
         Using the constant ESCAPE_CHANCE, the player attempts to retreat with a 60% chance.
         :return: True if the escape happens, False otherwise.
         """
-        if random() < self.ESCAPE_CHANCE:
+        rng = self.game.rng if self.game else random
+        if rng.random() < self.ESCAPE_CHANCE:
             self.ui.display_text(f"You escaped! {self.monster.name} growls in frustration.")
             return True
         self.ui.display_text("Escape failed!")
@@ -110,30 +107,83 @@ class Combat:
         the reward is given to the player.
         :return: None
         """
-        time.sleep(2)
+        self.ui.delay(2)
         self.ui.clear_logs()
 
         if monster.hp == 0:
             self.ui.display_text(f"{monster.name} has fallen.")
-            self.handle_monster_reward(monster)
             room.remove_monster(monster)
+            self.handle_monster_reward(monster)
 
         if self.player.hp == 0:
             self.ui.clear_logs()
             self.ui.display_text("The pixels fade to black...")
             self.game.game_over = True
-            time.sleep(3)
+            self.ui.delay(3)
 
     def handle_monster_reward(self, monster):
         """
         Checks if the monster has a reward, and if so, allow the player to pick up the reward. If it isn't picked up,
-        then the item falls to the floor and is added to the room items.
+        then the item falls to the floor and is added to the room items. The monster's loot table, if it has one,
+        is then rolled from the game's loot stream for an extra drop.
         :return: None
         """
-        if not monster.reward:
-            return
+        rewards = [monster.reward]
+        if monster.loot is not None and self.game:
+            rewards.append(monster.loot.drop(self.game.loot_rng))
+
+        for reward in rewards:
+            if not reward:
+                continue
+            self.ui.display_text(f"You have received: {reward.name}\n")
+            picked_up = self.player.pick_up(reward)
+            self.game.decide_pick_up(picked_up, reward)
+
+
+class CombatScreen(Screen):
+    """
+    A fight, played one turn per key. When it ends the screen closes before the fight's outcome (rewards or game
+    over) is handled. Coming back from the pause menu shows both sides' HP and the actions again.
+    """
+
+    def __init__(self, game, combat):
+        super().__init__(game)
+        self.combat = combat
+        self.started = False
 
-        self.ui.display_text(f"You have received: {monster.reward.name}\n")
-        picked_up = self.player.pick_up(monster.reward)
-        self.game.decide_pick_up(picked_up, monster.reward)
+    def lines(self):
+        combat = self.combat
+        return [f"{combat.monster.name} HP: {combat.monster.hp}/{combat.monster.max_hp}",
+                f"Your HP: {combat.player.hp}/{combat.player.max_hp}",
+                "", "Choose your action:", "[1] Attack", "[2] Heal", "[3] Retreat"]
 
+    def shown(self):
+        if self.started:
+            self.draw()
+            return
+        self.started = True
+        self.combat.display_start()
+        if self.combat.is_over():
+            self.end()  # e.g. a player with no HP left
+        else:
+            self.combat.show_actions()
+
+    def handle(self, key):
+        if key == "ESC":
+            self.game.menu.pause_menu()
+            return
+        action = Combat.ACTIONS.get(key)
+        if action is None:
+            return
+        if self.combat.take_turn(action) == "retreat":
+            self.close()
+            self.game.active_combat = None
+        elif self.combat.is_over():
+            self.end()
+        else:
+            self.combat.show_actions()
+
+    def end(self):
+        self.close()
+        self.game.active_combat = None
+        self.combat.handle_combat_end(self.combat.monster, self.combat.player.current_room)
@@ -0,0 +1,419 @@
+"""
+Lets tools drive a running game over a local Unix socket, e.g. to script a route or test a build. A client sends
+one JSON line per request: a command such as {"cmd": "move", "direction": "north"}, or a batch of commands,
+{"batch": [...]} (or a bare list), which runs them in order and answers once, so a whole route costs one round
+trip. Requests may be pipelined without waiting for answers, which come back one line each, in order, with a
+snapshot of the game (room, HUD, log lines, screen).
+
+Commands:
+    {"cmd": "move", "direction": "north"}        an arrow key
+    {"cmd": "action", "name": "take"}            scan, solve, take, heal, storage, stats, help, undo or pause
+    {"cmd": "choose", "index": 2}                pick an item of a menu or a numbered prompt, e.g. a combat choice
+    {"cmd": "answer", "text": "0x2A"}            answer a text prompt, e.g. a puzzle
+    {"cmd": "key", "key": "q"}                   any key, as the game reads it
+    {"cmd": "state"}                             just the snapshot
+
+The socket is served on a thread of its own. The game takes the next command only when it reads input and has
+none queued, without waiting for it, and hands its answers back to the server's thread to send, so a slow or
+stalled client never holds up the game.
+"""
+import curses
+import json
+import os
+import queue
+import selectors
+import socket
+import threading
+
+from game_code.systems.list_menu import choice_keys
+from game_code.systems.screens import ListScreen
+
+DIRECTIONS = {
+    "north": curses.KEY_UP,
+    "south": curses.KEY_DOWN,
+    "west": curses.KEY_LEFT,
+    "east": curses.KEY_RIGHT,
+}
+
+ACTIONS = {
+    "scan": "r",
+    "solve": "p",
+    "take": "t",
+    "heal": "h",
+    "storage": "s",
+    "stats": "i",
+    "help": "/",
+    "undo": "u",
+    "pause": "ESC",
+}
+
+
+class Client:
+    """
+    One connected tool: the bytes it sent that aren't a whole line yet, and the answers waiting to be sent to it.
+    """
+
+    def __init__(self, sock):
+        sock.setblocking(False)
+        self.sock = sock
+        self.received = b""
+        self.outgoing = bytearray()
+        self.closed = False
+
+
+class Request:
+    """
+    One line from a client: its commands, run in order, and their results.
+    """
+
+    def __init__(self, client, commands, id=None, batch=False, error=None):
+        self.client = client
+        self.commands = commands
+        self.id = id
+        self.batch = batch
+        self.error = error  # why the line couldn't be read, answered without running anything
+        self.results = []
+
+
+class ControlServer(threading.Thread):
+    """
+    Serves the control socket of a game whose UI is a TextUI, e.g. a RemoteUI.
+    """
+    SELECT_INTERVAL = 0.5  # seconds the server waits for sockets before checking if it is stopping
+
+    def __init__(self, game, path, pacing=False):
+        """
+        :param game: The game to drive.
+        :param path: Where to create the Unix socket; an old socket there is replaced.
+        :param pacing: Whether to keep the delays that pace messages for a player.
+        """
+        super().__init__(daemon=True)
+        self.game = game
+        self.ui = game.ui
+        self.path = path
+        if os.path.exists(path):
+            os.unlink(path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(path)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.wakeup, self.waker = socket.socketpair()  # written to when the game has answers to send
+        self.wakeup.setblocking(False)
+        self.waker.setblocking(False)
+        self.requests = queue.Queue()  # read by the game's thread
+        self.answers = queue.Queue()  # (client, line) to send, from the game's thread
+        self.request = None  # the request being run
+        self.driver = Driver(game)
+        self.clients = []
+        self.stopping = threading.Event()
+
+        game.on_restart = self.follow
+        self.ui.on_input = self.poll
+        self.ui.toggle_typing(False)  # the typing animation would read the queued keys to skip itself
+        self.ui.pacing = pacing
+
+    # the server's thread
+
+    def run(self):
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.listener, selectors.EVENT_READ)
+            selector.register(self.wakeup, selectors.EVENT_READ)
+            while not self.stopping.is_set():
+                for key, events in selector.select(self.SELECT_INTERVAL):
+                    if key.fileobj is self.listener:
+                        self.accept(selector)
+                    elif key.fileobj is self.wakeup:
+                        self.drain(selector)
+                    else:
+                        client = key.data
+                        if events & selectors.EVENT_READ:
+                            self.receive(client)
+                        if events & selectors.EVENT_WRITE or client.outgoing:
+                            self.send(client)
+                        if client.closed:
+                            selector.unregister(client.sock)
+                            client.sock.close()
+                            self.clients.remove(client)
+                        else:
+                            mask = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.outgoing else 0)
+                            selector.modify(client.sock, mask, client)
+        for client in self.clients:
+            client.sock.close()
+        self.listener.close()
+        self.wakeup.close()
+        self.waker.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def accept(self, selector):
+        try:
+            sock, _ = self.listener.accept()
+        except BlockingIOError:
+            return
+        client = Client(sock)
+        self.clients.append(client)
+        selector.register(sock, selectors.EVENT_READ, client)
+
+    def receive(self, client):
+        """
+        Read what the client sent, queueing a request for every whole line.
+        :return: None
+        """
+        try:
+            data = client.sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            client.closed = True
+            return
+        *lines, client.received = (client.received + data).split(b"\n")
+        for line in lines:
+            if line.strip():
+                self.requests.put(parse(line, client))
+
+    def drain(self, selector):
+        """
+        Move the answers from the game's thread to their clients' buffers.
+        :return: None
+        """
+        try:
+            while self.wakeup.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        while True:
+            try:
+                client, line = self.answers.get_nowait()
+            except queue.Empty:
+                return
+            if client.closed or client not in self.clients:
+                continue
+            client.outgoing += line
+            self.send(client)
+            if not client.closed:
+                selector.modify(client.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, client)
+
+    def send(self, client):
+        try:
+            n = client.sock.send(client.outgoing)
+        except BlockingIOError:
+            return
+        except OSError:
+            client.closed = True
+            return
+        del client.outgoing[:n]
+
+    def stop(self):
+        """
+        Stop serving and remove the socket; the game plays on from the keyboard.
+        :return: None
+        """
+        if self.ui.on_input == self.poll:
+            self.ui.on_input = None
+        self.stopping.set()
+        self.join()
+
+    # the game's thread
+
+    def follow(self, game):
+        """
+        Drive the new game when the game restarts.
+        :return: None
+        """
+        self.game = game
+        self.driver.game = game
+
+    def poll(self):
+        """
+        Called by the UI when the game reads input and none is queued. Queues the keys of the next command, if a
+        client has sent one, and hands back the answers of the requests that are done. Never waits.
+        :return: None
+        """
+        while True:
+            if self.request is None:
+                try:
+                    self.request = self.requests.get_nowait()
+                except queue.Empty:
+                    return
+            if self.driver.feed(self.request):
+                return
+            self.answer(self.request)
+            self.request = None
+
+    def answer(self, request):
+        """
+        Hand a finished request's answer to the server's thread.
+        :return: None
+        """
+        line = (json.dumps(self.driver.reply(request)) + "\n").encode("utf-8")
+        self.answers.put((request.client, line))
+        try:
+            self.waker.send(b"\0")
+        except BlockingIOError:
+            pass  # the server is woken already
+
+
+class Driver:
+    """
+    Runs the commands of requests in a game: the keys of each command are queued when the game reads input and
+    has none queued, so prompts read them as a player's keys would be.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.running = False  # whether the keys of a command are queued
+
+    def feed(self, request):
+        """
+        Finish the command whose keys have been read, and queue the keys of the request's next command.
+        :return: False once every command of the request has run.
+        """
+        while True:
+            if self.running:
+                self.running = False
+                request.results.append(self.result())
+            if len(request.results) == len(request.commands):
+                return False
+            command = request.commands[len(request.results)]
+            try:
+                keys = command_keys(command, self.game.screens.top)
+            except (KeyError, TypeError, ValueError) as error:
+                request.results.append({"ok": False, "error": str(error) or type(error).__name__})
+                continue
+            if keys:
+                self.game.ui.push_input(*keys)
+                self.running = True
+                return True
+            request.results.append(self.result())
+
+    def result(self):
+        """
+        The result of a command that ran.
+        :return: Dictionary of the command's success and the log lines shown after it.
+        """
+        return {"ok": True, "logs": self.logs()}
+
+    def logs(self):
+        ui = self.game.ui
+        return list(ui.logs) + ([ui.line] if ui.line else [])
+
+    def snapshot(self):
+        """
+        The state of the game as a tool needs it.
+        :return: Dictionary that can be sent as JSON.
+        """
+        game = self.game
+        player = game.player
+        room = player.current_room
+        top = game.screens.top
+        state = {
+            "screen": type(top).__name__ if top is not None else None,
+            "game_over": bool(game.game_over),
+            "hud": {
+                "hp": player.hp,
+                "max_hp": player.max_hp,
+                "attack": player.attack_power,
+                "weapon": player.equipped_weapon.name if player.equipped_weapon else None,
+                "med": player.equipped_med.name if player.equipped_med else None,
+                "med_uses": player.equipped_med.uses if player.equipped_med else 0,
+                "weight": player.weight,
+                "max_weight": player.max_weight,
+            },
+            "storage": {name: item.count for name, item in player.storage.items()},
+            "logs": self.logs(),
+            "room": None,
+        }
+        if room is not None:
+            state["room"] = {
+                "name": room.name,
+                "description": room.description,
+                "exits": {direction: exit_room.name for direction, exit_room in room.exits.items()
+                          if not (direction in room.locked_exits and exit_room.locked)},
+                "locked_exits": sorted(room.locked_exits),
+                "items": {name: item.count for name, item in room.items.items()},
+                "monsters": {name: monster.hp for name, monster in room.monsters.items()},
+                "puzzle": room.puzzle.name if room.puzzle is not None and not room.puzzle.solved else None,
+            }
+        if isinstance(top, ListScreen):
+            state["menu"] = list(top.menu.view)
+        return state
+
+    def reply(self, request):
+        """
+        The answer to a finished request.
+        :return: Dictionary of the results (for a batch) or the command's result, with a snapshot of the game.
+        """
+        if request.error is not None:
+            message = {"ok": False, "error": request.error}
+        elif request.batch:
+            message = {"ok": all(result["ok"] for result in request.results), "results": request.results}
+        else:
+            message = dict(request.results[0])
+        if request.id is not None:
+            message["id"] = request.id
+        if request.error is None:
+            message["state"] = self.snapshot()
+        return message
+
+
+def parse(line, client=None):
+    """
+    Read one request line.
+    :param client: Who sent it, which the answer goes back to.
+    :return: The Request, with its error set if the line isn't a command or a batch of them.
+    """
+    try:
+        message = json.loads(line)
+    except ValueError as error:
+        return Request(client, [], error=f"invalid JSON: {error}")
+    if isinstance(message, list):
+        return Request(client, message, batch=True)
+    if not isinstance(message, dict):
+        return Request(client, [], error="expected a command or a batch of commands")
+    if "batch" in message:
+        if not isinstance(message["batch"], list):
+            return Request(client, [], message.get("id"), error="batch must be a list of commands")
+        return Request(client, message["batch"], message.get("id"), batch=True)
+    return Request(client, [message], message.get("id"))
+
+
+def command_keys(command, top=None):
+    """
+    The keys (or text answers) a command sends.
+    :param command: The command.
+    :param top: The screen on top of the game's screen stack.
+    :return: List of keys, which is empty for a command that only reads the state.
+    :raises ValueError: When the command isn't known or its arguments are wrong.
+    """
+    if not isinstance(command, dict):
+        raise ValueError("a command must be an object")
+    name = command.get("cmd")
+    if name == "state":
+        return []
+    if name == "move":
+        direction = command.get("direction")
+        if direction not in DIRECTIONS:
+            raise ValueError(f"unknown direction: {direction}")
+        return [DIRECTIONS[direction]]
+    if name == "action":
+        action = command.get("name")
+        if action not in ACTIONS:
+            raise ValueError(f"unknown action: {action}")
+        return [ACTIONS[action]]
+    if name == "choose":
+        index = int(command["index"])
+        if index < 1:
+            raise ValueError("index starts at 1")
+        if isinstance(top, ListScreen):
+            return choice_keys(index, len(top.menu.view))
+        return list(str(index))
+    if name == "answer":
+        return [str(command["text"])]
+    if name == "key":
+        key = command["key"]
+        if not isinstance(key, (str, int)):
+            raise ValueError("a key is a string or a key code")
+        return [key]
+    raise ValueError(f"unknown command: {name}")
@@ -0,0 +1,118 @@
+from collections import deque
+
+
+class InputExhausted(Exception):
+    """
+    Raised by the HeadlessUI when the game asks for input but no scripted input is left.
+    """
+
+
+class HeadlessUI:
+    """
+    A drop-in replacement for TextUI that draws nothing to the terminal.
+    Input is read from a queue of scripted keys and text, and every logged line is kept in memory so that
+    automated players and tools can drive the game and read back what it said.
+    """
+
+    LOG_LIMIT = 200  # number of log lines kept in memory
+    MENU_ROWS = 9  # rows on a page of a list menu
+
+    def __init__(self):
+        self.started = False
+        self.inputs = deque()  # scripted keys (and text answers) waiting to be read
+        self.logs = deque(maxlen=self.LOG_LIMIT)
+        self.line = ""  # the log line that is currently being written
+        self.on_input = None  # called when the game reads input and none is queued, so a tool can queue more
+        self.room_desc = ""
+        self.typing_enabled = False
+
+    def push_input(self, *keys):
+        """
+        Queue keys or text answers for the game to read.
+        :param keys: The keys in the order they are read.
+        :return: None
+        """
+        self.inputs.extend(keys)
+
+    def clear_input(self):
+        """
+        Drop any scripted input that was not read.
+        :return: None
+        """
+        self.inputs.clear()
+
+    def start_screen(self):
+        self.started = True
+
+    def stop_screen(self):
+        self.started = False
+
+    def clear(self):
+        self.clear_logs()
+
+    def menu_rows(self):
+        return self.MENU_ROWS
+
+    def draw_room(self, room_desc):
+        self.room_desc = room_desc
+
+    def redraw_game(self, room, player):
+        self.draw_room(room.describe())
+
+    def draw_hud(self, player):
+        pass
+
+    def draw_top(self, text, y=0, clear=True):
+        self.display_text(text)
+
+    def display_text(self, text, typing=None, end="\n"):
+        """
+        Record text in the log instead of drawing it.
+        :param text: The text to log.
+        :param typing: Ignored, there is no typing animation.
+        :param end: Line ending character where the default is a newline.
+        :return: None
+        """
+        lines = f"{self.line}{text}{end}".split("\n")
+        self.logs.extend(lines[:-1])
+        self.line = lines[-1]
+
+    def clear_logs(self):
+        self.logs.clear()
+        self.line = ""
+
+    def get_key(self):
+        """
+        Read the next scripted key.
+        :return: The key that is read.
+        :raises InputExhausted: When there is no scripted input left.
+        """
+        if not self.inputs and self.on_input is not None:
+            self.on_input()
+        if not self.inputs:
+            raise InputExhausted()
+        return self.inputs.popleft()
+
+    def wait_for_key(self):
+        return self.get_key()
+
+    def get_text(self, prompt="> "):
+        return str(self.get_key())
+
+    def wait_to_start_game(self, prompt="Press SPACE to begin initialisation..."):
+        pass
+
+    def print_welcome(self):
+        pass
+
+    def print_help(self):
+        pass
+
+    def delay(self, seconds):
+        pass
+
+    def set_typing_speed(self, speed):
+        pass
+
+    def toggle_typing(self, enabled=None):
+        pass
@@ -0,0 +1,268 @@
+"""
+Manages the idle sessions of a server (see session_server.py) on a hierarchical timer wheel. A session that has
+had no keypress for a while is warned, then hibernated: its game is encoded to a small file and dropped from
+memory, and is rebuilt from the file on its next keypress, without the player noticing. A session idle for
+longer still is closed.
+
+A hibernated game is encoded like a save (see SaveManager), but only with the rooms its world has copied from
+the server's template, since the rest are still the template's. The screens open on top of the room (a fight,
+the pause menu, the storage menu and an item in it, the list of items to take or a puzzle's prompt) are
+recorded so they are opened again, as are the states of the game's random streams, so waking a game doesn't
+roll its fights and loot again.
+"""
+import math
+import os
+import struct
+import time
+import zlib
+
+from game_code.game import Game, GameScreen
+from game_code.systems.combat import CombatScreen
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.systems.menu import PauseScreen
+from game_code.systems.monster_scheduler import MonsterScheduler
+from game_code.systems.puzzle_handler import PuzzleScreen
+from game_code.systems.save_manager import RecordReader, RecordWriter, SaveManager
+from game_code.systems.screens import ListScreen
+from game_code.systems.storage_handler import InspectScreen, StorageScreen
+from game_code.systems.timer_wheel import HierarchicalTimerWheel
+
+RANDOM_STATE = struct.Struct("<625I")  # the words of a random.Random's Mersenne Twister, see Random.getstate
+
+
+def frozen_screens(game):
+    """
+    Describe the screens open on top of the room.
+    :return: List of (kind, name, message) from the bottom up, or None if a screen can't be opened again.
+    """
+    records = []
+    for screen in game.screens.screens:
+        if isinstance(screen, GameScreen):
+            continue
+        if isinstance(screen, CombatScreen):
+            records.append(("fight", screen.combat.monster.name, None))
+        elif isinstance(screen, PauseScreen):
+            records.append(("pause", None, None))
+        elif isinstance(screen, StorageScreen):
+            records.append(("storage", None, None))
+        elif isinstance(screen, InspectScreen):
+            message = None if screen.message is None else str(screen.message)
+            records.append(("inspect", screen.item.name, message))
+        elif isinstance(screen, PuzzleScreen):
+            records.append(("puzzle", screen.room.name, None))
+        elif isinstance(screen, ListScreen) and screen.on_choose == game.take_item:
+            records.append(("items", None, None))
+        else:
+            return None
+    return records
+
+
+def reopen(game, screens):
+    """
+    Open the screens of a thawed game again, on a stack that is being played (see Session).
+    :param screens: The records from frozen_screens.
+    :return: None
+    """
+    for kind, name, message in screens:
+        if kind == "fight":
+            game.do_fight(name)
+        elif kind == "pause":
+            game.menu.pause_menu()
+        elif kind == "storage":
+            game.storage_handler.show_player_storage()
+        elif kind == "inspect":
+            storage = game.screens.top
+            if isinstance(storage, StorageScreen) and name in game.player.storage:
+                storage.chosen(game.player.storage[name])
+                game.screens.top.message = message
+                game.screens.top.invalidate()
+        elif kind == "puzzle":
+            room = game.world.resolve(game.world.lookup(name))
+            if room.puzzle is not None:
+                game.screens.open(PuzzleScreen(game, room, room.puzzle))
+        elif kind == "items":
+            game.display_items()
+
+
+def write_random(writer, rng):
+    """
+    Record a random stream's state, whose words are returned to be written after the records.
+    :return: The words as bytes.
+    """
+    version, words, gauss = rng.getstate()
+    writer.uint(version)
+    writer.string(None if gauss is None else repr(gauss))
+    return RANDOM_STATE.pack(*words)
+
+
+def freeze(game):
+    """
+    Encode a game forked from a template.
+    :return: The compressed bytes, or None if a screen is open that can't be opened again.
+    """
+    screens = frozen_screens(game)
+    if screens is None:
+        return None
+    writer = RecordWriter()
+    writer.uint(len(screens))
+    for record in screens:
+        for field in record:
+            writer.string(field)
+    words = write_random(writer, game.rng) + write_random(writer, game.loot_rng)
+    payload = SaveManager(None).encode(game.player, list(game.world.own.values()))
+    return zlib.compress(writer.getvalue() + words + payload)
+
+
+def thaw(data, template, seed):
+    """
+    Rebuild a frozen game on a fork of the template it was forked from.
+    :param data: The bytes from freeze.
+    :param template: The template, see Game.pristine.
+    :param seed: The game's random seed.
+    :return: The game, and the screens to open on it again (see reopen).
+    :raises SaveError: If the records don't match the template's world.
+    """
+    data = zlib.decompress(data)
+    reader = RecordReader(data)
+    screens = [tuple(reader.string() for _ in range(3)) for _ in range(reader.uint())]
+    states = [(reader.uint(), reader.string()) for _ in range(2)]
+    words = reader.pos
+    saves = SaveManager(None)
+    rooms = {}
+    player = saves.decode(data[words + 2 * RANDOM_STATE.size:], rooms)
+
+    game = Game(ui=HeadlessUI(), seed=seed)
+    for rng, (version, gauss), offset in zip((game.rng, game.loot_rng), states, (0, RANDOM_STATE.size)):
+        state = RANDOM_STATE.unpack_from(data, words + offset)
+        rng.setstate((version, state, None if gauss is None else float(gauss)))
+    game.template = template
+    game.world = template[0].fork()
+    saves.apply(game, player, rooms)  # before the state is tracked, so restoring it isn't recorded as moves
+    state_hash = game.state_hash
+    state_hash.value = state_hash.compute(game.player, game.world)
+    state_hash.adopt_player(game.player)
+    for room in game.world.own.values():
+        state_hash.adopt_room(room)
+    game.world.state_hash = state_hash
+    game.scheduler = MonsterScheduler.for_world(game.world, game.player, seed)
+    return game, screens
+
+
+class Idle:
+    """
+    How long one session has been idle, and its timer.
+    """
+    __slots__ = ("session", "path", "active", "stage", "timer")
+
+    def __init__(self, session, path, active):
+        self.session = session
+        self.path = path  # where the session is hibernated
+        self.active = active  # the tick of its last keypress
+        self.stage = 0  # the stages it has been through since then, see IdleKeeper.STAGES
+        self.timer = None
+
+
+class IdleKeeper:
+    """
+    Warns, hibernates and closes idle sessions. Each session has one timer at a time, for its next stage. A
+    keypress only records the tick it came on, so the timer doesn't move on every key: a timer that finds its
+    session was active since it was scheduled is put back for the session's new deadline instead of firing.
+    Scheduling, cancelling and moving a timer cost O(1), so many thousands of sessions can be kept cheaply.
+
+    Sessions must have hibernate(path), which may refuse by returning False, wake() and a hibernated attribute,
+    like a Session.
+    """
+    STAGES = ("warn", "hibernate", "close")
+
+    def __init__(self, folder, warn_after=300, hibernate_after=600, timeout=3600, tick=1.0, clock=time.monotonic):
+        """
+        :param folder: Where hibernated sessions are written.
+        :param warn_after: Seconds idle before a session is warned.
+        :param hibernate_after: Seconds idle before it is hibernated.
+        :param timeout: Seconds idle before it is closed.
+        :param tick: Seconds per tick of the timer wheel.
+        """
+        if not warn_after <= hibernate_after <= timeout:
+            raise ValueError("sessions are warned, then hibernated, then closed")
+        self.folder = folder
+        self.tick = tick
+        self.deadlines = [max(1, math.ceil(seconds / tick)) for seconds in (warn_after, hibernate_after, timeout)]
+        self.clock = clock
+        self.start = clock()
+        self.wheel = HierarchicalTimerWheel()
+        self.idle = {}  # session to Idle
+        self.added = 0
+        self.counts = dict.fromkeys(("warned", "hibernated", "woken", "closed"), 0)
+        self.on_warn = None  # called with a session and the seconds left before it is closed
+        self.on_close = None  # called with a session closed for being idle
+        os.makedirs(folder, exist_ok=True)
+
+    def add(self, session):
+        """
+        Start keeping a session.
+        :return: None
+        """
+        idle = Idle(session, os.path.join(self.folder, f"session-{self.added}.idle"), self.wheel.now)
+        self.added += 1
+        idle.timer = self.wheel.schedule(self.deadlines[0], idle)
+        self.idle[session] = idle
+
+    def touch(self, session):
+        """
+        Record a keypress, waking the session if it is hibernated. Call before the session plays the key.
+        :return: None
+        """
+        idle = self.idle[session]
+        idle.active = self.wheel.now
+        if idle.stage:  # its timer is for a later stage, which must come forward
+            if session.hibernated:
+                session.wake()
+                self.counts["woken"] += 1
+            idle.stage = 0
+            self.wheel.cancel(idle.timer)
+            idle.timer = self.wheel.schedule(self.deadlines[0], idle)
+
+    def forget(self, session):
+        """
+        Stop keeping a session, e.g. when its client leaves, removing it from disk if it is hibernated.
+        :return: None
+        """
+        idle = self.idle.pop(session, None)
+        if idle is None:
+            return
+        self.wheel.cancel(idle.timer)
+        if os.path.exists(idle.path):
+            os.remove(idle.path)
+
+    def advance(self):
+        """
+        Catch the timer wheel up with the clock, handling the sessions whose timers are due.
+        :return: None
+        """
+        target = int((self.clock() - self.start) / self.tick)
+        while self.wheel.now < target:
+            for idle in self.wheel.advance():
+                self.fire(idle)
+
+    def fire(self, idle):
+        idle_for = self.wheel.now - idle.active
+        while idle.stage < len(self.deadlines) and idle_for >= self.deadlines[idle.stage]:
+            stage = self.STAGES[idle.stage]
+            idle.stage += 1
+            if stage == "warn":
+                self.counts["warned"] += 1
+                if self.on_warn is not None:
+                    self.on_warn(idle.session, (self.deadlines[-1] - idle_for) * self.tick)
+            elif stage == "hibernate":
+                if idle.session.hibernate(idle.path):
+                    self.counts["hibernated"] += 1  # otherwise it stays in memory until it is closed
+            else:
+                self.counts["closed"] += 1
+                self.forget(idle.session)
+                if self.on_close is not None:
+                    self.on_close(idle.session)
+                return
+        idle.timer = self.wheel.schedule(self.deadlines[idle.stage] - idle_for, idle)
+
+    def __len__(self):
+        return len(self.idle)
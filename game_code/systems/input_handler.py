@@ -22,6 +22,16 @@ class InputHandler:
             "s": lambda: game.storage_handler.show_player_storage(),
             "i": lambda: game.ui.display_text(game.player.show_stats()),
             "/": game.ui.print_help,
+            "u": game.undo,
+        }
+
+        # names of the actions as they are shown when rewinding
+        self.labels = {
+            "r": "scan",
+            "p": "solve puzzle",
+            "t": "take item",
+            "h": "heal",
+            "s": "storage",
         }
 
     def handle(self, key):
@@ -37,14 +47,16 @@ class InputHandler:
         else:
             self.game.ui.clear_logs()
             if key == "ESC":
-                self.game.pause = True
+                self.game.menu.pause_menu()
                 return
 
             if key in self.movement:
+                self.game.rewind.mark(f"move {self.movement[key]}")
                 self.game.move(self.movement[key])
                 return
 
             if key in self.actions:
+                self.game.rewind.mark(self.labels.get(key, key))
                 self.actions[key]()
                 return
 
@@ -0,0 +1,159 @@
+import curses
+
+ENTER_KEYS = ("\n", "\r", curses.KEY_ENTER)
+BACKSPACE_KEYS = ("\b", "\x7f", curses.KEY_BACKSPACE)
+
+
+def choice_keys(number, count):
+    """
+    The keys that choose an item by its number, e.g. for a tool driving the game.
+    :param number: The item's number, from 1.
+    :param count: The number of items in the menu.
+    :return: List of keys: the digits, and Enter if the menu would wait for a longer number.
+    """
+    keys = list(str(number))
+    if number * 10 <= count:
+        keys.append("\n")
+    return keys
+
+
+class ListMenu:
+    """
+    A menu over a dictionary of items that only renders the page that is visible, so a room or storage with
+    thousands of items opens as fast as one with a few.
+    An item is chosen by its number, typing as many digits as it needs, or by moving the cursor with the arrow keys
+    and pressing Enter. "/" starts a filter on the item names, which is narrowed as each letter is typed.
+    """
+
+    def __init__(self, ui, items, title, label=None, footer=None):
+        """
+        :param ui: The UI the menu is shown on, whose size sets the rows of a page.
+        :param items: Dictionary of item name to item.
+        :param title: The line(s) shown above the list.
+        :param label: Function of (name, item) to the text of its row; the name by default.
+        :param footer: The line(s) shown below the list, if any.
+        """
+        self.ui = ui
+        self.items = items
+        self.title = title
+        self.label = label or (lambda name, item: name)
+        self.footer = footer
+        self.rows = ui.menu_rows()
+
+        self.names = list(items)  # the index that filters narrow down
+        self.view = self.names  # names shown, in order
+        self.narrowed = []  # (query, view) before each letter of the filter, so backspace is instant
+        self.query = ""
+        self.typing = False  # whether keys go to the filter
+        self.number = ""  # digits typed so far
+        self.cursor = 0
+
+    def handle(self, key):
+        """
+        Act on one key; the menu is driven by a ListScreen.
+        :return: ("choose", name), "back", "escape", "changed" if the menu must be drawn again, or None.
+        """
+        if self.typing:
+            return "changed" if self.filter_key(key) else None
+        if key == "ESC":
+            return "escape"
+        if key == "b":
+            return "back"
+        if key == "/":
+            self.typing = True
+            self.number = ""
+        elif isinstance(key, str) and key.isdigit():
+            chosen = self.digit(key)
+            return ("choose", chosen) if chosen is not None else "changed"
+        elif key in ENTER_KEYS:
+            chosen = self.enter()
+            return ("choose", chosen) if chosen is not None else None
+        elif key in BACKSPACE_KEYS:
+            self.number = self.number[:-1]
+        elif not self.move(key):
+            return None
+        return "changed"
+
+    def digit(self, key):
+        """
+        Add a digit to the number being typed, choosing the item once no longer number could be meant.
+        :return: The chosen name, or None.
+        """
+        self.number += key
+        n = int(self.number)
+        if n == 0 or n > len(self.view):
+            self.number = ""
+            return None
+        if n * 10 > len(self.view):
+            self.number = ""
+            return self.view[n - 1]
+        return None
+
+    def enter(self):
+        """
+        Choose the typed number, or the item under the cursor.
+        :return: The chosen name, or None.
+        """
+        if self.number:
+            n, self.number = int(self.number), ""
+            return self.view[n - 1]
+        return self.view[self.cursor] if self.view else None
+
+    def move(self, key):
+        """
+        Move the cursor a row with up and down, or a page with left and right (or page up and down).
+        :return: True if the key moves the cursor.
+        """
+        steps = {curses.KEY_UP: -1, curses.KEY_DOWN: 1, curses.KEY_LEFT: -self.rows, curses.KEY_RIGHT: self.rows,
+                 curses.KEY_PPAGE: -self.rows, curses.KEY_NPAGE: self.rows}
+        if key not in steps or not self.view:
+            return False
+        self.cursor = min(max(self.cursor + steps[key], 0), len(self.view) - 1)
+        self.number = ""
+        return True
+
+    def filter_key(self, key):
+        """
+        Edit the filter: letters narrow the current matches, backspace goes back to the matches before,
+        Enter keeps the filter and ESC drops it.
+        :return: True if the key changed the filter.
+        """
+        if key in ENTER_KEYS:
+            self.typing = False
+        elif key == "ESC":
+            self.typing = False
+            if self.narrowed:
+                self.view = self.narrowed[0][1]
+            self.query, self.narrowed = "", []
+        elif key in BACKSPACE_KEYS:
+            if self.narrowed:
+                self.query, self.view = self.narrowed.pop()
+        elif isinstance(key, str) and key.isprintable():
+            self.narrowed.append((self.query, self.view))
+            self.query += key.lower()
+            self.view = [name for name in self.view if self.query in name.lower()]
+        else:
+            return False
+        self.cursor = 0
+        return True
+
+    def lines(self):
+        """
+        :return: List of the lines of the visible page.
+        """
+        page = self.cursor // self.rows
+        pages = max(1, -(-len(self.view) // self.rows))
+        start = page * self.rows
+        lines = [self.title]
+        if self.typing or self.query:
+            lines.append(f"Filter: /{self.query}{'_' if self.typing else ''} ({len(self.view)} found)")
+        for i in range(start, min(start + self.rows, len(self.view))):
+            name = self.view[i]
+            mark = ">" if i == self.cursor else " "
+            lines.append(f"{mark}[{i + 1}] {self.label(name, self.items[name])}")
+        if self.number:
+            lines.append(f"# {self.number}")
+        lines.append(f"Page {page + 1}/{pages}  [B] Back" if pages > 1 else "[B] Back")
+        if self.footer:
+            lines.append(self.footer)
+        return lines
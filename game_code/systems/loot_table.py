@@ -0,0 +1,93 @@
+import random
+from collections import Counter
+
+
+def stream(seed, name):
+    """
+    A random stream of its own for one kind of roll, so that e.g. loot drops replay the same from a seed
+    whatever else used randomness in between.
+    :param seed: The game's seed, or None for an unseeded stream.
+    :param name: The name of the stream, such as "loot".
+    :return: The random.Random.
+    """
+    return random.Random(None if seed is None else f"{seed}:{name}")
+
+
+class LootTable:
+    """
+    A weighted drop table, such as the extra loot of a monster or puzzle. The alias table (Vose's method) is built
+    once, after which each drop costs one random number whatever the number of entries.
+    Entries hold prototype items; every drop is the prototype's copy, so items that change (meds) are never shared.
+    """
+
+    def __init__(self, entries):
+        """
+        :param entries: Iterable of (weight, item), where an item of None means nothing drops.
+        """
+        entries = [(weight, item) for weight, item in entries if weight > 0]
+        if not entries:
+            raise ValueError("a loot table needs at least one entry with a positive weight")
+        self.items = [item for _, item in entries]
+        total = sum(weight for weight, _ in entries)
+        size = len(entries)
+        scaled = [weight * size / total for weight, _ in entries]
+
+        self.prob = [1.0] * size  # chance of keeping column i, otherwise its alias is dropped
+        self.alias = list(range(size))
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+        # what is left is 1 up to rounding error
+
+    def index(self, rng):
+        """
+        Pick an entry: the integer part of one uniform number picks a column, its fraction picks between
+        the column and its alias.
+        :return: The entry's index.
+        """
+        u = rng.random() * len(self.prob)
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+    def drop(self, rng):
+        """
+        Roll the table once.
+        :param rng: The random stream, e.g. the game's loot stream.
+        :return: A new item, or None if nothing drops.
+        """
+        item = self.items[self.index(rng)]
+        return item.copy() if item is not None else None
+
+    def sample(self, rng, count):
+        """
+        Roll the table many times, for simulations; no items are made.
+        :return: List of entry indices.
+        """
+        prob, alias, size, uniform = self.prob, self.alias, len(self.prob), rng.random
+        picks = []
+        append = picks.append
+        for _ in range(count):
+            u = uniform() * size
+            i = int(u)
+            append(i if u - i < prob[i] else alias[i])
+        return picks
+
+    def counts(self, rng, count):
+        """
+        How often each item drops in many rolls.
+        :return: Counter of item name (None for nothing) to drops.
+        """
+        names = [item.name if item is not None else None for item in self.items]
+        return Counter(names[i] for i in self.sample(rng, count))
+
+    def prototypes(self):
+        """
+        The items the table can drop.
+        :return: List of the prototype items.
+        """
+        return [item for item in self.items if item is not None]
@@ -1,4 +1,40 @@
-import time
+import logging
+
+from game_code.systems.screens import ListScreen, Screen
+
+
+class PauseScreen(Screen):
+    """
+    The pause menu, opened on top of whatever screen the player paused from, which is shown again on resuming.
+    """
+
+    def lines(self):
+        return (["=== SYSTEM PAUSED ===", "", "[ESC] Resume", "[R] Restart"]
+                + (["[S] Save & Quit"] if self.game.saves is not None else []) + ["[Q] Quit"])
+
+    def paint(self, text):
+        self.ui.draw_top(text)
+
+    def shown(self):
+        self.game.pause = True
+        self.draw()
+
+    def closed(self):
+        self.game.pause = False
+
+    def handle(self, key):
+        if key == "ESC":
+            self.close()
+        elif key == "r":
+            logging.info("User restarts the game")
+            self.ui.clear()
+            self.stack.finish("restart")
+        elif key == "s" and self.game.saves is not None:
+            self.game.save()
+            self.stack.finish("quit")
+        elif key == "q":
+            logging.info("User quits the game")
+            self.stack.finish("quit")
 
 
 class Menu:
@@ -10,28 +46,12 @@ class Menu:
         self.game = game
 
     def pause_menu(self):
-        self.game.pause = True
-        self.ui.draw_top(
-            "=== SYSTEM PAUSED ===\n\n"
-            "[ESC] Resume\n"
-            "[R] Restart\n"
-            "[Q] Quit"
-        )
-        while True:
-            key = self.ui.get_key()
-            if key == "ESC":
-                self.ui.redraw_game(
-                    self.game.player.current_room,
-                    self.game.player
-                )
-                self.game.pause = False
-                return None
-            if key == "r":
-                self.ui.clear()
-                return "restart"
-            if key == "q":
-                return "quit"
-            time.sleep(0.01)
+        """
+        Open the pause menu on top of the current screen.
+        :return: "restart" or "quit" if the player chose to leave, when the menu was opened outside the game loop.
+        """
+        logging.info("User pauses the game")
+        return self.game.screens.open(PauseScreen(self.game))
 
     def game_over_menu(self):
         """Display game over menu and handle selection."""
@@ -50,18 +70,16 @@ class Menu:
                 return "restart"
             elif key == "q":
                 return "quit"
-            time.sleep(0.01)
-
-
-    def item_menu(self, items, prompt):
-        """Display numbered menu of items and return selection mapping."""
-        selections = {}
-        self.ui.display_text(prompt)
+            self.ui.delay(0.01)
 
-        for i, (item_name, item) in enumerate(items.items(), start=1):
-            self.ui.display_text(f"[{i}] {item_name}")
-            selections[str(i)] = item
-        self.ui.display_text("[B] Back")
 
-        return selections
+    def item_menu(self, items, prompt, on_choose):
+        """
+        Open a paged menu of items for the player to choose one.
+        :param items: Dictionary of item name to item.
+        :param prompt: The line shown above the items.
+        :param on_choose: Called with the chosen item once the menu has closed.
+        :return: None
+        """
+        self.game.screens.open(ListScreen(self.game, items, prompt, on_choose))
 
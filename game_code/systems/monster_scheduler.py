@@ -0,0 +1,201 @@
+import copy
+import random
+
+from game_code.systems.timer_wheel import TimerWheel
+
+
+class Wanderer:
+    """
+    A scheduled monster: where it is, how it moves and how it comes back after being killed.
+    """
+    __slots__ = ("monster", "room", "behaviour", "period", "route", "step", "home", "template", "respawn")
+
+    def __init__(self, monster, room, behaviour, period, route, respawn):
+        self.monster = monster  # None while waiting to respawn
+        self.room = room
+        self.behaviour = behaviour
+        self.period = period  # ticks between moves
+        self.route = tuple(route)  # directions a patrol walks, over and over
+        self.step = 0  # the next direction of the route
+        self.home = room  # where the monster respawns
+        self.template = monster.copy()
+        self.template.tracker = None
+        self.template.hp = self.template.max_hp
+        self.respawn = respawn  # ticks until it respawns, or None if it stays dead
+
+    def copy(self):
+        return copy.copy(self)  # the rooms and monster are found again by name, see MonsterScheduler.locate
+
+
+class MonsterScheduler:
+    """
+    Moves monsters around the world. Each monster sits in a timer wheel at the tick it next acts on, so a tick
+    only updates the monsters that are due, however many there are. A monster can:
+      patrol - walk a route of directions, over and over;
+      wander - take a random exit;
+      chase  - step into the player's room when it is next door, otherwise wander;
+      guard  - stay put, which is the only thing monsters that block an exit may do.
+    Any of them can respawn in the room it started in some ticks after it is killed. Monsters never go through
+    locked exits, into a room holding a monster with the same name, or into rooms that aren't loaded, so the
+    unvisited parts of a generated world stay unloaded.
+
+    Monsters are found by their room's name and their own, which are unique within a room, so a forked world's
+    copies of them are moved instead of the rooms it shares, and a forked game can fork the scheduler too.
+    """
+    BEHAVIOURS = ("patrol", "wander", "chase", "guard")
+
+    def __init__(self, world, player=None, seed=None, slots=TimerWheel.SLOTS):
+        self.world = world
+        self.player = player  # who chasing monsters chase
+        self.rng = random.Random(seed)
+        self.wheel = TimerWheel(slots)
+
+    @classmethod
+    def for_world(cls, world, player=None, seed=None):
+        """
+        Schedule every monster of a world that moves, as its behaviour, route, period and respawn say.
+        :return: The scheduler, or None if no monster moves.
+        """
+        scheduler = cls(world, player, seed)
+        for room in list(world.current_rooms()):
+            for monster in list(room.monsters.values()):
+                if monster.behaviour is not None:
+                    scheduler.add(monster, room, monster.behaviour, monster.period, monster.route, monster.respawn)
+        return scheduler if len(scheduler) else None
+
+    def fork(self, world, player=None):
+        """
+        A scheduler for a forked game, which moves the fork's monsters the way this one would.
+        :return: The scheduler.
+        """
+        scheduler = MonsterScheduler(world, player, slots=len(self.wheel.slots))
+        scheduler.rng.setstate(self.rng.getstate())
+        scheduler.wheel.now, scheduler.wheel.count = self.wheel.now, self.wheel.count
+        scheduler.wheel.slots = [[(due, wanderer.copy()) for due, wanderer in slot] for slot in self.wheel.slots]
+        return scheduler
+
+    def add(self, monster, room, behaviour="wander", period=1, route=(), respawn=None):
+        """
+        Schedule a monster, putting it in the room if it isn't there yet.
+        :param behaviour: "patrol", "wander", "chase" or "guard".
+        :param period: The number of ticks between moves.
+        :param route: The directions a patrol walks.
+        :param respawn: The number of ticks after its death that the monster respawns, or None.
+        :return: The Wanderer.
+        """
+        if behaviour not in self.BEHAVIOURS:
+            raise ValueError(f"unknown behaviour {behaviour!r}")
+        if monster.blocks_exit is not None and behaviour != "guard":
+            raise ValueError(f"{monster.name} blocks an exit, so it can only guard")
+        if behaviour == "patrol" and not route:
+            raise ValueError("a patrol needs a route")
+        if room.monsters.get(monster.name) is not monster:
+            room.add_monster(monster)
+        wanderer = Wanderer(monster, room, behaviour, period, route, respawn)
+        self.wheel.schedule(period, wanderer)
+        return wanderer
+
+    def tick(self):
+        """
+        Advance one tick, updating only the monsters that are due.
+        :return: List of (monster, room it left, room it entered) for the monsters that moved.
+        """
+        moves = []
+        for wanderer in self.wheel.advance():
+            delay = self.update(wanderer, moves)
+            if delay is not None:
+                self.wheel.schedule(delay, wanderer)
+        return moves
+
+    def update(self, wanderer, moves):
+        """
+        Let a monster act.
+        :return: The number of ticks until it acts again, or None if it is no longer scheduled.
+        """
+        if wanderer.monster is None:
+            return self.respawn(wanderer)
+
+        room = self.locate(wanderer)
+        if room is None:
+            if wanderer.monster.is_alive() or wanderer.respawn is None:
+                return None  # its room was unloaded, or it was killed for good
+            wanderer.monster = None
+            return wanderer.respawn
+
+        if wanderer.behaviour != "guard":
+            direction = self.choose(wanderer, room)
+            if wanderer.behaviour == "patrol" and direction not in room.exits:
+                wanderer.step += 1  # e.g. a loaded save put it somewhere else on its route
+            next_room = self.enter(wanderer, room, direction)
+            if next_room is not None:
+                moves.append((wanderer.monster, room, next_room))
+        return wanderer.period
+
+    def locate(self, wanderer):
+        """
+        The room a monster is in.
+        :return: The room, or None if the monster was taken out of the world or its room was unloaded.
+        """
+        monster = wanderer.monster
+        names = [wanderer.room.name]
+        if monster.tracker is not None:
+            names.append(monster.scope[1])  # rewinding puts tracked monsters back where they were
+        for name in names:
+            room = self.world.lookup(name)  # the world's latest version, which may be a copy
+            found = None if room.is_stub() else room.monsters.get(monster.name)
+            if found is not None:
+                wanderer.room, wanderer.monster = room, found
+                return room
+        return None
+
+    def choose(self, wanderer, room):
+        """
+        The direction a monster tries to move in.
+        :return: The direction, or None to stay.
+        """
+        if wanderer.behaviour == "patrol":
+            return wanderer.route[wanderer.step % len(wanderer.route)]
+        if wanderer.behaviour == "chase" and self.player is not None:
+            target = self.player.current_room
+            if target.name == room.name:
+                return None
+            for direction, next_room in room.exits.items():
+                if next_room.name == target.name:
+                    return direction
+        return self.rng.choice(list(room.exits)) if room.exits else None
+
+    def enter(self, wanderer, room, direction):
+        """
+        Move a monster through an exit if it can go that way.
+        :return: The room it entered, or None if it stayed.
+        """
+        if direction is None or direction not in room.exits or direction in room.locked_exits:
+            return None
+        next_room = self.world.lookup(room.exits[direction].name)
+        name = wanderer.monster.name
+        if next_room.is_stub() or name in next_room.monsters:
+            return None
+        room, next_room = self.world.resolve(room), self.world.resolve(next_room)  # shared rooms are copied first
+        monster = room.monsters[name]
+        room.remove_monster(monster)
+        next_room.add_monster(monster)
+        wanderer.room, wanderer.monster = next_room, monster
+        wanderer.step += 1
+        return next_room
+
+    def respawn(self, wanderer):
+        """
+        Put a fresh copy of a dead monster back in its home room, waiting if the room isn't free.
+        :return: The number of ticks until it acts again.
+        """
+        home = self.world.lookup(wanderer.home.name)
+        if home.is_stub() or wanderer.template.name in home.monsters:
+            return wanderer.respawn
+        home = self.world.resolve(home)
+        monster = wanderer.template.copy()
+        home.add_monster(monster)
+        wanderer.monster, wanderer.room, wanderer.step = monster, home, 0
+        return wanderer.period
+
+    def __len__(self):
+        return len(self.wheel)
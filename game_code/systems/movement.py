@@ -1,5 +1,3 @@
-import time
-
 from game_code.entities.items.key import Key
 
 
@@ -21,7 +19,7 @@ class Movement:
         """
         room = player.current_room
         self.ui.display_text(f"Moving {direction}...")
-        time.sleep(0.5)
+        self.ui.delay(0.5)
         if direction not in room.exits:
             self.ui.display_text("You can't go that way!")
             return False
@@ -34,7 +32,7 @@ class Movement:
         if self.check_locked_exit(direction, next_room):
             return False
 
-        player.current_room = room.get_exit(direction)
+        player.current_room = self.game.world.resolve(next_room)
         return True
 
     def check_monster_block(self, direction):
@@ -42,17 +40,16 @@ class Movement:
         Check if a monster is blocking the exit.
         :param direction: The direction in which the monster is blocking.
         """
-        room = self.game.player.current_room
-        for monster in room.monsters.values():
-            if monster.blocks_exit == direction:
-                self.ui.clear_logs()
-                self.ui.display_text(f"{monster.name} has blocked you!")
-                self.ui.display_text("Defeating it is the only way in...")
-                time.sleep(1)
-                self.ui.display_text("")
-                self.game.do_fight(monster.name)
-                return True
-        return False
+        monster = self.game.player.current_room.blocker(direction)
+        if monster is None:
+            return False
+        self.ui.clear_logs()
+        self.ui.display_text(f"{monster.name} has blocked you!")
+        self.ui.display_text("Defeating it is the only way in...")
+        self.ui.delay(1)
+        self.ui.display_text("")
+        self.game.do_fight(monster.name)
+        return True
 
     def check_locked_exit(self, direction, next_room):
         """
@@ -66,7 +63,7 @@ class Movement:
 
         lock_id = room.locked_exits[direction]
         self.ui.display_text(f"The path to {next_room.name} is locked ({lock_id})")
-        time.sleep(1)
+        self.ui.delay(1)
 
         key_item = self.find_key(lock_id)
 
@@ -104,8 +101,8 @@ class Movement:
                 self.ui.display_text("You need to activate the decrypter.")
             else:
                 self.game.do_use(key_item)
-                time.sleep(1)
-                self.game.player.current_room = next_room
+                self.ui.delay(1)
+                self.game.player.current_room = self.game.world.resolve(next_room)
                 self.ui.draw_room(self.game.player.current_room.describe())
         elif key == "2":
             self.ui.clear_logs()
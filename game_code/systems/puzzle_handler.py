@@ -1,4 +1,35 @@
-import time
+from game_code.systems.screens import Screen
+
+
+class PuzzleScreen(Screen):
+    """
+    A puzzle's prompt, reading one answer at a time until the puzzle is solved.
+    """
+
+    def __init__(self, game, room, puzzle):
+        super().__init__(game)
+        self.room = room
+        self.puzzle = puzzle
+
+    def lines(self):
+        return [self.puzzle.prompt]
+
+    def read(self):
+        return self.ui.get_text()  # retrieve answer from user
+
+    def handle(self, answer):
+        handler = self.game.puzzle_handler
+        if handler.check_solution(answer):
+            self.puzzle.solved = True
+            self.ui.clear_logs()
+            self.ui.display_text("Engram has broken, it fizzles into air.")
+            self.ui.delay(0.5)
+            self.close()
+            handler.finish_puzzle(self.room, self.puzzle)
+        else:
+            self.ui.display_text("Incorrect. Try again.")
+            self.ui.delay(0.5)
+            self.draw()
 
 
 class PuzzleHandler:
@@ -36,25 +67,21 @@ class PuzzleHandler:
         # show the puzzle is opening
         self.ui.display_text(f"{puzzle.name} opening", end="")
         for i in range(3):
-            time.sleep(0.5)
+            self.ui.delay(0.5)
             self.ui.display_text(".", end="")
         self.ui.display_text("")
-        time.sleep(0.5)
-
-        # solving loop
-        while not puzzle.solved:
-            self.ui.clear_logs()
-            self.ui.display_text(puzzle.prompt)
-            answer = self.ui.get_text()  # retrieve answer from user
+        self.ui.delay(0.5)
 
-            if self.check_solution(answer):
-                puzzle.solved = True
-                self.ui.clear_logs()
-                self.ui.display_text("Engram has broken, it fizzles into air.")
-            else:
-                self.ui.display_text("Incorrect. Try again.")
-            time.sleep(0.5)
+        if puzzle.solved:
+            self.finish_puzzle(room, puzzle)
+        else:
+            self.game.screens.open(PuzzleScreen(self.game, room, puzzle))
 
+    def finish_puzzle(self, room, puzzle):
+        """
+        Take a solved puzzle out of the room and hand out its reward and loot.
+        :return: None
+        """
         self.ui.clear_logs()
 
         if room.puzzle.solved:
@@ -63,6 +90,12 @@ class PuzzleHandler:
         if puzzle.reward:
             self.handle_puzzle_reward(puzzle.reward)
 
+        # the puzzle's loot table is rolled for an extra drop
+        if puzzle.loot is not None:
+            drop = puzzle.loot.drop(self.game.loot_rng)
+            if drop:
+                self.handle_puzzle_reward(drop)
+
     def handle_puzzle_reward(self, reward):
         """
         Handles the reward from the puzzle.
@@ -0,0 +1,187 @@
+"""
+Records what a TextUI shows to an asciicast v2 file, which can be shared and replayed, and replays recordings.
+Frames are kept in memory and written in large chunks by a background thread, so recording doesn't add a write
+to every character of the typing animation.
+
+Run from the repository root to replay a recording:
+    python -m game_code.systems.recorder game.cast --speed 10
+"""
+import argparse
+import curses
+import json
+import sys
+import threading
+import time
+
+from game_code.systems.remote_ui import ESC, RemoteScreen, RemoteUI
+
+
+class MirrorScreen:
+    """
+    Wraps the curses window of a TextUI, drawing everything to a RemoteScreen as well. The mirror turns what is
+    drawn into terminal output, which is what a recording holds.
+    """
+
+    def __init__(self, window, mirror):
+        """
+        :param window: The curses window.
+        :param mirror: The RemoteScreen to draw to as well.
+        """
+        self.window = window
+        self.mirror = mirror
+
+    def __getattr__(self, name):
+        return getattr(self.window, name)  # e.g. getch, nodelay and getyx
+
+    def addstr(self, y, x, text):
+        self.window.addstr(y, x, text)
+        self.mirror.addstr(y, x, text)
+
+    def move(self, y, x):
+        self.window.move(y, x)
+        self.mirror.move(y, x)
+
+    def clrtoeol(self):
+        self.window.clrtoeol()
+        self.mirror.clrtoeol()
+
+    def clear(self):
+        self.window.clear()
+        self.mirror.clear()
+
+    def refresh(self):
+        self.window.refresh()
+        self.mirror.flush()  # a frame per refresh, so typing is replayed a character at a time
+
+    def getstr(self, y, x):
+        text = self.window.getstr(y, x)
+        try:
+            self.mirror.addstr(y, x, text.decode("utf-8", "replace"))  # echoed by curses
+        except curses.error:
+            pass
+        self.mirror.flush()
+        return text
+
+
+class Recorder:
+    """
+    Writes the frames of a RemoteScreen, which it listens to, as asciicast v2 output events.
+    """
+    CHUNK = 64 * 1024  # characters buffered before the writer thread is woken
+    INTERVAL = 1.0  # seconds the writer waits for a chunk before writing what there is
+
+    def __init__(self, path, width, height, title=None, clock=time.monotonic):
+        """
+        :param path: The .cast file to write.
+        :param width: The terminal columns.
+        :param height: The terminal rows.
+        :param title: The recording's title, if any.
+        """
+        self.path = path
+        self.clock = clock
+        self.start = clock()
+        header = {"version": 2, "width": width, "height": height, "timestamp": int(time.time())}
+        if title:
+            header["title"] = title
+        self.buffer = [json.dumps(header) + "\n"]
+        self.size = len(self.buffer[0])
+        self.writes = 0  # chunks written
+        self.closed = False
+        self.ready = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def publish(self, frame):
+        """
+        Buffer a frame as an output event.
+        :param frame: The frame's bytes.
+        :return: None
+        """
+        line = json.dumps([round(self.clock() - self.start, 6), "o", frame.decode("utf-8")]) + "\n"
+        with self.ready:
+            self.buffer.append(line)
+            self.size += len(line)
+            if self.size >= self.CHUNK:
+                self.ready.notify()
+
+    def run(self):
+        with open(self.path, "w", encoding="utf-8") as file:
+            while True:
+                with self.ready:
+                    if not self.closed and self.size < self.CHUNK:
+                        self.ready.wait(self.INTERVAL)
+                    chunk, self.buffer, self.size = self.buffer, [], 0
+                    closed = self.closed
+                if chunk:
+                    file.write("".join(chunk))
+                    file.flush()
+                    self.writes += 1
+                if closed:
+                    return
+
+    def close(self):
+        """
+        Write what is buffered and close the file.
+        :return: None
+        """
+        with self.ready:
+            self.closed = True
+            self.ready.notify()
+        self.thread.join()
+
+
+def record(ui, path, title=None):
+    """
+    Start recording a TextUI whose screen is started. A RemoteUI is recorded from its frames; the curses window
+    of a local TextUI is wrapped in a MirrorScreen.
+    :return: The Recorder, which must be closed when the game ends.
+    """
+    if isinstance(ui, RemoteUI):
+        screen = ui.screen
+    else:
+        height, width = ui.screen.getmaxyx()
+        screen = RemoteScreen(lambda data: None, height, width)
+        ui.screen = MirrorScreen(ui.screen, screen)
+    height, width = screen.getmaxyx()
+    recorder = Recorder(path, width, height, title)
+    recorder.publish(screen.keyframe().encode("utf-8"))  # what is on the screen already
+    screen.listeners.append(recorder)
+    return recorder
+
+
+def play(path, out=None, speed=1.0, sleep=time.sleep):
+    """
+    Replay a recording.
+    :param out: Where to write the output, stdout by default.
+    :param speed: How many times faster than it was recorded, or None to write it all at once.
+    :return: The recording's header.
+    """
+    out = out if out is not None else sys.stdout
+    with open(path, encoding="utf-8") as file:
+        header = json.loads(file.readline())
+        last = 0.0
+        for line in file:
+            when, kind, data = json.loads(line)
+            if kind != "o":
+                continue
+            if speed and when > last:
+                out.flush()
+                sleep((when - last) / speed)
+            last = when
+            out.write(data)
+    out.write(f"{ESC}[?25h\n")
+    out.flush()
+    return header
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay an asciicast recording of the game.")
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=1.0, help="e.g. 10 for ten times as fast")
+    parser.add_argument("--instant", action="store_true", help="write the whole recording at once")
+    args = parser.parse_args()
+    play(args.path, speed=None if args.instant else args.speed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""
+Plays the game over a socket: RemoteUI is a TextUI that draws into a framebuffer instead of curses, and every
+refresh sends the client only the cells that changed since the last one, as ANSI cursor moves and text.
+"""
+import curses
+import threading
+import zlib
+from collections import deque
+
+from game_code.systems.text_ui import TextUI
+
+ESC = "\x1b"
+ERASE_LINE = ESC + "[K"
+GAP = 4  # unchanged cells between two changes that are sent again instead of moving the cursor over them
+COMPRESS_MIN = 64  # frames shorter than this are sent as they are, as compressing them only adds bytes
+
+# input escape sequences sent by terminals, to the curses key codes TextUI expects
+SEQUENCES = {"[A": curses.KEY_UP, "[B": curses.KEY_DOWN, "[C": curses.KEY_RIGHT, "[D": curses.KEY_LEFT,
+             "OA": curses.KEY_UP, "OB": curses.KEY_DOWN, "OC": curses.KEY_RIGHT, "OD": curses.KEY_LEFT,
+             "[5~": curses.KEY_PPAGE, "[6~": curses.KEY_NPAGE}
+
+
+def cursor_move(y, x, cy, cx):
+    """
+    The shortest ANSI sequence that moves the cursor from (cy, cx) to (y, x).
+    :param cy: The cursor's row, or None if it isn't known.
+    :param cx: The cursor's column, or None if it isn't known.
+    :return: The sequence as a string, empty if the cursor is already there.
+    """
+    if (cy, cx) == (y, x):
+        return ""
+    options = [f"{ESC}[{y + 1};{x + 1}H" if x else f"{ESC}[{y + 1}H"]
+    if cy == y and cx is not None:
+        options.append("\r" if x == 0 else f"{ESC}[{x + 1}G")
+        if x > cx:
+            options.append(f"{ESC}[{x - cx}C")
+        else:
+            options.append("\b" * (cx - x) if cx - x < 3 else f"{ESC}[{cx - x}D")
+    elif cy is not None and x == 0 and y == cy + 1:
+        options.append("\r\n")
+    elif cy is not None and cx == x and y > cy:
+        options.append(f"{ESC}[{y - cy}B")
+    return min(options, key=len)
+
+
+def frame_header(length, compressed):
+    """
+    The header of a frame for clients that take compressed output: a varint of the length and a compressed flag.
+    :return: The header bytes.
+    """
+    n = length << 1 | compressed
+    header = bytearray()
+    while n >= 0x80:
+        header.append((n & 0x7F) | 0x80)
+        n >>= 7
+    header.append(n)
+    return bytes(header)
+
+
+class FrameDecoder:
+    """
+    The client side of compressed output, which turns the framed bytes back into terminal output.
+    """
+
+    def __init__(self):
+        self.inflate = zlib.decompressobj()
+        self.buffer = b""
+
+    def feed(self, data):
+        """
+        Decode the frames that are complete.
+        :param data: Bytes read from the socket.
+        :return: The terminal output of the decoded frames.
+        """
+        self.buffer += data
+        output = bytearray()
+        while self.buffer:
+            n, shift, pos = 0, 0, 0
+            while pos < len(self.buffer):
+                byte = self.buffer[pos]
+                n |= (byte & 0x7F) << shift
+                shift += 7
+                pos += 1
+                if byte < 0x80:
+                    break
+            else:
+                break  # the header isn't complete
+            length, compressed = n >> 1, n & 1
+            if len(self.buffer) < pos + length:
+                break
+            payload = self.buffer[pos:pos + length]
+            self.buffer = self.buffer[pos + length:]
+            output += self.inflate.decompress(payload) if compressed else payload
+        return bytes(output)
+
+
+class RemoteScreen:
+    """
+    Stands in for the curses window of a TextUI. Drawing changes a framebuffer, and refresh (one frame) compares it
+    with a shadow of what the client shows, sending the changed cells as one write. Runs of changes close together
+    are sent as one string, text cleared at the end of a row is erased with one sequence, and the cursor is moved
+    with the shortest sequence, so typing a character costs one byte and redrawing an unchanged room costs nothing.
+    A frame is sent when the game waits, for a key or a delay, so all the drawing of one action goes out together.
+    """
+
+    def __init__(self, send, height=24, width=80, compress=False):
+        """
+        :param send: Called with the bytes of each frame, e.g. socket.sendall.
+        :param height: The client's terminal rows.
+        :param width: The client's terminal columns.
+        :param compress: Whether the client decodes compressed frames, see FrameDecoder.
+        """
+        self.send = send
+        self.height = height
+        self.width = width
+        self.deflate = zlib.compressobj() if compress else None
+        self.rows = [" " * width] * height  # what has been drawn
+        self.shadow = list(self.rows)  # what the client shows
+        self.dirty = set()  # rows drawn to since the last refresh
+        self.y, self.x = 0, 0  # the window's cursor, where curses would draw next
+        self.cy, self.cx = None, None  # the client's cursor, None when unknown
+        self.sent = 0  # bytes sent
+        self.frames = 0
+        self.listeners = []  # objects with a publish(frame) method, e.g. a SpectatorHub, given each frame
+        self.lock = threading.RLock()  # held while the shadow and the frame sent for it disagree, see keyframe
+
+        self.keys = deque()
+        self.ready = threading.Condition()
+        self.blocking = True
+        self.closed = False  # the client has gone
+
+    # drawing, the subset of the curses window that TextUI uses
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def getyx(self):
+        return self.y, self.x
+
+    def move(self, y, x):
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            raise curses.error("move() returned ERR")
+        self.y, self.x = y, x
+
+    def addstr(self, y, x, text):
+        self.move(y, x)
+        text = str(text)[:self.width - x]
+        row = self.rows[y]
+        self.rows[y] = row[:x] + text + row[x + len(text):]
+        self.dirty.add(y)
+        self.x = min(x + len(text), self.width - 1)
+
+    def clrtoeol(self):
+        row = self.rows[self.y]
+        self.rows[self.y] = row[:self.x] + " " * (self.width - self.x)
+        self.dirty.add(self.y)
+
+    def clear(self):
+        self.rows = [" " * self.width] * self.height
+        self.dirty.update(range(self.height))
+        self.y, self.x = 0, 0
+
+    def keypad(self, enabled):
+        pass
+
+    def refresh(self):
+        """
+        Nothing is sent until the game waits for a key or a delay, so e.g. clearing the screen and drawing the
+        room again goes out as one frame.
+        :return: None
+        """
+
+    def flush(self):
+        """
+        Send the cells that changed since the last frame.
+        :return: None
+        """
+        if not self.dirty:
+            return
+        with self.lock:
+            out = []
+            for y in sorted(self.dirty):
+                if self.shadow[y] != self.rows[y]:
+                    self.diff_row(out, y, self.shadow[y], self.rows[y])
+                    self.shadow[y] = self.rows[y]
+            self.dirty.clear()
+            if out:
+                self.write("".join(out))
+
+    def diff_row(self, out, y, old, new):
+        """
+        Add the output that turns the client's row into the new row.
+        :param out: List of output strings.
+        :return: None
+        """
+        end = len(new.rstrip(" "))  # past this the new row is blank
+        x = 0
+        while x < end:
+            if old[x] == new[x]:
+                x += 1
+                continue
+            start = last = x
+            x += 1
+            while x < end and x - last <= GAP:
+                if old[x] != new[x]:
+                    last = x
+                x += 1
+            self.put(out, y, start, new[start:last + 1])
+            x = last + 1
+        old_end = len(old.rstrip(" "))
+        if old_end > end:
+            self.put(out, y, end, ERASE_LINE, width=0)
+
+    def put(self, out, y, x, text, width=None):
+        """
+        Add a cursor move to (y, x) and the text, keeping track of the client's cursor.
+        :param width: The columns the text moves the cursor, its length by default.
+        :return: None
+        """
+        out.append(cursor_move(y, x, self.cy, self.cx))
+        out.append(text)
+        self.cy, self.cx = y, x + (len(text) if width is None else width)
+        if self.cx >= self.width:
+            self.cy = self.cx = None  # terminals differ on where the cursor goes after the last column
+
+    def keyframe(self):
+        """
+        The output that draws the whole screen from scratch, e.g. for a client that just connected or fell behind.
+        Safe to call from another thread: it waits for a frame being sent, whose changes are in the shadow already.
+        :return: The output as a string.
+        """
+        with self.lock:
+            shadow, client = list(self.shadow), (self.cy, self.cx)
+        out = [f"{ESC}[?25l{ESC}[H{ESC}[2J"]
+        cy, cx = 0, 0
+        for y, row in enumerate(shadow):
+            row = row.rstrip(" ")
+            if row:
+                out.append(cursor_move(y, 0, cy, cx))
+                out.append(row)
+                cy, cx = (y, len(row)) if len(row) < self.width else (None, None)
+        if client[0] is not None:
+            out.append(cursor_move(*client, cy, cx))  # so the frames after it apply the same
+        return "".join(out)
+
+    def write(self, text):
+        """
+        Send one frame of output, compressed if the client takes it and it is worth it. Listeners get the frame
+        uncompressed.
+        :return: None
+        """
+        data = text.encode("utf-8")
+        with self.lock:
+            for listener in self.listeners:
+                listener.publish(data)
+        if self.deflate is not None:
+            if len(data) >= COMPRESS_MIN:
+                packed = self.deflate.compress(data) + self.deflate.flush(zlib.Z_SYNC_FLUSH)
+                data = frame_header(len(packed), 1) + packed
+            else:
+                data = frame_header(len(data), 0) + data
+        self.sent += len(data)
+        self.frames += 1
+        self.send(data)
+
+    def start(self):
+        """
+        Hide the cursor and clear the client's terminal.
+        :return: None
+        """
+        with self.lock:
+            self.cy, self.cx = 0, 0
+            self.write(f"{ESC}[?25l{ESC}[H{ESC}[2J")
+
+    def stop(self):
+        """
+        Show the cursor again below the game, leaving the client's terminal usable.
+        :return: None
+        """
+        self.flush()
+        self.write(f"{cursor_move(self.height - 1, 0, self.cy, self.cx)}\r\n{ESC}[?25h")
+
+    # input
+
+    def feed(self, data):
+        """
+        Queue the keys the client sent. Escape sequences are expected to arrive whole, as terminals send them.
+        :param data: Bytes read from the socket.
+        :return: None
+        """
+        text = data.decode("latin-1")
+        keys = []
+        i = 0
+        while i < len(text):
+            char = text[i]
+            i += 1
+            if char == ESC and i < len(text) and text[i] in "[O":
+                end = i + 1
+                while end < len(text) and not (text[end].isalpha() or text[end] == "~"):
+                    end += 1
+                sequence = text[i:end + 1]
+                i = end + 1
+                if sequence in SEQUENCES:
+                    keys.append(SEQUENCES[sequence])
+            elif char == "\r":
+                keys.append(10)
+                if i < len(text) and text[i] in "\n\0":
+                    i += 1
+            else:
+                keys.append(ord(char))
+        with self.ready:
+            self.keys.extend(keys)
+            self.ready.notify_all()
+
+    def close(self):
+        """
+        Called when the client disconnects; reading input then raises EOFError so the game ends.
+        :return: None
+        """
+        with self.ready:
+            self.closed = True
+            self.ready.notify_all()
+
+    def nodelay(self, enabled):
+        self.blocking = not enabled
+
+    def getch(self):
+        self.flush()
+        with self.ready:
+            while not self.keys:
+                if self.closed:
+                    raise EOFError("the client disconnected")
+                if not self.blocking:
+                    return -1
+                self.ready.wait()
+            return self.keys.popleft()
+
+    def getstr(self, y, x):
+        """
+        Read a line, echoing it as it is typed.
+        :return: The line as bytes, like curses.
+        """
+        self.nodelay(False)
+        line = []
+        while True:
+            key = self.getch()
+            if key == 10:
+                break
+            if key in (8, 127, curses.KEY_BACKSPACE):
+                if line:
+                    line.pop()
+                    self.addstr(y, x + len(line), " ")
+            elif 0 <= key <= 255 and x + len(line) < self.width - 1:
+                self.addstr(y, x + len(line), chr(key))
+                line.append(key)
+        return bytes(line)
+
+
+class RemoteUI(TextUI):
+    """
+    A TextUI for a player connected over a socket, drawing through a RemoteScreen instead of curses.
+    The session's network thread passes what the client sends to feed, and the game reads it as keys.
+    """
+
+    def __init__(self, send, height=24, width=80, compress=False):
+        """
+        :param send: Called with the bytes of each frame, e.g. socket.sendall.
+        :param compress: Whether the client decodes compressed frames, see FrameDecoder.
+        """
+        super().__init__()
+        self.remote = RemoteScreen(send, height, width, compress)
+
+    def start_screen(self):
+        if self.started:
+            return
+        self.screen = self.remote
+        self.screen.start()
+        self.screen.nodelay(True)
+        self.started = True
+
+    def stop_screen(self):
+        if not self.started:
+            return
+        self.screen.stop()
+        self.started = False
+
+    def feed(self, data):
+        """
+        Pass on bytes the client sent, see RemoteScreen.feed.
+        :return: None
+        """
+        self.remote.feed(data)
+
+    def delay(self, seconds):
+        self.screen.flush()
+        super().delay(seconds)
+
+    def get_text(self, prompt="> "):
+        text = self.queued_input()
+        if text is not None:
+            self.display_text(prompt + str(text))
+            return str(text)
+        self.display_text(prompt)
+        y, x = self.screen.getyx()
+        text = self.screen.getstr(y, x).decode("utf-8", "replace")
+        self.screen.nodelay(True)
+        return text
@@ -0,0 +1,145 @@
+from collections import deque
+
+from game_code.entities.room import Room
+
+ROOM_SCOPES = ("room", "item", "monster", "puzzle")  # scopes of the entities that are in a room
+
+
+class Rewind:
+    """
+    Journal of reversible changes used to rewind the last few actions.
+    Every change an entity reports to the game's StateHash is recorded as a small delta holding the old value,
+    and the deltas are grouped into actions (a key press or a combat turn). Undoing K actions only replays
+    their deltas backwards, and the journal is a bounded ring, so memory stays bounded.
+    A delta keeps the room it changed, which a fork may share later; undoing re-resolves the room by name, the way
+    MonsterScheduler.locate finds its monsters, so the game reverts its own copy and its forks are left alone.
+    """
+    ACTION_LIMIT = 100  # number of actions that can be undone
+    DELTA_LIMIT = 10000  # total number of deltas kept
+
+    def __init__(self, state_hash, action_limit=ACTION_LIMIT, delta_limit=DELTA_LIMIT):
+        self.state_hash = state_hash
+        self.action_limit = action_limit
+        self.delta_limit = delta_limit
+        self.actions = deque()  # (label, deltas) pairs, newest last
+        self.size = 0  # total number of deltas
+        self.label = None  # label of the action that is being played
+        self.new_action = True  # the next delta starts a new action
+        self.replaying = False
+
+    def mark(self, label):
+        """
+        Start a new action; it is only kept if it changes something.
+        :param label: A short description of the action, e.g. "move north".
+        :return: None
+        """
+        self.label = label
+        self.new_action = True
+
+    def record(self, delta):
+        """
+        Called by the StateHash for every change.
+        :param delta: Tuple of (kind, ...) holding everything needed to reverse the change.
+        :return: None
+        """
+        if self.replaying:
+            return  # undoing is not recorded
+        if self.new_action:
+            self.actions.append((self.label, []))
+            self.new_action = False
+        self.actions[-1][1].append(delta)
+        self.size += 1
+
+        # drop the oldest actions, keeping the one being recorded
+        while len(self.actions) > 1 and (len(self.actions) > self.action_limit or self.size > self.delta_limit):
+            _, deltas = self.actions.popleft()
+            self.size -= len(deltas)
+
+    def undo(self, steps=1, world=None):
+        """
+        Reverse the last actions.
+        :param steps: The number of actions to undo.
+        :param world: The game's world, whose own version of each changed room is reverted. Needed once the game
+        has been forked; without it the recorded rooms are changed.
+        :return: The labels of the undone actions, newest first.
+        """
+        undone = []
+        self.replaying = True
+        try:
+            while self.actions and len(undone) < steps:
+                label, deltas = self.actions.pop()
+                self.size -= len(deltas)
+                for delta in reversed(deltas):
+                    self.revert(delta, world)
+                undone.append(label)
+        finally:
+            self.replaying = False
+            self.new_action = True
+        return undone
+
+    def revert(self, delta, world=None):
+        """
+        Reverse a single change, keeping the state hash in step.
+        :param delta: The recorded delta.
+        :param world: The game's world, see undo.
+        :return: None
+        """
+        kind = delta[0]
+        if kind == "set":
+            _, entity, name, old = delta
+            if world is not None and isinstance(old, Room):
+                old = world.resolve(old)  # e.g. the room the player stood in
+            setattr(self.owned(entity, world), name, old)
+        elif kind == "add":
+            _, container, entity, scope = delta
+            container = self.container(container, scope, world)
+            entity = container.pop(entity.name)
+            self.state_hash.remove(entity, scope, container)
+        elif kind == "remove":
+            _, container, entity, scope = delta
+            container = self.container(container, scope, world)
+            container[entity.name] = entity  # out of every room since it was removed, so this game's own
+            self.state_hash.add(entity, scope, container)
+        elif kind == "lock":
+            _, room, direction, old = delta
+            if world is not None:
+                room = world.resolve(room)
+            new = room.locked_exits.get(direction)
+            if old is None:
+                room.locked_exits.pop(direction, None)
+            else:
+                room.locked_exits[direction] = old
+            room.exit_line = None
+            self.state_hash.lock_changed(room, direction, new, old)
+
+    @staticmethod
+    def owned(entity, world):
+        """
+        The game's own version of a changed entity. The player and their storage are never shared with forks.
+        :return: The entity, or the one in the same place of the game's copy of its room.
+        """
+        scope = entity.scope
+        if world is None or not scope or scope[0] not in ROOM_SCOPES:
+            return entity
+        room = world.resolve(world.lookup(scope[1]))
+        if scope[0] == "room":
+            return room
+        if scope[0] == "puzzle":
+            found = room.puzzle
+        else:
+            found = (room.items if scope[0] == "item" else room.monsters).get(scope[2])
+        return entity if found is None else found
+
+    @staticmethod
+    def container(container, scope, world):
+        """
+        The game's own version of the dictionary an entity was added to or removed from.
+        :return: The dictionary.
+        """
+        if world is None or scope[0] not in ("item", "monster"):
+            return container
+        room = world.resolve(world.lookup(scope[1]))
+        return room.items if scope[0] == "item" else room.monsters
+
+    def __len__(self):
+        return len(self.actions)
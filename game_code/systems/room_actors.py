@@ -0,0 +1,188 @@
+import asyncio
+from collections import namedtuple
+
+from game_code.entities.characters.player import Player
+from game_code.game import Game
+from game_code.systems.shared_world import SharedWorld
+from game_code.world.world_builder import WorldBuilder
+
+Message = namedtuple("Message", "action player_id player arg reply")
+
+
+class RoomActor:
+    """
+    Owns one room's items, monsters, puzzle, locked exits and players. Every change to the room is a message
+    handled by the actor's task one after another, so no locks are needed. The mailbox is bounded, which makes
+    senders wait when a room falls behind (backpressure), and messages are handled in batches. The task only
+    runs while there are messages, so idle rooms cost nothing.
+    """
+    MAILBOX_SIZE = 256
+    BATCH_SIZE = 64
+
+    def __init__(self, world, room):
+        self.world = world
+        self.room = room
+        self.players = {}  # player id to player
+        self.mailbox = asyncio.Queue(self.MAILBOX_SIZE)
+        self.senders = 0  # senders waiting for room in the mailbox
+        self.task = None
+
+    async def send(self, message):
+        """
+        Post a message, waiting while the mailbox is full.
+        :return: None
+        """
+        self.senders += 1
+        try:
+            await self.mailbox.put(message)
+        finally:
+            self.senders -= 1
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        try:
+            while not self.mailbox.empty():
+                for _ in range(min(self.BATCH_SIZE, self.mailbox.qsize())):
+                    message = self.mailbox.get_nowait()
+                    try:
+                        result = self.handle(message)
+                    except Exception as error:  # the sender gets the error, the room keeps running
+                        if not message.reply.done():
+                            message.reply.set_exception(error)
+                        continue
+                    if not message.reply.done():
+                        message.reply.set_result(result)
+                await asyncio.sleep(0)  # let senders and other rooms run between batches
+        finally:
+            self.task = None
+            self.world.idle(self)
+
+    def handle(self, message):
+        """
+        Apply one message to the room.
+        :return: The reply for the sender.
+        """
+        action, player_id, player, arg = message.action, message.player_id, message.player, message.arg
+        if action == "enter":
+            self.players[player_id] = player
+            player.current_room = self.world.world.resolve(self.room)
+            return "entered"
+        if action == "leave":
+            self.players.pop(player_id, None)
+            return "left"
+        if action == "look":
+            return sorted(other.name for other in self.players.values())
+
+        if player_id not in self.players:
+            return "not here"  # e.g. sent while the player was moving out of the room
+        if not player.is_alive():
+            return "dead"
+        if action == "move":
+            result, next_room = SharedWorld.move(self.room, arg)
+            if next_room is not None:
+                self.players.pop(player_id, None)  # the player is in transit until the next room lets them in
+            return result, next_room
+        if action == "take":
+            return SharedWorld.take(self.room, player, arg)
+        if action == "attack":
+            return SharedWorld.attack(self.room, player, arg)
+        if action == "solve":
+            return self.solve(player, arg)
+        raise ValueError(f"unknown action {action!r}")
+
+    def solve(self, player, answer):
+        puzzle = self.room.puzzle
+        if puzzle is None or puzzle.solved:
+            return "gone"
+        if answer != puzzle.solution:
+            return "incorrect"
+        puzzle.solved = True
+        self.room.remove_puzzle()
+        if puzzle.reward and not player.pick_up(puzzle.reward):
+            self.room.add_item(puzzle.reward)
+        return "solved"
+
+
+class ActorWorld:
+    """
+    A shared world where every room is a RoomActor. Actors are created when a message is sent to their room and
+    dropped again once they are idle and empty, so a world with tens of thousands of rooms only holds actors for
+    the rooms players are in. Must be used from one event loop.
+    """
+
+    def __init__(self, world=None):
+        self.world = world if world is not None else WorldBuilder()
+        self.start_room = self.world.build()
+        self.actors = {}  # room name to RoomActor
+        self.next_id = 0
+
+    def actor(self, room):
+        actor = self.actors.get(room.name)
+        if actor is None:
+            actor = self.actors[room.name] = RoomActor(self, room)
+        return actor
+
+    def idle(self, actor):
+        """
+        Called by an actor whose task stopped; empty rooms are forgotten.
+        :return: None
+        """
+        if (not actor.players and not actor.senders and actor.mailbox.empty()
+                and self.actors.get(actor.room.name) is actor):
+            del self.actors[actor.room.name]
+
+    def running(self):
+        """
+        The number of actors with a running task.
+        """
+        return sum(actor.task is not None for actor in self.actors.values())
+
+    async def send(self, room, action, player_id, player, arg=None):
+        """
+        Send a message to a room's actor and wait for the reply.
+        :return: The reply.
+        """
+        reply = asyncio.get_running_loop().create_future()
+        await self.actor(room).send(Message(action, player_id, player, arg, reply))
+        return await reply
+
+    async def join(self, name):
+        """
+        Add a player at the starting room.
+        :return: The player's id and the Player.
+        """
+        player_id = self.next_id
+        self.next_id += 1
+        player = Player(name, *Game.PLAYER[1:])
+        player.current_room = self.start_room
+        await self.send(self.start_room, "enter", player_id, player)
+        return player_id, player
+
+    async def leave(self, player_id, player):
+        await self.send(player.current_room, "leave", player_id, player)
+
+    async def move(self, player_id, player, direction):
+        """
+        Ask the player's room to let them out, then ask the next room to let them in.
+        :return: The result, e.g. "moved" or "blocked".
+        """
+        result, next_room = await self.send(player.current_room, "move", player_id, player, direction)
+        if next_room is not None:
+            await self.send(next_room, "enter", player_id, player)
+        return result
+
+    async def take(self, player_id, player, item_name):
+        return await self.send(player.current_room, "take", player_id, player, item_name)
+
+    async def attack(self, player_id, player, monster_name):
+        return await self.send(player.current_room, "attack", player_id, player, monster_name)
+
+    async def solve(self, player_id, player, answer):
+        return await self.send(player.current_room, "solve", player_id, player, answer)
+
+    async def look(self, player_id, player):
+        """
+        The names of the players in the player's room.
+        """
+        return await self.send(player.current_room, "look", player_id, player)
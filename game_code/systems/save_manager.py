@@ -0,0 +1,515 @@
+import copy
+import os
+import queue
+import struct
+import threading
+import zlib
+
+from game_code.entities.room import Monsters
+from game_code.systems.state_hash import changed_room
+
+MAGIC = b"CLAB"
+FORMAT_VERSION = 2  # 2 writes a stack as one record, 1 wrote a record per item
+HEADER = struct.Struct("<4sHBxIQI")  # magic, version, kind, payload length, generation, crc32 of the payload
+FULL, DELTA = 0, 1
+
+# room flags
+KERNEL_UNLOCK, HAS_PUZZLE, PUZZLE_SOLVED, NEW_DESCRIPTION = 1, 2, 4, 8
+
+
+class SaveError(Exception):
+    """
+    Raised when a save file can't be read, e.g. it is corrupted or from a newer version of the game.
+    """
+
+
+class RecordWriter:
+    """
+    Packs records into bytes using variable-length integers and a table of the strings used.
+    """
+
+    def __init__(self):
+        self.body = bytearray()
+        self.strings = {}
+
+    def uint(self, n):
+        while n >= 0x80:
+            self.body.append((n & 0x7F) | 0x80)
+            n >>= 7
+        self.body.append(n)
+
+    def int(self, n):
+        self.uint(n * 2 if n >= 0 else -n * 2 - 1)  # zigzag so small negatives stay small
+
+    def string(self, text):
+        """
+        Write a string (or None) as an index into the string table.
+        """
+        if text is None:
+            self.uint(0)
+            return
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings) + 1
+        self.uint(index)
+
+    def getvalue(self):
+        table = RecordWriter()
+        table.uint(len(self.strings))
+        for text in self.strings:
+            data = text.encode("utf-8")
+            table.uint(len(data))
+            table.body += data
+        return bytes(table.body + self.body)
+
+
+class RecordReader:
+    """
+    Reads records packed by RecordWriter.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        self.strings = [None]
+        for _ in range(self.uint()):
+            length = self.uint()
+            self.strings.append(bytes(self.data[self.pos:self.pos + length]).decode("utf-8"))
+            self.pos += length
+
+    def uint(self):
+        n = shift = 0
+        while True:
+            byte = self.data[self.pos]
+            self.pos += 1
+            n |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return n
+            shift += 7
+
+    def int(self):
+        n = self.uint()
+        return n >> 1 if not n & 1 else -(n >> 1) - 1
+
+    def string(self):
+        return self.strings[self.uint()]
+
+
+class SaveManager:
+    """
+    Saves and loads the player and world state in a compact, versioned binary format.
+    A save is a full snapshot (written atomically through a temporary file and a rename) plus a log of
+    delta segments, each holding only the rooms that changed since the previous checkpoint. Every segment is
+    zlib-compressed and checksummed, and a torn or corrupted segment at the end of the log is ignored.
+    Checkpoints are encoded on the game thread and written by a background thread.
+    """
+    COMPACT_EVERY = 32  # deltas written before the next checkpoint is a full snapshot
+
+    def __init__(self, path):
+        """
+        :param path: The save file, or None for a manager that only encodes and decodes records.
+        """
+        self.path = path
+        self.log_path = None if path is None else path + ".log"
+        self.dirty = set()  # names of rooms changed since the last checkpoint
+        self.generation = None  # generation of the snapshot on disk, None if there isn't one
+        self.deltas = 0
+        self.jobs = queue.Queue()
+        self.thread = None
+
+    def record(self, delta):
+        """
+        Called by the StateHash for every change, to remember which rooms need saving.
+        :param delta: The change, see Rewind.revert.
+        :return: None
+        """
+        room = changed_room(delta)
+        if room is not None:
+            self.dirty.add(room)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    # writing
+
+    def encode(self, player, rooms):
+        """
+        Encode the player and some rooms.
+        :return: The uncompressed payload.
+        """
+        writer = RecordWriter()
+        self.encode_player(writer, player)
+        writer.uint(len(rooms))
+        for room in rooms:
+            self.encode_room(writer, room)
+        return writer.getvalue()
+
+    def encode_player(self, writer, player):
+        writer.string(player.current_room.name)
+        for value in (player.hp, player.max_hp, player.attack_power, player.weight, player.max_weight):
+            writer.int(value)
+        writer.uint(player.scannable)
+        writer.string(player.equipped_weapon.name if player.equipped_weapon else None)
+        writer.string(player.equipped_med.name if player.equipped_med else None)
+        self.encode_items(writer, player.storage)
+
+    def encode_room(self, writer, room):
+        flags = (KERNEL_UNLOCK * room.kernel_unlock
+                 | HAS_PUZZLE * (room.puzzle is not None)
+                 | PUZZLE_SOLVED * bool(room.puzzle and room.puzzle.solved)
+                 | NEW_DESCRIPTION * room.description_updated)
+        writer.string(room.name)
+        writer.uint(flags)
+        if room.puzzle is not None:
+            writer.string(room.puzzle.name)
+        if room.description_updated:
+            writer.string(room.description)
+        writer.uint(len(room.locked_exits))
+        for direction, lock_id in room.locked_exits.items():
+            writer.string(direction)
+            writer.string(lock_id)
+        self.encode_items(writer, room.items)
+        writer.uint(len(room.monsters))
+        for monster in room.monsters.values():
+            writer.string(monster.name)
+            writer.int(monster.hp)
+
+    @staticmethod
+    def encode_items(writer, items):
+        # a stack is one record: the items below the top one are unused
+        writer.uint(len(items))
+        for item in items.values():
+            writer.string(item.name)
+            writer.uint(item.count)
+            writer.uint(getattr(item, "uses", -1) + 1)  # 0 for items without uses
+
+    def save(self, game):
+        """
+        Write a full snapshot now, waiting for it to reach the disk.
+        :param game: The game to save.
+        :return: None
+        """
+        self.flush()
+        payload = self.encode(game.player, list(game.world.current_rooms()))
+        self.generation = 0 if self.generation is None else self.generation + 1
+        self.write(FULL, payload, self.generation)
+        self.dirty.clear()
+        self.deltas = 0
+
+    def checkpoint(self, game):
+        """
+        Queue an autosave of what changed since the last checkpoint, written on a background thread.
+        :param game: The game to save.
+        :return: None
+        """
+        if self.generation is None or self.deltas >= self.COMPACT_EVERY:
+            kind, rooms = FULL, list(game.world.current_rooms())
+            self.generation = 0 if self.generation is None else self.generation + 1
+            self.deltas = 0
+        else:
+            kind, rooms = DELTA, [game.world.lookup(name) for name in sorted(self.dirty)]
+            self.deltas += 1
+        self.dirty.clear()
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.writer, name="autosave", daemon=True)
+            self.thread.start()
+        self.jobs.put((kind, self.encode(game.player, rooms), self.generation))
+
+    def writer(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None:
+                    return
+                self.write(*job)
+            finally:
+                self.jobs.task_done()
+
+    def write(self, kind, payload, generation):
+        """
+        Compress and write one segment to disk.
+        :return: None
+        """
+        data = zlib.compress(payload)
+        segment = HEADER.pack(MAGIC, FORMAT_VERSION, kind, len(data), generation, zlib.crc32(data)) + data
+
+        if kind == FULL:
+            temp = self.path + ".tmp"
+            with open(temp, "wb") as file:
+                file.write(segment)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp, self.path)
+            open(self.log_path, "wb").close()  # older deltas belong to the previous generation
+        else:
+            with open(self.log_path, "ab") as file:
+                file.write(segment)
+                file.flush()
+                os.fsync(file.fileno())
+
+    def flush(self):
+        """
+        Wait for queued autosaves to be written.
+        :return: None
+        """
+        if self.thread is not None:
+            self.jobs.join()
+
+    def close(self):
+        """
+        Write any queued autosaves and stop the background thread.
+        :return: None
+        """
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def delete(self):
+        """
+        Remove the save, e.g. when the player restarts.
+        :return: None
+        """
+        self.close()
+        for path in (self.path, self.log_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.generation = None
+        self.deltas = 0
+        self.dirty.clear()
+
+    # reading
+
+    @staticmethod
+    def read_segment(data, pos):
+        """
+        Read the segment starting at pos.
+        :return: kind, generation, payload, format version and the position after the segment.
+        :raises SaveError: If the segment is truncated, corrupted or from a newer version.
+        """
+        if len(data) - pos < HEADER.size:
+            raise SaveError("truncated segment header")
+        magic, version, kind, length, generation, crc = HEADER.unpack_from(data, pos)
+        if magic != MAGIC:
+            raise SaveError("not a save file")
+        if version > FORMAT_VERSION:
+            raise SaveError(f"save format {version} is newer than this game ({FORMAT_VERSION})")
+        start = pos + HEADER.size
+        data = data[start:start + length]
+        if len(data) != length or zlib.crc32(data) != crc:
+            raise SaveError("checksum mismatch")
+        return kind, generation, zlib.decompress(data), version, start + length
+
+    def decode(self, payload, rooms, version=FORMAT_VERSION):
+        """
+        Decode a payload, updating rooms (by name) with the records it holds.
+        :param version: The format the payload was written in.
+        :return: The player record.
+        """
+        reader = RecordReader(payload)
+        player = {
+            "room": reader.string(),
+            "stats": [reader.int() for _ in range(5)],
+            "scannable": bool(reader.uint()),
+            "weapon": reader.string(),
+            "med": reader.string(),
+            "storage": self.decode_items(reader, version),
+        }
+        for _ in range(reader.uint()):
+            name = reader.string()
+            flags = reader.uint()
+            record = {"flags": flags, "puzzle": None, "description": None}
+            if flags & HAS_PUZZLE:
+                record["puzzle"] = reader.string()
+            if flags & NEW_DESCRIPTION:
+                record["description"] = reader.string()
+            record["locks"] = {reader.string(): reader.string() for _ in range(reader.uint())}
+            record["items"] = self.decode_items(reader, version)
+            record["monsters"] = [(reader.string(), reader.int()) for _ in range(reader.uint())]
+            rooms[name] = record
+        return player
+
+    @staticmethod
+    def decode_items(reader, version):
+        """
+        :return: List of (name, count, uses of the top item) records.
+        """
+        if version == 1:  # a record per item, which take_items stacks again
+            return [(reader.string(), 1, reader.uint() - 1) for _ in range(reader.uint())]
+        return [(reader.string(), reader.uint(), reader.uint() - 1) for _ in range(reader.uint())]
+
+    def read(self):
+        """
+        Read the snapshot and the deltas that belong to it.
+        :return: The player record and the room records by name.
+        """
+        with open(self.path, "rb") as file:
+            data = file.read()
+        kind, generation, payload, version, _ = self.read_segment(data, 0)
+        if kind != FULL:
+            raise SaveError("save file does not start with a snapshot")
+        rooms = {}
+        player = self.decode(payload, rooms, version)
+
+        deltas = 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "rb") as file:
+                log = file.read()
+            pos = 0
+            while pos < len(log):
+                try:
+                    kind, segment_generation, payload, version, pos = self.read_segment(log, pos)
+                except SaveError:
+                    break  # a torn write at the end of the log, everything before it is good
+                if segment_generation == generation:
+                    player = self.decode(payload, rooms, version)
+                    deltas += 1
+
+        self.generation = generation
+        self.deltas = deltas
+        return player, rooms
+
+    def load(self, game):
+        """
+        Restore a saved run into a game whose world has just been built.
+        :param game: The game, before its state is tracked.
+        :return: True if a save was loaded, False if there is none.
+        :raises SaveError: If the save can't be read or doesn't match the world.
+        """
+        if not self.exists():
+            return False
+        self.apply(game, *self.read())
+        self.dirty.clear()
+        return True
+
+    def apply(self, game, player_record, room_records):
+        """
+        Restore decoded records into a game whose world has just been built or forked.
+        :raises SaveError: If the records don't match the world.
+        :return: None
+        """
+        world = game.world
+        try:
+            # items only move between rooms that are saved, so those rooms hold every entity needed
+            world_rooms = {name: world.resolve(world.lookup(name)) for name in {*room_records, player_record["room"]}}
+            pool = EntityPool(world_rooms.values())
+            # monsters and puzzles first, so the rewards they still hold aren't handed out as loose items
+            for name, record in room_records.items():
+                self.apply_encounters(world_rooms[name], record, pool)
+            for name, record in room_records.items():
+                self.apply_room(world_rooms[name], record, pool)
+            self.apply_player(game.player, player_record, world_rooms, pool)
+        except KeyError as error:
+            raise SaveError(f"save does not match the world: {error}") from error
+
+    @staticmethod
+    def apply_encounters(room, record, pool):
+        room.monsters = Monsters()
+        for name, hp in record["monsters"]:
+            monster = pool.take("monster", name)
+            monster.hp = hp
+            pool.claim(monster.reward)
+            room.monsters[name] = monster
+
+        room.puzzle = None
+        if record["puzzle"] is not None:
+            puzzle = pool.take("puzzle", record["puzzle"])
+            puzzle.solved = bool(record["flags"] & PUZZLE_SOLVED)
+            if not puzzle.solved:
+                pool.claim(puzzle.reward)
+            room.puzzle = puzzle
+
+    @staticmethod
+    def apply_room(room, record, pool):
+        room.kernel_unlock = bool(record["flags"] & KERNEL_UNLOCK)
+        if record["description"] is not None:
+            room.update_description(record["description"])
+        room.locked_exits = dict(record["locks"])
+        room.exit_line = None
+        room.items = pool.take_items(record["items"])
+
+    @staticmethod
+    def apply_player(player, record, world_rooms, pool):
+        player.current_room = world_rooms[record["room"]]
+        player.hp, player.max_hp, player.attack_power, player.weight, player.max_weight = record["stats"]
+        player.scannable = record["scannable"]
+        player.storage = pool.take_items(record["storage"])
+        player.equipped_weapon = player.storage.get(record["weapon"]) if record["weapon"] else None
+        player.equipped_med = player.storage.get(record["med"]) if record["med"] else None
+
+
+class EntityPool:
+    """
+    The items, monsters and puzzles of a freshly built world (including rewards) by name,
+    handed out as a save is restored.
+    """
+
+    def __init__(self, rooms):
+        self.free = {}  # (kind, name) to the entities not placed yet, by id
+        self.last = {}  # (kind, name) to the last entity handed out, copied if more are needed
+        for room in rooms:
+            for item in room.items.values():
+                self.add("item", item)
+            for monster in room.monsters.values():
+                self.add("monster", monster)
+                self.add("item", monster.reward)
+                self.add_loot(monster.loot)
+            if room.puzzle:
+                self.add("puzzle", room.puzzle)
+                self.add("item", room.puzzle.reward)
+                self.add_loot(room.puzzle.loot)
+
+    def add(self, kind, entity):
+        if entity is not None:
+            self.free.setdefault((kind, entity.name), {})[id(entity)] = entity
+
+    def add_loot(self, loot):
+        # dropped items are copies of the table's prototypes, which are never handed out themselves
+        if loot is not None:
+            for item in loot.prototypes():
+                self.last.setdefault(("item", item.name), item)
+
+    def claim(self, item):
+        """
+        Stop an item from being handed out, e.g. the reward of a monster that is still alive.
+        :return: None
+        """
+        if item is not None:
+            self.free.get(("item", item.name), {}).pop(id(item), None)
+
+    def take(self, kind, name):
+        """
+        Hand out an entity; once every entity of that name is placed, copies are made, e.g. for a duplicated item.
+        :raises KeyError: If the world has no entity of that kind and name.
+        """
+        key = (kind, name)
+        entities = self.free.get(key)
+        if entities:
+            entity = self.last[key] = entities.popitem()[1]
+            return entity
+        entity = self.last[key]
+        duplicate = entity.copy()
+        return duplicate if duplicate is not entity else copy.copy(entity)
+
+    def take_item(self, name, count, uses):
+        item = self.take("item", name)
+        item.count = count  # the entity may be a copy of an item that was stacked
+        if uses >= 0:
+            item.uses = uses
+        return item
+
+    def take_items(self, records):
+        """
+        Hand out the items of a room or storage, stacking the records of items with the same name.
+        :param records: List of (name, count, uses).
+        :return: Dictionary of item name to item.
+        """
+        items = {}
+        for name, count, uses in records:
+            item = self.take_item(name, count, uses)
+            if name in items:
+                items[name].stack(item)
+            else:
+                items[name] = item
+        return items
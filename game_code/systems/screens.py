@@ -0,0 +1,201 @@
+from game_code.systems.list_menu import ListMenu
+
+
+class Screen:
+    """
+    One screen of the UI, such as the storage menu or a fight, on the game's ScreenStack.
+    A screen reads its own input and acts on it one event at a time, so going from one screen to another never
+    nests calls. What a screen draws is cached with the state hash it was drawn at, and a screen that is shown
+    again (e.g. after the screen on top of it is closed) is redrawn from the cache if the game hasn't changed.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.ui = game.ui
+        self.stack = None  # set when the screen is pushed
+        self.cache = None  # the lines last drawn
+        self.drawn_at = None  # the state hash the cache was drawn at
+
+    def lines(self):
+        """
+        What the screen shows, overridden by each screen.
+        :return: List of lines.
+        """
+        return []
+
+    def draw(self):
+        """
+        Draw the screen, from the cache if neither the game nor the screen changed since it was last drawn.
+        :return: None
+        """
+        state = self.game.state_hash.value
+        if self.cache is None or self.drawn_at != state:
+            self.cache, self.drawn_at = self.lines(), state
+        self.paint("\n".join(self.cache))
+
+    def paint(self, text):
+        """
+        Put the screen's text on the UI; by default in the log area.
+        :return: None
+        """
+        self.ui.clear_logs()
+        self.ui.display_text(text, typing=False)
+
+    def invalidate(self):
+        """
+        Drop the cache, e.g. after the cursor of a menu moved.
+        :return: None
+        """
+        self.cache = None
+
+    def shown(self):
+        """
+        Called when the screen comes to the top of the stack, by being opened or by the screen above it closing.
+        :return: None
+        """
+        self.draw()
+
+    def read(self):
+        """
+        Wait for the screen's next input.
+        :return: The key, or a line of text for screens that read text.
+        """
+        return self.ui.wait_for_key()
+
+    def handle(self, event):
+        """
+        Act on one input, overridden by each screen.
+        :return: None
+        """
+
+    def close(self):
+        """
+        Close this screen and everything on top of it, showing the screen below.
+        :return: None
+        """
+        self.stack.pop(self)
+
+    def closed(self):
+        """
+        Called when the screen is taken off the stack.
+        :return: None
+        """
+
+
+class ListScreen(Screen):
+    """
+    A screen for a ListMenu of items, which calls on_choose with the chosen item after closing.
+    ESC opens the pause screen on top of the menu, and resuming comes back to the same page.
+    """
+
+    def __init__(self, game, items, title, on_choose, **options):
+        """
+        :param options: The ListMenu's label and footer.
+        """
+        super().__init__(game)
+        self.items = items
+        self.on_choose = on_choose
+        self.menu = ListMenu(self.ui, items, title, **options)
+
+    def lines(self):
+        return self.menu.lines()
+
+    def handle(self, key):
+        outcome = self.menu.handle(key)
+        if outcome == "escape":
+            self.game.menu.pause_menu()
+        elif outcome == "back":
+            self.ui.clear_logs()
+            self.close()
+        elif outcome == "changed":
+            self.invalidate()
+            self.draw()
+        elif outcome is not None:
+            self.chosen(self.items[outcome[1]])
+
+    def chosen(self, item):
+        """
+        Called with the chosen item; by default the menu closes first.
+        :return: None
+        """
+        self.close()
+        self.on_choose(item)
+
+
+class ScreenStack:
+    """
+    The screens that are open, where the screen on top gets the input. One loop reads the input for whichever
+    screen is on top, so menus that open other menus (storage, inspect, pause) push and pop screens instead of
+    calling each other.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.screens = []
+        self.running = False  # whether a loop is reading input for the screens
+        self.result = None  # set by a screen to leave the game, e.g. "restart" or "quit"
+
+    def __len__(self):
+        return len(self.screens)
+
+    @property
+    def top(self):
+        return self.screens[-1] if self.screens else None
+
+    def push(self, screen):
+        screen.stack = self
+        self.screens.append(screen)
+        screen.shown()
+
+    def pop(self, screen):
+        """
+        Take a screen and the screens above it off the stack, showing the screen that is now on top.
+        :return: None
+        """
+        if screen not in self.screens:
+            return
+        while self.screens:
+            closing = self.screens.pop()
+            closing.closed()
+            if closing is screen:
+                break
+        if self.screens and self.running:
+            self.top.shown()
+
+    def finish(self, result):
+        """
+        Leave the game with a result such as "quit", closing every screen.
+        :return: None
+        """
+        self.result = result
+
+    def open(self, screen):
+        """
+        Open a screen. Inside the loop the screen is pushed and gets the next input; otherwise (a handler called
+        directly, e.g. by a scripted player) the loop runs until the screen closes.
+        :return: The result the game is left with, if a screen finished it.
+        """
+        if self.running:
+            self.push(screen)
+            return None
+        return self.run(screen)
+
+    def run(self, screen):
+        """
+        Push a screen and run the loop until it is closed, the game is over or a screen finishes the game.
+        Screens the loop leaves open (e.g. because scripted input ran out) are dropped.
+        :return: The result the game is left with, if any.
+        """
+        depth = len(self.screens)
+        self.running = True
+        try:
+            self.push(screen)
+            while len(self.screens) > depth and self.result is None and not self.game.game_over:
+                top = self.top
+                top.handle(top.read())
+        finally:
+            self.running = False
+            while len(self.screens) > depth:
+                self.screens.pop().closed()
+        result, self.result = self.result, None
+        return result
@@ -0,0 +1,266 @@
+"""
+Hosts many headless game sessions over TCP on one asyncio event loop, one session per connection, e.g. for load
+tests (see benchmarks/bench_load.py). Clients speak the control socket's protocol (see control.py): a JSON
+command or batch of commands per line, answered by a line with the results and a snapshot of the game. The line
+{"cmd": "stats"} is answered with the server's counters instead, without starting a session.
+
+With an IdleKeeper (see idle_sessions.py), idle sessions are warned, hibernated and eventually closed. The server
+tells the client with lines of their own, which clients can tell from answers by their "event" key:
+{"event": "idle", "seconds_left": 3300} and {"event": "closed"}.
+
+Every session's world is forked from one pristine template, so a new session costs O(1) instead of a world build.
+
+Run from the repository root:
+    python -m game_code.systems.session_server --port 7777
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from game_code.game import Game, GameScreen
+from game_code.systems.control import Driver, parse
+from game_code.systems.headless_ui import HeadlessUI, InputExhausted
+from game_code.systems.idle_sessions import IdleKeeper, freeze, reopen, thaw
+
+
+def resident_memory():
+    """
+    :return: The bytes of memory the process has resident, or its peak where that can't be read.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Session:
+    """
+    A headless game played a request at a time. Its screens are read like the game loop reads them, so a menu or
+    a fight stays open between requests. A prompt read inside a handler, such as a puzzle's answer or equipping a
+    picked up item, must be answered in the same batch; otherwise it is dropped, as in a Shard.
+    """
+
+    def __init__(self, template, seed):
+        """
+        :param template: The pristine world template the session's world is forked from, see Game.pristine.
+        :param seed: The session's random seed.
+        """
+        self.template = template
+        self.seed = seed
+        self.path = None  # the file the session is hibernated in
+        game = Game(ui=HeadlessUI(), seed=seed)
+        game.template = template
+        game.initialise_game()
+        self.start(game)
+
+    def start(self, game):
+        game.screens.running = True  # screens opened by handlers are pushed, and read by play
+        game.screens.push(GameScreen(game))
+        self.game = game
+        self.driver = Driver(game)
+
+    @property
+    def hibernated(self):
+        return self.game is None
+
+    def hibernate(self, path):
+        """
+        Write the game to a file and let go of it, see idle_sessions.py.
+        :return: True if the session is hibernated, False if a screen is open that couldn't be opened again.
+        """
+        data = freeze(self.game)
+        if data is None:
+            return False
+        temp = path + ".tmp"
+        with open(temp, "wb") as file:
+            file.write(data)
+        os.replace(temp, path)
+        self.path = path
+        self.game = self.driver = None
+        return True
+
+    def wake(self):
+        """
+        Rebuild a hibernated game, with the screens it was left on.
+        :return: None
+        """
+        with open(self.path, "rb") as file:
+            game, screens = thaw(file.read(), self.template, self.seed)
+        os.remove(self.path)
+        self.path = None
+        self.start(game)
+        reopen(game, screens)
+
+    def over(self):
+        """
+        :return: True once the game is over or a screen has left it, e.g. quitting from the pause menu.
+        """
+        return self.game.game_over or self.game.screens.result is not None
+
+    def play(self, request):
+        """
+        Run a request's commands.
+        :param request: The Request, see control.parse.
+        :return: The answer, see Driver.reply.
+        """
+        game = self.game
+        if request.error is None:
+            game.ui.on_input = lambda: self.driver.feed(request)
+            try:
+                while not self.over():
+                    top = game.screens.top
+                    top.handle(top.read())
+            except InputExhausted:
+                pass  # every command has run
+            finally:
+                game.ui.on_input = None
+            if self.driver.running:  # the game ended during the command
+                self.driver.running = False
+                request.results.append(self.driver.result())
+            while len(request.results) < len(request.commands):
+                request.results.append({"ok": False, "error": "the game is over"})
+        return self.driver.reply(request)
+
+
+class SessionServer:
+    """
+    Accepts connections and plays a Session for each.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, keeper=None):
+        """
+        :param keeper: The IdleKeeper that manages idle sessions, if any.
+        """
+        self.host = host
+        self.port = port
+        self.template = Game(ui=HeadlessUI()).pristine()
+        self.server = None
+        self.address = None
+        self.ticker = None
+        self.keeper = keeper
+        self.writers = {}  # session to the writer of its connection
+        if keeper is not None:
+            keeper.on_warn = self.warn
+            keeper.on_close = self.expire
+        self.sessions = 0  # sessions connected
+        self.peak = 0
+        self.started = 0
+        self.actions = 0  # commands run
+
+    async def start(self):
+        """
+        Start listening.
+        :return: The (host, port) the server listens on.
+        """
+        self.server = await asyncio.start_server(self.serve, self.host, self.port, limit=1 << 20)
+        self.address = self.server.sockets[0].getsockname()[:2]
+        if self.keeper is not None:
+            self.ticker = asyncio.create_task(self.tick())
+        return self.address
+
+    async def tick(self):
+        while True:
+            await asyncio.sleep(self.keeper.tick)
+            self.keeper.advance()
+
+    def warn(self, session, seconds_left):
+        self.event(session, {"event": "idle", "seconds_left": seconds_left})
+
+    def expire(self, session):
+        self.event(session, {"event": "closed"})
+        self.writers[session].close()  # which ends its serve
+
+    def event(self, session, message):
+        self.writers[session].write((json.dumps(message) + "\n").encode("utf-8"))
+
+    async def serve(self, reader, writer):
+        session = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = parse(line)
+                if request.error is None and request.commands == [{"cmd": "stats"}]:
+                    answer = self.stats()
+                else:
+                    if session is None:
+                        session = Session(self.template, self.started)
+                        self.started += 1
+                        self.sessions += 1
+                        self.peak = max(self.peak, self.sessions)
+                        self.writers[session] = writer
+                        if self.keeper is not None:
+                            self.keeper.add(session)
+                    elif self.keeper is not None:
+                        self.keeper.touch(session)
+                    answer = session.play(request)
+                    self.actions += len(request.commands)
+                writer.write((json.dumps(answer) + "\n").encode("utf-8"))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            if session is not None:
+                self.sessions -= 1
+                del self.writers[session]
+                if self.keeper is not None:
+                    self.keeper.forget(session)
+            writer.close()
+
+    def stats(self):
+        """
+        The server's counters, which load tests sample.
+        :return: Dictionary of sessions connected, their peak, sessions started, commands run, the CPU seconds
+        the process has used and its resident memory in bytes.
+        """
+        stats = {"ok": True, "sessions": self.sessions, "peak": self.peak, "started": self.started,
+                 "actions": self.actions, "cpu": time.process_time(), "rss": resident_memory()}
+        if self.keeper is not None:
+            stats.update(self.keeper.counts)
+        return stats
+
+    async def close(self):
+        if self.ticker is not None:
+            self.ticker.cancel()
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def serve_forever(host, port, keeper=None):
+    server = SessionServer(host, port, keeper)
+    host, port = await server.start()
+    print(f"listening on {host}:{port}", flush=True)
+    await server.server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host headless game sessions over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777, help="0 picks a free port")
+    parser.add_argument("--hibernate", metavar="FOLDER", help="hibernate idle sessions to this folder")
+    parser.add_argument("--warn-after", type=float, default=300, help="seconds idle before a session is warned")
+    parser.add_argument("--hibernate-after", type=float, default=600, help="seconds idle before it hibernates")
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds idle before it is closed")
+    args = parser.parse_args()
+    keeper = None
+    if args.hibernate:
+        keeper = IdleKeeper(args.hibernate, args.warn_after, args.hibernate_after, args.timeout)
+    try:
+        import resource
+        _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))  # a socket per session
+    except (ImportError, ValueError, OSError):
+        pass
+    try:
+        asyncio.run(serve_forever(args.host, args.port, keeper))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
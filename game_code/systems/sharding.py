@@ -0,0 +1,367 @@
+"""
+Splits a world into shards that run in their own worker processes, so a big multiplayer world isn't limited to
+one Python process. Rooms are split to cut as few exits as possible, and a player's session lives in the shard
+that owns their room: when a move crosses into another shard, the session (the Player and the keys it has left)
+is handed off to that shard over the coordinator's pipes.
+"""
+import heapq
+import multiprocessing
+from collections import deque
+
+from game_code.entities.characters.player import Player
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI, InputExhausted
+from game_code.world.world_builder import WorldBuilder
+
+
+def partition(graph, shards):
+    """
+    Split a room graph into shards of (nearly) equal size with few exits between them, by recursive bisection:
+    each half is grown from the edge of the graph one room at a time, preferring rooms with the most exits into
+    the half, and the cut between the halves is then improved by moving rooms across it.
+    :param graph: Dictionary of room name to the names of the rooms next to it, see WorldBuilder.graph.
+    :param shards: The number of shards.
+    :return: Dictionary of room name to shard index.
+    """
+    owner = {}
+    split(graph, sorted(graph), shards, 0, owner)
+    return owner
+
+
+def split(graph, nodes, shards, first, owner):
+    if shards == 1 or len(nodes) <= 1:
+        for node in nodes:
+            owner[node] = first
+        return
+    left_shards = shards // 2
+    target = len(nodes) * left_shards // shards
+    region = grow_region(graph, nodes, target)
+    refine_cut(graph, nodes, region, target)
+    split(graph, [node for node in nodes if node in region], left_shards, first, owner)
+    split(graph, [node for node in nodes if node not in region], shards - left_shards, first + left_shards, owner)
+
+
+def farthest(graph, start, inside):
+    """
+    The last room reached by a breadth-first search, which is on the edge of the graph.
+    """
+    seen, queue, node = {start}, deque([start]), start
+    while queue:
+        node = queue.popleft()
+        for neighbour in graph[node]:
+            if neighbour in inside and neighbour not in seen:
+                seen.add(neighbour)
+                queue.append(neighbour)
+    return node
+
+
+def grow_region(graph, nodes, target):
+    """
+    Grow a region of target rooms. The next room is always the one whose exits lead most into the region
+    (and least out of it), which keeps the region compact; ties go to the room found first.
+    :return: Set of room names.
+    """
+    inside = set(nodes)
+    region = set()
+    gain = {}  # rooms next to the region: exits into the region minus exits out of it
+    heap = []
+    order = 0
+    unvisited = iter(nodes)  # seeds for parts of the graph the region can't reach
+    seed = farthest(graph, farthest(graph, nodes[0], inside), inside)
+    while len(region) < target:
+        if not heap:
+            seed = next(node for node in unvisited if node not in region)
+            gain[seed] = 0
+            heap.append((0, order, seed))
+        negative_gain, _, node = heapq.heappop(heap)
+        if node in region or -negative_gain != gain[node]:
+            continue  # stale entry
+        region.add(node)
+        for neighbour in graph[node]:
+            if neighbour in inside and neighbour not in region:
+                if neighbour not in gain:
+                    gain[neighbour] = -sum(other in inside for other in graph[neighbour])
+                gain[neighbour] += 2
+                order += 1
+                heapq.heappush(heap, (-gain[neighbour], order, neighbour))
+    return region
+
+
+def refine_cut(graph, nodes, region, target, passes=8):
+    """
+    Move rooms across the cut while that cuts fewer exits and keeps both sides within a small slack of
+    their target size.
+    :return: None
+    """
+    inside = set(nodes)
+    slack = max(1, len(nodes) // 50)
+    sizes = {True: len(region), False: len(nodes) - len(region)}
+    targets = {True: target, False: len(nodes) - target}
+    for _ in range(passes):
+        moved = False
+        for node in nodes:
+            side = node in region
+            same = other = 0
+            for neighbour in graph[node]:
+                if neighbour in inside:
+                    if (neighbour in region) == side:
+                        same += 1
+                    else:
+                        other += 1
+            if other <= same:
+                continue
+            if sizes[side] - 1 < targets[side] - slack or sizes[not side] + 1 > targets[not side] + slack:
+                continue
+            if side:
+                region.remove(node)
+            else:
+                region.add(node)
+            sizes[side] -= 1
+            sizes[not side] += 1
+            moved = True
+        if not moved:
+            break
+
+
+def cut_edges(graph, owner):
+    """
+    The number of two-way exits between rooms in different shards.
+    """
+    return sum(owner[node] != owner[neighbour] for node in graph for neighbour in graph[node]) // 2
+
+
+class Handoff(Exception):
+    """
+    Raised when a player tries to enter a room owned by another shard.
+    """
+
+    def __init__(self, room, shard):
+        super().__init__(f"{room} is owned by shard {shard}")
+        self.room = room
+        self.shard = shard
+
+
+class ShardWorld:
+    """
+    A shard's view of the world. Every worker builds the whole world but players may only enter the rooms
+    its shard owns; resolving any other room raises Handoff, which stops the move before the player leaves.
+    """
+
+    def __init__(self, world, owner, index):
+        self.world = world
+        self.owner = owner
+        self.index = index
+
+    def resolve(self, room):
+        shard = self.owner[room.name]
+        if shard != self.index:
+            raise Handoff(room.name, shard)
+        return self.world.resolve(room)
+
+    def __getattr__(self, name):
+        return getattr(self.world, name)
+
+
+class Shard:
+    """
+    The sessions of one shard. Each session is a headless Game sharing the shard's world, which plays the keys
+    its player sends.
+    """
+
+    def __init__(self, index, world, owner):
+        self.index = index
+        self.world = ShardWorld(world, owner, index)
+        self.sessions = {}  # session id to Game
+
+    def handle(self, request):
+        """
+        Handle one request from the coordinator.
+        :param request: ("adopt", session id, player, room name, keys, random states), ("play", session id, keys)
+        or ("leave", session id).
+        :return: The reply, see play.
+        """
+        action, session_id = request[:2]
+        if action == "adopt":
+            _, _, player, room, keys, states = request
+            self.adopt(session_id, player, room, states)
+            return self.play(session_id, keys)
+        if action == "play":
+            return self.play(session_id, request[2])
+        if action == "leave":
+            game = self.sessions.pop(session_id)
+            game.player.current_room = None
+            return "left", session_id, game.player
+        raise ValueError(f"unknown request {action!r}")
+
+    def adopt(self, session_id, player, room, states=None):
+        """
+        Start playing a session in this shard.
+        :param states: The states of the session's random streams, None for a new session.
+        :return: None
+        """
+        game = Game(ui=HeadlessUI(), seed=session_id)
+        if states is not None:  # the session's rolls carry on where the last shard left them
+            game.rng.setstate(states[0])
+            game.loot_rng.setstate(states[1])
+        game.world = self.world
+        game.player = player
+        game.puzzle_handler.player = player
+        player.current_room = self.world.resolve(self.world.lookup(room))
+        self.sessions[session_id] = game
+
+    def play(self, session_id, keys):
+        """
+        Play keys in a session, like the game loop does, until they run out, a prompt wants more keys than
+        were sent, or the player moves into another shard. Prompts read their answers from the same keys.
+        :return: ("done", session id, room name, logs) or, when the session leaves this shard,
+        ("handoff", session id, shard, room name, player, keys left, random states, logs).
+        """
+        game = self.sessions[session_id]
+        game.ui.push_input(*keys)
+        try:
+            while game.ui.inputs:
+                game.input_handler.handle(game.ui.get_key())
+        except Handoff as handoff:
+            del self.sessions[session_id]
+            game.player.current_room = None  # the room stays here; the next shard resolves its own
+            keys = list(game.ui.inputs)
+            states = game.rng.getstate(), game.loot_rng.getstate()
+            return ("handoff", session_id, handoff.shard, handoff.room, game.player, keys, states,
+                    self.logs(game))
+        except InputExhausted:
+            pass  # the prompt is dropped, as the keys it was waiting for never came
+        return "done", session_id, game.player.current_room.name, self.logs(game)
+
+    @staticmethod
+    def logs(game):
+        logs = list(game.ui.logs)
+        game.ui.clear_logs()
+        return logs
+
+
+def serve(connection, index, factory, owner):
+    """
+    A shard's worker process: build the world and answer batches of requests until None is received.
+    :return: None
+    """
+    world = factory()
+    world.build()
+    shard = Shard(index, world, owner)
+    while True:
+        requests = connection.recv()
+        if requests is None:
+            break
+        connection.send([shard.handle(request) for request in requests])
+    connection.close()
+
+
+class ShardedWorld:
+    """
+    Runs a world as shards in worker processes. Sessions are driven with keys like a local game, and every
+    shard gets at most one batch of requests per round, so shards play their sessions in parallel.
+    """
+
+    def __init__(self, factory=WorldBuilder, shards=2, owner=None):
+        """
+        :param factory: Builds the world in each worker, such as WorldBuilder or a partial of WorldGenerator.
+        :param shards: The number of worker processes.
+        :param owner: Dictionary of room name to shard index; partitioned from the room graph if not given.
+        """
+        world = factory()
+        self.start_room = world.build().name
+        if owner is None:
+            owner = partition(world.graph(), shards)
+        self.owner = owner
+        self.next_id = 0
+        self.location = {}  # session id to shard index
+        self.handoffs = 0
+
+        self.connections = []
+        self.workers = []
+        for index in range(shards):
+            connection, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=serve, args=(child, index, factory, owner), daemon=True)
+            worker.start()
+            child.close()
+            self.connections.append(connection)
+            self.workers.append(worker)
+
+    def join(self, name, room=None):
+        """
+        Add a player.
+        :param room: The name of the room they start in; the starting room if not given.
+        :return: The session id.
+        """
+        session_id = self.next_id
+        self.next_id += 1
+        player = Player(name, *Game.PLAYER[1:])
+        room = room or self.start_room
+        self.send({self.owner[room]: [("adopt", session_id, player, room, [], None)]})
+        return session_id
+
+    def leave(self, session_id):
+        """
+        Remove a session.
+        :return: The session's Player, whose current room is None.
+        """
+        return self.send({self.location[session_id]: [("leave", session_id)]})[session_id]
+
+    def play(self, session_id, keys):
+        """
+        Play keys in one session.
+        :return: The name of the player's room and what the game said.
+        """
+        return self.step({session_id: keys})[session_id]
+
+    def step(self, inputs):
+        """
+        Play keys in many sessions at once.
+        :param inputs: Dictionary of session id to keys.
+        :return: Dictionary of session id to the name of the player's room and what the game said.
+        """
+        requests = {}
+        for session_id, keys in inputs.items():
+            requests.setdefault(self.location[session_id], []).append(("play", session_id, list(keys)))
+        return self.send(requests)
+
+    def send(self, requests):
+        """
+        Send each shard its batch, then collect the replies; sessions handed off to another shard are adopted
+        by it in the next round, with the keys they have left.
+        :param requests: Dictionary of shard index to requests.
+        :return: Dictionary of session id to reply.
+        """
+        results, logs = {}, {}
+        while requests:
+            for shard, batch in requests.items():
+                self.connections[shard].send(batch)
+            replies = [reply for shard in requests for reply in self.connections[shard].recv()]
+            requests = {}
+            for reply in replies:
+                session_id = reply[1]
+                if reply[0] == "left":
+                    del self.location[session_id]
+                    results[session_id] = reply[2]
+                    continue
+                logs.setdefault(session_id, []).extend(reply[-1])
+                if reply[0] == "handoff":
+                    _, _, shard, room, player, keys, states, _ = reply
+                    self.location[session_id] = shard
+                    self.handoffs += 1
+                    requests.setdefault(shard, []).append(("adopt", session_id, player, room, keys, states))
+                else:
+                    self.location[session_id] = self.owner[reply[2]]
+                    results[session_id] = reply[2], logs[session_id]
+        return results
+
+    def close(self):
+        """
+        Stop the workers.
+        :return: None
+        """
+        for connection in self.connections:
+            connection.send(None)
+            connection.close()
+        for worker in self.workers:
+            worker.join()
+        self.connections, self.workers = [], []
@@ -0,0 +1,211 @@
+import random
+import threading
+from collections import namedtuple
+from queue import Empty, SimpleQueue
+
+from game_code.entities.characters.player import Player
+from game_code.game import Game
+from game_code.world.world_builder import WorldBuilder
+
+Event = namedtuple("Event", "tick player action arg result")
+
+
+class SharedRoom:
+    """
+    The shared state of one room: its lock, the players inside and the actions waiting for the next tick.
+    """
+    __slots__ = ("room", "lock", "players", "pending", "queued")
+
+    def __init__(self, room):
+        self.room = room
+        self.lock = threading.Lock()
+        self.players = {}  # player id to player
+        self.pending = []  # (player id, sequence number, player, action, arg)
+        self.queued = False  # waiting in the world's ready queue
+
+
+class SharedWorld:
+    """
+    A world shared by several players, who see each other and compete for items and kills.
+    Each room's state is guarded by its own lock, so a player only ever contends with the players in the same
+    room. Actions are queued in the player's room and resolved once per tick; within a room they are resolved in
+    an order drawn from the seed, the tick and the room, never from the order they arrived in, so two players
+    grabbing the same item or landing the killing blow on the same monster always get the same winner.
+    """
+    ACTIONS = ("move", "take", "attack")
+
+    def __init__(self, world=None, seed=0):
+        self.world = world if world is not None else WorldBuilder()
+        self.start_room = self.world.build()
+        self.seed = seed
+        self.tick_count = 0
+        self.rooms = {}  # room name to SharedRoom, created on first use
+        self.ready = SimpleQueue()  # rooms with pending actions
+        self.next_id = 0
+        self.id_lock = threading.Lock()
+
+    def shared(self, room):
+        shared = self.rooms.get(room.name)
+        if shared is None:
+            shared = self.rooms.setdefault(room.name, SharedRoom(room))  # atomic, so racing threads agree
+        return shared
+
+    def join(self, name):
+        """
+        Add a player to the world at the starting room.
+        :param name: The player's name.
+        :return: The player's id and the Player.
+        """
+        with self.id_lock:
+            player_id = self.next_id
+            self.next_id += 1
+        player = Player(name, *Game.PLAYER[1:])  # a new player of the game, under their own name
+        player.current_room = self.start_room
+        shared = self.shared(self.start_room)
+        with shared.lock:
+            shared.players[player_id] = player
+        return player_id, player
+
+    def leave(self, player_id, player):
+        shared = self.shared(player.current_room)
+        with shared.lock:
+            shared.players.pop(player_id, None)
+
+    def players_in(self, room):
+        """
+        The names of the players in a room.
+        :return: Sorted list of names.
+        """
+        shared = self.shared(room)
+        with shared.lock:
+            return sorted(player.name for player in shared.players.values())
+
+    def submit(self, player_id, player, action, arg=None):
+        """
+        Queue an action for the next tick, locking only the player's room.
+        :param action: "move", "take" or "attack".
+        :param arg: The direction, item name or monster name.
+        :return: None
+        """
+        if action not in self.ACTIONS:
+            raise ValueError(f"unknown action {action!r}")
+        shared = self.shared(player.current_room)
+        with shared.lock:
+            shared.pending.append((player_id, len(shared.pending), player, action, arg))
+            if not shared.queued:
+                shared.queued = True
+                self.ready.put(shared)
+
+    def tick(self):
+        """
+        Resolve every queued action, one room at a time.
+        :return: List of Events in the order they were resolved.
+        """
+        self.tick_count += 1
+        events, moves = [], []
+        while True:
+            try:
+                shared = self.ready.get_nowait()
+            except Empty:
+                break
+            with shared.lock:
+                intents, shared.pending, shared.queued = shared.pending, [], False
+                events += self.resolve_room(shared, intents, moves)
+
+        # players change rooms after every room is resolved, so a move never races the room it leaves
+        for player_id, player, next_room in moves:
+            self.relocate(player_id, player, next_room)
+        return events
+
+    def order(self, shared, intents):
+        """
+        The order a room's actions are resolved in: players in a seeded random order, which changes every tick
+        so no player always wins, and each player's actions in the order they were sent.
+        """
+        players = sorted({intent[0] for intent in intents})
+        random.Random(f"{self.seed}:{self.tick_count}:{shared.room.name}").shuffle(players)
+        rank = {player_id: i for i, player_id in enumerate(players)}
+        return sorted(intents, key=lambda intent: (rank[intent[0]], intent[1]))
+
+    def resolve_room(self, shared, intents, moves):
+        """
+        Resolve a room's actions while holding its lock.
+        :return: List of Events.
+        """
+        events = []
+        moving = set()
+        for player_id, _, player, action, arg in self.order(shared, intents):
+            if not player.is_alive():
+                result = "dead"
+            elif player_id in moving or player_id not in shared.players:
+                result = "left"  # e.g. submitted while the player was being relocated out of the room
+            elif action == "take":
+                result = self.take(shared.room, player, arg)
+            elif action == "attack":
+                result = self.attack(shared.room, player, arg)
+            else:
+                result, next_room = self.move(shared.room, arg)
+                if next_room is not None:
+                    moving.add(player_id)
+                    moves.append((player_id, player, next_room))
+            events.append(Event(self.tick_count, player.name, action, arg, result))
+        return events
+
+    @staticmethod
+    def take(room, player, item_name):
+        """
+        Pick up an item from the room being resolved, whose lock is held, not whatever room the player points at.
+        :return: The result of the take.
+        """
+        item = room.items.get(item_name)
+        if item is None:
+            return "gone"
+        if not player.pick_up(item):
+            return "too heavy"
+        if room.items.get(item_name) is item:
+            room.remove_item(item)
+        return "taken"
+
+    @staticmethod
+    def attack(room, player, monster_name):
+        """
+        Hit a monster, which strikes back if it survives; whoever lands the killing blow gets the reward.
+        :return: The result of the attack.
+        """
+        monster = room.monsters.get(monster_name)
+        if monster is None or not monster.is_alive():
+            return "gone"
+        player.attack(monster)
+        if monster.is_alive():
+            monster.attack(player)
+            return "hit"
+
+        room.remove_monster(monster)
+        if monster.reward and not player.pick_up(monster.reward):
+            room.add_item(monster.reward)
+        return "killed"
+
+    @staticmethod
+    def move(room, direction):
+        """
+        Check whether a player can leave a room in a direction.
+        :return: The result and the next room, which is None if the player can't move.
+        """
+        if direction not in room.exits:
+            return "no exit", None
+        if room.blocker(direction) is not None:
+            return "blocked", None
+        if direction in room.locked_exits:
+            return "locked", None
+        return "moved", room.get_exit(direction)
+
+    def relocate(self, player_id, player, next_room):
+        # lock the two rooms in name order so relocations can't deadlock
+        old, new = self.shared(player.current_room), self.shared(next_room)
+        if old is new:
+            return
+        first, second = sorted((old, new), key=lambda shared: shared.room.name)
+        with first.lock, second.lock:
+            old.players.pop(player_id, None)
+            new.players[player_id] = player
+            player.current_room = self.world.resolve(next_room)
@@ -0,0 +1,208 @@
+"""
+Lets viewers watch a remote session live. Each frame of the session is encoded once, and every viewer's socket is
+sent a memoryview of the same bytes. A viewer that can't keep up doesn't queue frames without end: once its backlog
+is over the limit the backlog is dropped, and it is sent a keyframe of the whole screen instead.
+"""
+import selectors
+import socket
+import threading
+from collections import deque
+
+
+class Spectator:
+    """
+    One viewer's socket and the frames it hasn't been sent yet.
+    """
+
+    def __init__(self, sock):
+        sock.setblocking(False)
+        self.sock = sock
+        self.queue = deque()  # memoryviews of frames shared by all viewers, the first maybe partly sent
+        self.pending = 0  # bytes in the queue
+        self.partial = False  # whether the first frame in the queue was partly sent
+        self.resyncs = 0
+
+    def push(self, view):
+        self.queue.append(view)
+        self.pending += len(view)
+
+    def resync(self, keyframe):
+        """
+        Drop the backlog for a keyframe, finishing a partly sent frame first so no escape sequence is cut.
+        :param keyframe: Memoryview of the session's keyframe.
+        :return: None
+        """
+        head = self.queue[0] if self.partial else None
+        self.queue.clear()
+        self.pending = 0
+        if head is not None:
+            self.push(head)
+        self.push(keyframe)
+        self.resyncs += 1
+
+    def send(self):
+        """
+        Send as much of the queue as the socket takes without blocking.
+        :return: False if the viewer has gone.
+        """
+        queue = self.queue
+        while queue:
+            head = queue[0]
+            try:
+                n = self.sock.send(head)
+            except BlockingIOError:
+                return True
+            except OSError:
+                return False
+            self.pending -= n
+            if n < len(head):
+                queue[0] = head[n:]  # still the same buffer
+                self.partial = True
+                return True
+            queue.popleft()
+            self.partial = False
+        return True
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class SpectatorHub:
+    """
+    The viewers of one session, which it publishes every frame to. A frame is sent straight away to viewers that
+    are keeping up; the rest are sent their backlog by pump, e.g. from a SpectatorServer.
+    """
+    LIMIT = 64 * 1024  # bytes a viewer may fall behind before it is resynced with a keyframe
+
+    def __init__(self, screen, limit=LIMIT):
+        """
+        :param screen: The session's RemoteScreen, which the hub starts listening to.
+        :param limit: Bytes a viewer may fall behind.
+        """
+        self.screen = screen
+        self.limit = limit
+        self.spectators = []
+        self.lock = threading.Lock()  # frames are published by the game's thread, backlogs pumped by the server's
+        screen.listeners.append(self)
+
+    def add(self, sock):
+        """
+        Start sending the session to a viewer, from a keyframe. Called from the server's thread, so the screen's lock
+        is taken first, as the game's thread takes it before publishing: the viewer is added between frames, and
+        the keyframe matches the frames it is sent after it.
+        :return: The Spectator.
+        """
+        spectator = Spectator(sock)
+        with self.screen.lock, self.lock:
+            spectator.push(memoryview(self.screen.keyframe().encode("utf-8")))
+            self.spectators.append(spectator)
+            self.send(spectator)
+        return spectator
+
+    def publish(self, frame):
+        """
+        Queue a frame for every viewer and send it to those whose sockets take it.
+        :param frame: The frame's bytes, shared by all viewers.
+        :return: None
+        """
+        view = memoryview(frame)
+        size = len(view)
+        keyframe = None
+        gone = []
+        with self.lock:
+            for spectator in self.spectators:
+                if not spectator.queue:  # keeping up, so the frame is sent without queueing it
+                    try:
+                        n = spectator.sock.send(view)
+                    except BlockingIOError:
+                        n = 0
+                    except OSError:
+                        gone.append(spectator)
+                        continue
+                    if n < size:
+                        spectator.push(view[n:])
+                        spectator.partial = n > 0
+                    continue
+                if spectator.pending + size > self.limit:
+                    if keyframe is None:
+                        keyframe = memoryview(self.screen.keyframe().encode("utf-8"))  # once for all laggards
+                    spectator.resync(keyframe)
+                else:
+                    spectator.push(view)
+                if not spectator.send():
+                    gone.append(spectator)
+            for spectator in gone:
+                self.spectators.remove(spectator)
+                spectator.close()
+
+    def pump(self):
+        """
+        Send the viewers' backlogs.
+        :return: None
+        """
+        with self.lock:
+            for spectator in list(self.spectators):
+                if spectator.queue:
+                    self.send(spectator)
+
+    def send(self, spectator):
+        if not spectator.send():
+            self.spectators.remove(spectator)
+            spectator.close()
+
+    def close(self):
+        """
+        Stop listening to the session and disconnect the viewers.
+        :return: None
+        """
+        if self in self.screen.listeners:
+            self.screen.listeners.remove(self)
+        with self.lock:
+            for spectator in self.spectators:
+                spectator.close()
+            self.spectators = []
+
+
+class SpectatorServer(threading.Thread):
+    """
+    Accepts viewers for a session on a listening socket and pumps their backlogs, on a thread of its own.
+    """
+    PUMP_INTERVAL = 0.05  # seconds between sending backlogs
+
+    def __init__(self, hub, address, family=socket.AF_INET):
+        """
+        :param hub: The session's SpectatorHub.
+        :param address: The address to listen on, e.g. ("127.0.0.1", 0).
+        """
+        super().__init__(daemon=True)
+        self.hub = hub
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        self.listener.bind(address)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.address = self.listener.getsockname()
+        self.stopping = threading.Event()
+
+    def run(self):
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.listener, selectors.EVENT_READ)
+            while not self.stopping.is_set():
+                if selector.select(self.PUMP_INTERVAL):
+                    try:
+                        sock, _ = self.listener.accept()
+                    except BlockingIOError:
+                        continue
+                    self.hub.add(sock)
+                self.hub.pump()
+        self.listener.close()
+
+    def stop(self):
+        """
+        Stop accepting viewers; the ones watching stay until the hub is closed.
+        :return: None
+        """
+        self.stopping.set()
+        self.join()
@@ -0,0 +1,226 @@
+import hashlib
+from functools import lru_cache
+
+from game_code.entities.entity import Entity
+
+
+@lru_cache(maxsize=1 << 16)
+def feature_key(feature, size):
+    """
+    The random-looking key of a state feature, which is the same in every process and run.
+    :param feature: A tuple of strings, numbers, booleans and None.
+    :param size: Key size in bytes.
+    :return: The key as an integer.
+    """
+    digest = hashlib.blake2b(repr(feature).encode(), digest_size=size).digest()
+    return int.from_bytes(digest, "little")
+
+
+def changed_room(delta):
+    """
+    The name of the room a change happened in.
+    :param delta: A change passed to the StateHash listeners.
+    :return: The room's name, or None if the change is to the player.
+    """
+    kind = delta[0]
+    if kind == "lock":
+        return delta[1].name
+    scope = delta[1].scope if kind == "set" else delta[3]
+    if scope and scope[0] in ("room", "item", "monster", "puzzle"):
+        return scope[1]
+    return None
+
+
+class StateHash:
+    """
+    Zobrist hash of the game state. The state is described by a set of features, such as
+    ("player", "hp", 350) or ("item", "boot_sector", "health_module"), and the hash is the XOR of their keys.
+    Entities report their changes as they happen, so reading the hash costs O(1) instead of a walk
+    over the whole world. Each change is also passed on to the listeners, such as Rewind and SaveManager.
+    """
+
+    def __init__(self, bits=64):
+        if bits not in (64, 128):
+            raise ValueError("bits must be 64 or 128")
+        self.size = bits // 8
+        self.value = 0
+        self.listeners = []  # objects with a record(delta) method
+
+    def toggle(self, feature):
+        """
+        Add a feature to the state, or remove it if it is already there.
+        :param feature: The feature tuple.
+        :return: None
+        """
+        self.value ^= feature_key(feature, self.size)
+
+    def notify(self, delta):
+        """
+        Pass a change on to the listeners.
+        :param delta: Tuple of (kind, ...) describing the change, see Rewind.revert.
+        :return: None
+        """
+        for listener in self.listeners:
+            listener.record(delta)
+
+    @staticmethod
+    def encode(value):
+        """
+        Turn an attribute value into something that can be part of a feature; entities are named.
+        """
+        if isinstance(value, Entity):
+            return value.name
+        return value
+
+    def entity_features(self, entity, scope):
+        """
+        Every feature describing an entity, including the entities it owns.
+        :param entity: The entity.
+        :param scope: The features' prefix, which says where the entity is.
+        :return: Generator of feature tuples.
+        """
+        yield scope
+        for name in entity.TRACKED:
+            value = entity.tracked(name)
+            if name in entity.OWNED:
+                if value is not None:
+                    yield from self.entity_features(value, ("puzzle", entity.name, value.name))
+            else:
+                yield scope + (name, self.encode(value))
+
+    def room_features(self, room):
+        yield from self.entity_features(room, ("room", room.name))
+        for direction, lock_id in room.locked_exits.items():
+            yield ("room", room.name, "lock", direction, lock_id)
+        for item in room.items.values():
+            yield from self.entity_features(item, ("item", room.name, item.name))
+        for monster in room.monsters.values():
+            yield from self.entity_features(monster, ("monster", room.name, monster.name))
+
+    def player_features(self, player):
+        yield from self.entity_features(player, ("player",))
+        for item in player.storage.values():
+            yield from self.entity_features(item, ("storage", item.name))
+
+    def features(self, player, world):
+        """
+        The canonical description of a game state.
+        :return: Generator of feature tuples.
+        """
+        yield from self.player_features(player)
+        for room in world.current_rooms():
+            baseline = world.baseline(room)
+            if baseline is None:
+                yield from self.room_features(room)
+            else:  # only how the room differs, so rooms that are loaded but unchanged don't count
+                yield from set(self.room_features(room)).symmetric_difference(self.room_features(baseline))
+
+    def add(self, entity, scope, container=None):
+        """
+        Start tracking an entity that was put somewhere, such as an item dropped in a room.
+        :param entity: The entity.
+        :param scope: Where the entity is, e.g. ("storage", item.name).
+        :param container: The dictionary the entity was put in.
+        :return: None
+        """
+        if container is not None:
+            self.notify(("add", container, entity, scope))
+        self.adopt(entity, scope)
+        for feature in self.entity_features(entity, scope):
+            self.toggle(feature)
+
+    def remove(self, entity, scope, container=None):
+        """
+        Stop tracking an entity that was taken from somewhere.
+        :return: None
+        """
+        if container is not None:
+            self.notify(("remove", container, entity, scope))
+        for feature in self.entity_features(entity, scope):
+            self.toggle(feature)
+
+    def lock_changed(self, room, direction, old, new):
+        """
+        Called by rooms when an exit is locked or unlocked.
+        :param old: The previous lock id, or None if the exit wasn't locked.
+        :param new: The new lock id, or None if the exit is unlocked.
+        :return: None
+        """
+        self.notify(("lock", room, direction, old))
+        if old is not None:
+            self.toggle(("room", room.name, "lock", direction, old))
+        if new is not None:
+            self.toggle(("room", room.name, "lock", direction, new))
+
+    def adopt(self, entity, scope):
+        """
+        Point an entity (and the entities it owns) at this hash without changing the value,
+        used when the entity is already counted, e.g. a copy made by a forked game.
+        :return: None
+        """
+        entity.tracker = self
+        entity.scope = scope
+        for name in entity.OWNED:
+            value = entity.tracked(name)
+            if value is not None:
+                self.adopt(value, ("puzzle", entity.name, value.name))
+
+    def adopt_room(self, room):
+        self.adopt(room, ("room", room.name))
+        for item in room.items.values():
+            self.adopt(item, ("item", room.name, item.name))
+        for monster in room.monsters.values():
+            self.adopt(monster, ("monster", room.name, monster.name))
+
+    def adopt_player(self, player):
+        self.adopt(player, ("player",))
+        for item in player.storage.values():
+            self.adopt(item, ("storage", item.name))
+
+    def track(self, player, world):
+        """
+        Start tracking a freshly built game, which walks the whole world once.
+        :return: None
+        """
+        self.value = self.compute(player, world)
+        self.adopt_player(player)
+        for room in world.current_rooms():
+            self.adopt_room(room)
+        world.state_hash = self
+
+    def changed(self, entity, name, old, new):
+        """
+        Called by entities when a tracked attribute changes.
+        :return: None
+        """
+        self.notify(("set", entity, name, old))
+        if name in entity.OWNED:
+            if old is not None:
+                self.remove(old, ("puzzle", entity.name, old.name))
+            if new is not None:
+                self.add(new, ("puzzle", entity.name, new.name))
+            return
+        self.toggle(entity.scope + (name, self.encode(old)))
+        self.toggle(entity.scope + (name, self.encode(new)))
+
+    def compute(self, player, world):
+        """
+        Hash a state from scratch, e.g. to check the tracked value.
+        :return: The hash value.
+        """
+        value = 0
+        for feature in self.features(player, world):
+            value ^= feature_key(feature, self.size)
+        return value
+
+    def canonical(self, player, world):
+        """
+        A compact byte encoding of the state that is the same for equal states, whatever order things happened in.
+        :return: The encoded state as bytes.
+        """
+        return b"\n".join(sorted(repr(feature).encode() for feature in self.features(player, world)))
+
+    def copy(self):
+        state_hash = StateHash(self.size * 8)
+        state_hash.value = self.value
+        return state_hash
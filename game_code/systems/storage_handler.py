@@ -1,5 +1,78 @@
 from game_code.entities.items.med import Med
 from game_code.entities.items.weapon import Weapon
+from game_code.systems.list_menu import ListMenu
+from game_code.systems.screens import ListScreen, Screen
+
+
+class StorageScreen(ListScreen):
+    """
+    The storage menu. Choosing an item opens its InspectScreen on top, and going back from there shows the menu
+    again from its cache, unless the storage changed in the meantime.
+    """
+
+    def __init__(self, game):
+        super().__init__(game, game.player.storage, "[ STORAGE ]\n", None, label=StorageHandler.storage_row)
+        self.menu_at = game.state_hash.value  # the state the menu was made at
+
+    def lines(self):
+        state = self.game.state_hash.value
+        if state != self.menu_at:
+            # items were used or dropped, so the menu starts over
+            self.menu = ListMenu(self.ui, self.items, self.menu.title, label=self.menu.label)
+            self.menu_at = state
+        player = self.game.player
+        self.menu.footer = f"\n[ CAP <{player.weight}/{player.max_weight}> ]"
+        return self.menu.lines()
+
+    def chosen(self, item):
+        self.stack.push(InspectScreen(self.game, item, self))
+
+
+class InspectScreen(Screen):
+    """
+    An item's details and actions. After an action the result is shown until a key is pressed: [B] comes back to
+    the item, any other key closes the storage.
+    """
+
+    def __init__(self, game, item, storage_screen):
+        super().__init__(game)
+        self.item = item
+        self.storage_screen = storage_screen
+        self.actions = []
+        self.message = None  # the result of the last action, while it is shown
+
+    def lines(self):
+        if self.message is not None:
+            return [str(self.message), "[B] Back"]
+        self.actions = self.game.storage_handler.get_item_actions(self.item)
+        return ([f"[ {self.item.name} ]", f"{self.item.description}\n"]
+                + [f"[{action_key}] {label}" for action_key, label, _ in self.actions] + ["[B] Back"])
+
+    def handle(self, key):
+        if key == "ESC":
+            self.game.menu.pause_menu()
+        elif self.message is not None:
+            self.message = None
+            if key == "b":
+                self.invalidate()
+                self.draw()
+            else:
+                self.storage_screen.close()
+        elif key == "b":
+            self.ui.clear_logs()
+            self.close()
+        else:
+            for action_key, _, action in self.actions:
+                if key == action_key:
+                    self.ui.clear_logs()
+                    msg = action()
+                    if msg:
+                        self.message = msg
+                        self.invalidate()
+                        self.draw()
+                    else:
+                        self.storage_screen.close()
+                    return
 
 
 class StorageHandler:
@@ -13,82 +86,23 @@ class StorageHandler:
 
     def show_player_storage(self):
         """
-        Display player's storage with item selection.
+        Open the player's storage menu.
         :return: None
         """
-        storage = self.game.player.storage
-
-        if not storage:
+        if not self.game.player.storage:
             self.ui.display_text("Your storage is empty.")
             return
+        self.game.screens.open(StorageScreen(self.game))
 
-        selections = {}
-        self.ui.display_text("[ STORAGE ]\n")
-
-        # options in which the player picks
-        for i, (name, item) in enumerate(storage.items(), start=1):
-            self.ui.display_text(f"[{i}] {name} (W:{item.weight})")
-            selections[str(i)] = item
-
-        self.ui.display_text("[B] Back")
-        self.ui.display_text(f"\n[ CAP <{self.game.player.weight}/{self.game.player.max_weight}> ]")
-
-        key = self.ui.wait_for_key()
-
-        if key == "ESC":
-            self.game.menu.pause_menu()
-
-        # check for valid item selection
-        if key in selections:
-            self.inspect_item(selections[key])
-            return  # Exit menu after inspecting
-
-        # check for exit command
-        if key == "b":
-            self.ui.clear_logs()
-            return
-
-    def inspect_item(self, item):
+    @staticmethod
+    def storage_row(name, item):
         """
-        Display item details and available actions.
-        :return: None
+        The storage menu's row for an item, where a stack is one row.
+        :return: The row's text.
         """
-        self.ui.clear_logs()
-
-        self.ui.display_text(f"[ {item.name} ]")
-        self.ui.display_text(f"{item.description}\n")
-
-        actions = self.get_item_actions(item)
-
-        # display the actions that the user can do on the item
-        for action_key, label, _ in actions:
-            self.ui.display_text(f"[{action_key}] {label}")
-        self.ui.display_text("[B] Back")
-
-        user_key = self.ui.wait_for_key() # get user key
-
-        if user_key == "ESC":
-            self.game.menu.pause_menu()
-
-        # check if that key is in the actions
-        for action_key, _, action in actions:
-            if user_key == action_key:
-                self.ui.clear_logs()
-                msg = action()
-                if msg:
-                    self.ui.display_text(msg)
-                    self.ui.display_text("[B] Back")
-                    key = self.ui.wait_for_key()
-                    if key == "b":
-                        self.inspect_item(item)
-                    else:
-                        return
-                return
-            # check for exit command
-            if user_key == "b":
-                self.ui.clear_logs()
-                self.show_player_storage()
-                return
+        if item.count > 1:
+            return f"{name} x{item.count} (W:{item.weight * item.count})"
+        return f"{name} (W:{item.weight})"
 
     def get_item_actions(self, item):
         """
@@ -1,5 +1,6 @@
 import curses
 import time
+from collections import deque
 
 
 class TextUI:
@@ -12,7 +13,10 @@ class TextUI:
     ESC_DELAY_MS = 25 # so that the user can press escape only once
     HUD_HEIGHT = 1
     BOTTOM_MARGIN = 5  # space reserved for logs and input
+    MENU_MARGIN = 7  # log lines a list menu keeps for its title, filter, page line and footer
     TYPING_SPEED = 0.03 # seconds per character
+    IDLE_DELAY = 0.01  # seconds input loops wait between reads, which are kept when pacing is off
+    LOG_LIMIT = 200  # log lines kept for tools that read the game, such as the control socket
 
     def __init__(self):
         self.screen = None
@@ -27,14 +31,41 @@ class TextUI:
         # typing animation toggle
         self.typing_enabled = True
 
+        # input queued by tools (see control.py), which is read before the keyboard
+        self.inputs = deque()
+        self.on_input = None  # called when the game reads input and none is queued, so a tool can queue more
+        self.pacing = True  # whether messages are paced with delays, which tools driving the game turn off
+        self.logs = deque(maxlen=self.LOG_LIMIT)  # the lines in the log area
+        self.line = ""  # the log line that is currently being written
+
+    def push_input(self, *keys):
+        """
+        Queue keys or text answers, which the game reads before the keyboard.
+        :param keys: The keys in the order they are read.
+        :return: None
+        """
+        self.inputs.extend(keys)
+
+    def queued_input(self):
+        """
+        Take the next queued key or text answer, letting on_input queue more if there are none.
+        :return: The key or answer, or None if nothing is queued.
+        """
+        if not self.inputs and self.on_input is not None:
+            self.on_input()
+        return self.inputs.popleft() if self.inputs else None
+
     def start_screen(self):
         """
         Initialise the curses screen and configure terminal settings.
 
         Must be called before any rendering happens as it switches the terminal into curses mode and enables
-        non-blocking keyboard input.
+        non-blocking keyboard input. A screen that is already started (e.g. by start.py) is kept.
         :return: None
         """
+        if self.started:
+            return
+
         self.screen = curses.initscr()
         curses.noecho()
         curses.cbreak()
@@ -59,6 +90,7 @@ class TextUI:
         self.screen.keypad(False)
         curses.echo()
         curses.endwin()
+        self.started = False
 
     def clear(self):
         """
@@ -73,6 +105,14 @@ class TextUI:
         """
         return self.screen.getmaxyx()
 
+    def menu_rows(self):
+        """
+        How many rows of a list menu fit in the log area.
+        :return: The number of rows, at least 1.
+        """
+        h, w = self.get_screen_size()
+        return max(1, h - 1 - self.room_start_y - self.MENU_MARGIN)
+
     def safe_draw(self, y, x, text, max_width=None):
         """
         Safely draw text to the screen given a position; this prevents crashes caused by drawing outside
@@ -226,6 +266,10 @@ class TextUI:
         """
         h, w = self.get_screen_size()
 
+        logged = f"{self.line}{text}{end}".split("\n")
+        self.logs.extend(logged[:-1])
+        self.line = logged[-1]
+
         lines = str(text).split("\n")
 
         use_typing = self.typing_enabled if typing is None else typing
@@ -311,6 +355,15 @@ class TextUI:
         """
         self.TYPING_SPEED = speed
 
+    def delay(self, seconds):
+        """
+        Pause the game for a number of seconds, used for pacing messages and reducing cpu load in input loops.
+        :param seconds: How long to wait for.
+        :return: None
+        """
+        if self.pacing or seconds <= self.IDLE_DELAY:
+            time.sleep(seconds)
+
     def toggle_typing(self, enabled=None):
         """
         Enable or disable typing animation.
@@ -337,6 +390,8 @@ class TextUI:
                 pass
 
         self.log_y = self.room_start_y
+        self.logs.clear()
+        self.line = ""
         self.screen.refresh()
 
     def get_key(self):
@@ -344,6 +399,10 @@ class TextUI:
         Get a single key press from the user.
         :return: A string "ESC" if the user pressed ESC key or the character string for any key.
         """
+        key = self.queued_input()
+        if key is not None:
+            return key
+
         key = self.screen.getch()
 
         if key == 27:  # ESC key
@@ -372,7 +431,7 @@ class TextUI:
         :return: None
         """
         self.clear()
-        self.draw_room(room.description)
+        self.draw_room(room.describe())
         self.draw_hud(player)
 
     def draw_top(self, text, y=0, clear=True):
@@ -404,6 +463,11 @@ class TextUI:
         :param prompt: The input prompt displayed to the user.
         :return: The user text that is inputted.
         """
+        text = self.queued_input()
+        if text is not None:
+            self.display_text(prompt + str(text))
+            return str(text)
+
         self.display_text(prompt)
 
         # typing mode
@@ -464,6 +528,7 @@ Player:
   [I]                - View player's statistics
   [S]                - View player's storage
   [H]                - Heal player if healing item equipped
+  [U]                - Rewind the last action
 
 Item Interaction:
   [T]                - Pick up an item in the room
@@ -0,0 +1,135 @@
+class TimerWheel:
+    """
+    Schedules items a number of ticks ahead. Items are kept in a ring of slots, one per tick, so scheduling costs
+    O(1) and a tick only looks at the slot that is due instead of every item. Items further ahead than the ring
+    wait in their slot until it comes round again.
+    """
+    SLOTS = 256
+
+    def __init__(self, slots=SLOTS):
+        self.slots = [[] for _ in range(slots)]
+        self.now = 0  # the current tick
+        self.count = 0
+
+    def schedule(self, delay, item):
+        """
+        Schedule an item.
+        :param delay: The number of ticks from now, at least 1.
+        :param item: Anything.
+        :return: None
+        """
+        due = self.now + max(1, delay)
+        self.slots[due % len(self.slots)].append((due, item))
+        self.count += 1
+
+    def advance(self):
+        """
+        Move to the next tick.
+        :return: List of the items due, in the order they were scheduled.
+        """
+        self.now += 1
+        index = self.now % len(self.slots)
+        slot = self.slots[index]
+        if not slot:
+            return []
+        due = [item for when, item in slot if when == self.now]
+        self.slots[index] = [] if len(due) == len(slot) else [entry for entry in slot if entry[0] != self.now]
+        self.count -= len(due)
+        return due
+
+    def __len__(self):
+        return self.count
+
+
+class Timer:
+    """
+    A timer in a HierarchicalTimerWheel, which is the handle to cancel it with.
+    """
+    __slots__ = ("due", "item", "slot")
+
+    def __init__(self, due, item):
+        self.due = due  # the tick it fires on
+        self.item = item
+        self.slot = None  # the slot holding it, None once it has fired or been cancelled
+
+
+class HierarchicalTimerWheel:
+    """
+    Schedules items any number of ticks ahead, with a timer that can be cancelled. There is a ring of slots per
+    level: the first has a slot per tick, and each slot of the next level covers a whole turn of the level below.
+    A timer goes in the lowest level that reaches its tick, and moves down a level when the level below comes
+    round to it. Scheduling and cancelling cost O(1), and a tick only looks at the slot that is due; each timer
+    moves down at most once per level, instead of waiting through every turn of one ring like a TimerWheel.
+    """
+    SLOTS = 64
+    LEVELS = 4  # 64 ** 4 ticks, e.g. 194 days of one second ticks; timers further ahead wait at the top level
+
+    def __init__(self, slots=SLOTS, levels=LEVELS):
+        self.size = slots
+        self.levels = [[{} for _ in range(slots)] for _ in range(levels)]  # slots map timers to None, in order
+        self.spans = [slots ** level for level in range(levels + 1)]  # ticks covered by a slot of each level
+        self.now = 0  # the current tick
+        self.count = 0
+
+    def schedule(self, delay, item):
+        """
+        Schedule an item.
+        :param delay: The number of ticks from now, at least 1.
+        :param item: Anything.
+        :return: The Timer.
+        """
+        timer = Timer(self.now + max(1, delay), item)
+        self.place(timer)
+        self.count += 1
+        return timer
+
+    def cancel(self, timer):
+        """
+        Cancel a timer.
+        :return: True if it was waiting, False if it had fired or was cancelled already.
+        """
+        if timer.slot is None:
+            return False
+        del timer.slot[timer]
+        timer.slot = None
+        self.count -= 1
+        return True
+
+    def place(self, timer):
+        ahead = timer.due - self.now
+        for level, slots in enumerate(self.levels):
+            if ahead < self.spans[level + 1] or level == len(self.levels) - 1:
+                due = min(ahead, self.spans[level + 1] - 1) + self.now  # the top level holds what is beyond it
+                timer.slot = slots[due // self.spans[level] % self.size]
+                timer.slot[timer] = None
+                return
+
+    def advance(self):
+        """
+        Move to the next tick.
+        :return: List of the items due.
+        """
+        self.now += 1
+        for level in range(1, len(self.levels)):
+            if self.now % self.spans[level]:
+                break
+            slots = self.levels[level]
+            index = self.now // self.spans[level] % self.size
+            cascading, slots[index] = slots[index], {}
+            for timer in cascading:
+                self.place(timer)  # a level down, or straight into the slot that is due now
+
+        index = self.now % self.size
+        slot = self.levels[0][index]
+        if not slot:
+            return []
+        self.levels[0][index] = {}
+        due = []
+        for timer in slot:
+            timer.slot = None
+            due.append(timer.item)
+        self.count -= len(due)
+        return due
+
+    def __len__(self):
+        return self.count
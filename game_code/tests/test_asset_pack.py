@@ -0,0 +1,58 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from game_code.entities.items.lore import Lore
+from game_code.systems.asset_pack import AssetPack, asset, compile_pack, load_pack, parse_source
+from game_code.world.world_builder import WorldBuilder
+
+
+class TestAssetPack(unittest.TestCase):
+    """
+    This tests compiling texts into a pack and reading them back by asset id.
+    """
+    def test_round_trip(self):
+        source = "# comment\n@@ room/a\n\n  | A |  \n\n@@ lore/b\nline one\nline two\n"
+        assets = parse_source(source)
+        self.assertEqual(assets, {"room/a": "\n  | A |  \n", "lore/b": "line one\nline two"})
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "test.pack")
+            compile_pack(assets, path)
+            pack = AssetPack(path)
+            self.assertEqual(len(pack), 2)
+            self.assertEqual(pack.text("room/a"), assets["room/a"])
+            self.assertEqual(pack.text("lore/b"), assets["lore/b"])
+            pack.data.close()
+
+    def test_package_is_not_written(self):
+        with tempfile.TemporaryDirectory() as folder:
+            source = os.path.join(folder, "world.txt")
+            with open(source, "w", encoding="utf-8") as file:
+                file.write("@@ room/a\nA room\n")
+            path, cache = os.path.join(folder, "world.pack"), os.path.join(folder, "cache", "world.pack")
+            pack = load_pack.__wrapped__(source, path, cache)
+            self.assertEqual((pack.path, pack.text("room/a")), (cache, "A room"))
+            self.assertFalse(os.path.exists(path))
+            pack.data.close()
+
+            with open(os.path.join(folder, "blocked"), "w"):
+                pass  # a file where the cache folder should be, so it can't be written
+            pack = load_pack.__wrapped__(source, path, os.path.join(folder, "blocked", "world.pack"))
+            self.assertEqual((pack.path, pack.text("room/a")), (None, "A room"))
+            self.assertFalse(os.path.exists(path))
+
+    def test_entities_hold_asset_ids(self):
+        world = WorldBuilder()
+        room = world.build()
+        self.assertEqual(room.__dict__["description"].asset_id, "room/boot_sector")
+        self.assertIn("| BOOT SECTOR |", room.description)
+
+        lore = Lore("note.log", asset("item/data_chip.log"), weight=4, content="plain text")
+        self.assertEqual(lore.content, "plain text")
+        self.assertEqual(pickle.loads(pickle.dumps(lore)).description, lore.description)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from game_code.game import Game
+from game_code.systems.control import ControlServer
+from game_code.systems.remote_ui import RemoteUI
+
+
+class TestControl(unittest.TestCase):
+    """
+    This tests that tools can drive a running game over the control socket, with batched and pipelined commands.
+    """
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "control.sock")
+        self.ui = RemoteUI(lambda data: None, height=30, width=100)
+        self.ui.start_screen()
+        self.game = Game(ui=self.ui, seed=1)
+        self.game.intro = False
+        self.server = ControlServer(self.game, self.path)
+        self.server.start()
+        self.thread = threading.Thread(target=self.game.run, daemon=True)
+        self.thread.start()
+        self.client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.client.connect(self.path)
+        self.replies = self.client.makefile("r", encoding="utf-8")
+
+    def tearDown(self):
+        self.send({"batch": [{"cmd": "action", "name": "pause"}, {"cmd": "key", "key": "q"}]})
+        self.thread.join(5)
+        self.replies.close()
+        self.client.close()
+        self.server.stop()
+        self.folder.cleanup()
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(os.path.exists(self.path))
+
+    def send(self, *requests):
+        self.client.sendall(b"".join(json.dumps(request).encode("utf-8") + b"\n" for request in requests))
+
+    def receive(self):
+        return json.loads(self.replies.readline())
+
+    def test_route_in_one_batch(self):
+        self.send({"id": 1, "batch": [
+            {"cmd": "action", "name": "take"},
+            {"cmd": "choose", "index": 2},
+            {"cmd": "choose", "index": 1},  # equip it
+            {"cmd": "move", "direction": "north"},
+            {"cmd": "action", "name": "solve"},
+            {"cmd": "answer", "text": "0"},
+        ]})
+        reply = self.receive()
+        self.assertEqual(reply["id"], 1)
+        self.assertTrue(reply["ok"], reply)
+        self.assertEqual(len(reply["results"]), 6)
+        self.assertIn("Moving north...", reply["results"][3]["logs"])
+        state = reply["state"]
+        self.assertEqual(state["room"]["name"], "lost_cache")
+        self.assertIsNone(state["room"]["puzzle"])
+        self.assertEqual(state["hud"]["weapon"], "fragmented_blade")
+        self.assertIn("fragmented_blade", state["storage"])
+        self.assertEqual(state["screen"], "GameScreen")
+
+    def test_pipelined_commands_answer_in_order(self):
+        self.send({"id": "menu", "cmd": "action", "name": "take"},
+                  {"id": "bad", "cmd": "fly"},
+                  {"id": "back", "cmd": "key", "key": "b"},
+                  {"id": "state", "cmd": "state"})
+        menu, bad, back, state = (self.receive() for _ in range(4))
+        self.assertEqual([menu["id"], bad["id"], back["id"], state["id"]], ["menu", "bad", "back", "state"])
+        self.assertEqual(menu["state"]["screen"], "ListScreen")
+        self.assertEqual(sorted(menu["state"]["menu"]), ["fragmented_blade", "health_module"])
+        self.assertFalse(bad["ok"])
+        self.assertIn("unknown command", bad["error"])
+        self.assertEqual(back["state"]["screen"], "GameScreen")
+        self.assertEqual(state["state"]["room"]["name"], "boot_sector")
+        self.assertEqual(state["state"]["room"]["exits"],
+                         {"north": "lost_cache", "south": "glitch_pit"})  # east is a secret room
+
+        self.client.sendall(b"{not json\n")
+        self.assertIn("invalid JSON", self.receive()["error"])
+
+    def test_follows_a_restart(self):
+        self.send({"batch": [{"cmd": "action", "name": "take"}, {"cmd": "choose", "index": 2},
+                             {"cmd": "choose", "index": 2}]})
+        self.assertIn("fragmented_blade", self.receive()["state"]["storage"])
+        self.send({"batch": [{"cmd": "action", "name": "pause"}, {"cmd": "key", "key": "r"}, {"cmd": "state"}]})
+        state = self.receive()["state"]
+        self.assertIsNot(self.server.game, self.game)
+        self.assertEqual(state["storage"], {})
+        self.assertIn("fragmented_blade", state["room"]["items"])
@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+from game_code.ai.labyrinth_env import LabyrinthEnv
+from game_code.entities.item import Item
+from game_code.ai.vector_env import ProcessVectorLabyrinthEnv, VectorLabyrinthEnv
+
+
+class TestEnv(unittest.TestCase):
+    """
+    This tests that actions reach the game through the environment and that observations follow the state.
+    """
+    def setUp(self):
+        self.env = LabyrinthEnv()
+        self.obs, _ = self.env.reset(seed=0)
+
+    def action(self, kind, arg=None):
+        return self.env.actions.index((kind, arg))
+
+    def test_take_and_equip_weapon(self):
+        # the boot sector holds the health_module and then the fragmented_blade
+        self.env.step(self.action("take", 1))
+        obs, reward, terminated, truncated, info = self.env.step(self.action("use", 0))
+
+        self.assertEqual(self.env.game.player.equipped_weapon.name, "fragmented_blade")
+        self.assertEqual(obs[LabyrinthEnv.OBS_ATK], 150)
+        self.assertTrue(info["valid"])
+
+    def test_take_from_a_long_list(self):
+        room = self.env.game.player.current_room
+        for i in range(12):
+            room.add_item(Item(f"junk_{i}", "", 1))
+        obs, reward, terminated, truncated, info = self.env.step(self.action("take", 0))
+        self.assertTrue(info["valid"])
+        self.assertIn("health_module", self.env.game.player.storage)
+        for i in range(10):
+            self.env.game.player.pick_up(room.items[f"junk_{i}"])
+        self.env.step(self.action("use", 0))  # equip the health module, the first of 11 stored items
+        self.assertEqual(self.env.game.player.equipped_med.name, "health_module")
+        obs, reward, terminated, truncated, info = self.env.step(self.action("move", "north"))
+        self.assertEqual(info["room"], "lost_cache")  # the key wasn't read as another digit
+
+    def test_blocked_exit_starts_combat(self):
+        self.env.step(self.action("move", "south"))
+        obs, *_ = self.env.step(self.action("move", "east"))  # glitch_beast blocks the east exit
+
+        self.assertEqual(obs[LabyrinthEnv.OBS_COMBAT], 1)
+        self.assertEqual(self.env.action_mask().sum(), len(LabyrinthEnv.FIGHT_ACTIONS))
+
+        self.env.step(self.action("fight", "attack"))
+        self.assertEqual(self.env.game.player.current_room.monsters["glitch_beast"].hp, 400)
+
+    def test_invalid_action(self):
+        obs, reward, *_ = self.env.step(self.action("fight", "attack"))
+        self.assertEqual(reward, LabyrinthEnv.INVALID_REWARD)
+        self.assertTrue((obs == self.obs).all())
+
+    def test_vector_env_is_deterministic(self):
+        actions = np.random.default_rng(0).integers(0, self.env.n_actions, size=(50, 4))
+        runs = []
+        for _ in range(2):
+            env = VectorLabyrinthEnv(4)
+            env.reset(seed=3)
+            runs.append(np.stack([env.step(a)[0] for a in actions]))
+        self.assertEqual(runs[0].shape, (50, 4, self.env.obs_size))
+        self.assertTrue((runs[0] == runs[1]).all())
+
+    def test_episode_seeds_are_unique_across_workers(self):
+        env = ProcessVectorLabyrinthEnv(4, num_workers=2, max_steps=2)
+        try:
+            env.reset(seed=10)
+            seeds = list(env.seeds)
+            for _ in range(3):
+                for _ in range(2):  # every game is truncated on its second step
+                    env.step([0] * 4)
+                seeds += env.seeds
+        finally:
+            env.close()
+        self.assertEqual(len(seeds), 16)
+        self.assertEqual(len(set(seeds)), 16)
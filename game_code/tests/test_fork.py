@@ -0,0 +1,57 @@
+import unittest
+
+from game_code.ai.labyrinth_env import LabyrinthEnv
+from game_code.ai.mcts import MCTSPlayer
+
+
+class TestFork(unittest.TestCase):
+    """
+    This tests that forked games share nothing that one of them can change.
+    """
+    def setUp(self):
+        self.env = LabyrinthEnv()
+        self.env.reset(seed=0)
+
+    def action(self, kind, arg=None):
+        return self.env.actions.index((kind, arg))
+
+    def test_fork_changes_stay_in_fork(self):
+        fork = self.env.fork()
+        fork.step(self.action("take", 0))
+        fork.step(self.action("use", 0))  # equip health_module
+        fork.step(self.action("move", "south"))
+        fork.step(self.action("fight", "attack"))
+
+        player = self.env.game.player
+        self.assertEqual(player.storage, {})
+        self.assertEqual(len(player.current_room.items), 2)
+        self.assertEqual(self.env.game.world.lookup("glitch_pit").monsters["glitch_beast"].hp, 450)
+        self.assertEqual(fork.game.player.current_room.monsters["glitch_beast"].hp, 400)
+
+    def test_parent_changes_after_fork(self):
+        self.env.step(self.action("take", 0))
+        self.env.step(self.action("use", 0))
+        fork = self.env.fork()
+        self.env.game.heal_player()  # nothing to heal, uses stay the same
+        self.env.game.player.hp = 100
+        self.env.game.heal_player()
+
+        self.assertEqual(self.env.game.player.equipped_med.uses, 2)
+        self.assertEqual(fork.game.player.equipped_med.uses, 3)
+        self.assertEqual(fork.game.player.hp, 500)
+
+    def test_fork_of_fork(self):
+        first = self.env.fork()
+        first.step(self.action("take", 1))
+        second = first.fork()
+        second.step(self.action("take", 0))
+
+        self.assertEqual(list(first.game.player.current_room.items), ["health_module"])
+        self.assertEqual(list(second.game.player.current_room.items), [])
+        self.assertEqual(len(self.env.game.player.current_room.items), 2)
+
+    def test_mcts_picks_valid_action(self):
+        player = MCTSPlayer(iterations=10, rollout_depth=3, seed=0)
+        action = player.choose(self.env)
+        self.assertTrue(self.env.action_mask()[action])
+        self.assertGreater(player.forks, 10)
@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+
+from game_code.game import Game
+from game_code.systems.control import parse
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.systems.idle_sessions import IdleKeeper
+from game_code.systems.session_server import Session
+from game_code.systems.timer_wheel import HierarchicalTimerWheel
+
+
+class TestHierarchicalTimerWheel(unittest.TestCase):
+    """
+    This tests that the hierarchical timer wheel hands out items on the tick they are due, across levels and past
+    its top level, and that cancelled timers never fire.
+    """
+    def test_due_ticks(self):
+        wheel = HierarchicalTimerWheel(slots=4, levels=2)  # 16 ticks before the top level clamps
+        delays = [1, 3, 4, 5, 15, 16, 17, 40]
+        timers = {delay: wheel.schedule(delay, delay) for delay in delays}
+        self.assertTrue(wheel.cancel(timers[5]))
+        self.assertFalse(wheel.cancel(timers[5]))
+        due = {}
+        for _ in range(45):
+            for item in wheel.advance():
+                due[item] = wheel.now
+        self.assertEqual(due, {delay: delay for delay in delays if delay != 5})
+        self.assertEqual(len(wheel), 0)
+        self.assertFalse(wheel.cancel(timers[1]))
+
+
+class TestIdleKeeper(unittest.TestCase):
+    """
+    This tests that an idle session is warned, hibernated to disk, woken by its next keypress where it left off,
+    and closed once it has been idle for the timeout.
+    """
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.seconds = 0
+        self.keeper = IdleKeeper(self.folder.name, warn_after=10, hibernate_after=20, timeout=60,
+                                 clock=lambda: self.seconds)
+        self.warnings, self.closed = [], []
+        self.keeper.on_warn = lambda session, seconds_left: self.warnings.append(seconds_left)
+        self.keeper.on_close = self.closed.append
+        self.session = Session(Game(ui=HeadlessUI()).pristine(), seed=0)
+        self.keeper.add(self.session)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def wait(self, seconds):
+        self.seconds += seconds
+        self.keeper.advance()
+
+    def play(self, request):
+        self.keeper.touch(self.session)
+        return self.session.play(parse(json.dumps(request)))
+
+    def test_hibernate_and_wake(self):
+        self.play({"batch": [{"cmd": "action", "name": "take"}, {"cmd": "choose", "index": 2},
+                             {"cmd": "key", "key": "1"}]})
+        before = self.play({"batch": [{"cmd": "move", "direction": "south"}, {"cmd": "move", "direction": "east"},
+                                      {"cmd": "choose", "index": 1}]})["state"]
+        self.wait(5)
+        self.play({"cmd": "state"})  # pushes the warning back
+        self.wait(9)
+        self.assertEqual(self.warnings, [])
+        self.wait(1)
+        self.assertEqual(self.warnings, [50])
+        self.wait(10)
+        self.assertTrue(self.session.hibernated)
+        self.assertEqual(len(os.listdir(self.folder.name)), 1)
+
+        after = self.play({"cmd": "state"})["state"]
+        self.assertFalse(self.session.hibernated)
+        self.assertEqual(os.listdir(self.folder.name), [])
+        self.assertEqual(after["screen"], "CombatScreen")
+        for key in ("room", "hud", "storage", "game_over"):
+            self.assertEqual(after[key], before[key])
+        game = self.session.game
+        self.assertEqual(game.state_hash.value, game.state_hash.compute(game.player, game.world))
+        for _ in range(2):
+            answer = self.play({"cmd": "choose", "index": 1})
+        self.assertEqual(answer["state"]["room"]["monsters"], {})
+        self.assertIn("data_key", answer["state"]["storage"])
+        self.assertEqual(self.keeper.counts, {"warned": 1, "hibernated": 1, "woken": 1, "closed": 0})
+
+    def test_menus_and_random_streams_survive(self):
+        self.play({"batch": [{"cmd": "action", "name": "take"}, {"cmd": "choose", "index": 2},
+                             {"cmd": "key", "key": "1"}]})
+        self.play({"batch": [{"cmd": "key", "key": "s"}, {"cmd": "key", "key": "1"}]})  # inspect the blade
+        game = self.session.game
+        game.rng.random()
+        states = game.rng.getstate(), game.loot_rng.getstate()
+        self.wait(20)
+        self.assertTrue(self.session.hibernated)
+
+        answer = self.play({"cmd": "key", "key": "b"})
+        game = self.session.game
+        self.assertEqual((game.rng.getstate(), game.loot_rng.getstate()), states)
+        self.assertEqual(answer["state"]["screen"], "StorageScreen")  # back from the item, not a game command
+        self.play({"batch": [{"cmd": "key", "key": "b"}, {"cmd": "move", "direction": "north"},
+                             {"cmd": "action", "name": "solve"}]})
+        self.wait(20)
+        self.assertTrue(self.session.hibernated)
+        answer = self.play({"cmd": "answer", "text": "0"})
+        self.assertEqual(answer["state"]["screen"], "GameScreen")
+        self.assertIsNone(answer["state"]["room"]["puzzle"])
+
+    def test_timeout(self):
+        self.wait(59)
+        self.assertEqual(self.closed, [])
+        self.assertTrue(self.session.hibernated)
+        self.wait(1)
+        self.assertEqual(self.closed, [self.session])
+        self.assertEqual(len(self.keeper), 0)
+        self.assertEqual(os.listdir(self.folder.name), [])
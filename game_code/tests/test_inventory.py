@@ -1,8 +1,13 @@
+import os
+import tempfile
 import unittest
 
 from game_code.entities.characters.player import Player
+from game_code.entities.items.med import Med
 from game_code.entities.items.weapon import Weapon
 from game_code.entities.room import Room
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI, InputExhausted
 from game_code.systems.storage_handler import StorageHandler
 
 
@@ -25,4 +30,90 @@ class TestInventory(unittest.TestCase):
     def test_pick_up_over_capacity(self):
         self.weapon = Weapon("Knife", "", weight=100, damage=3)
         self.room.add_item(self.weapon)
-        self.assertFalse(self.player.pick_up(self.weapon))
\ No newline at end of file
+        self.assertFalse(self.player.pick_up(self.weapon))
+
+    def test_pick_up_held_item_when_full(self):
+        self.weapon = Weapon("Knife", "", weight=60, damage=3)
+        self.room.add_item(self.weapon)
+        self.assertTrue(self.player.pick_up(self.weapon))
+        self.assertTrue(self.player.pick_up(self.weapon))  # already held, so it doesn't count again
+        self.assertEqual(self.player.weight, 60)
+
+
+class TestStacks(unittest.TestCase):
+    """
+    This tests that items of the same name stack in storage instead of replacing each other.
+    """
+    def setUp(self):
+        self.game = Game(ui=HeadlessUI(), seed=0)
+        self.game.initialise_game()
+        self.player = self.game.player
+
+    def med(self, uses=2):
+        return Med("health_module", "", weight=8, heal=500, uses=uses, max_uses=2)
+
+    def check(self):
+        self.assertEqual(self.game.state_hash.value, self.game.state_hash.compute(self.player, self.game.world))
+
+    def test_pick_up_stacks(self):
+        first, second = self.med(uses=1), self.med()
+        self.assertTrue(self.player.pick_up(first))
+        self.assertTrue(self.player.pick_up(second))
+        self.assertIs(self.player.storage["health_module"], first)
+        self.assertEqual((first.count, first.uses, self.player.weight), (2, 1, 16))
+        self.check()
+
+        with self.assertRaises(InputExhausted):
+            self.game.storage_handler.show_player_storage()
+        self.assertIn(">[1] health_module x2 (W:16)", self.game.ui.logs)
+
+    def test_reward_leaves_the_floor_stack(self):
+        floor = self.player.current_room.items["health_module"]
+        reward = self.med()  # e.g. dropped by a monster, never on the floor
+        self.assertTrue(self.player.pick_up(reward))
+        self.assertIs(self.player.current_room.items["health_module"], floor)
+        self.assertIs(self.player.storage["health_module"], reward)
+        self.check()
+
+    def test_using_a_stack_takes_one(self):
+        self.player.pick_up(self.med())
+        self.player.pick_up(self.med())
+        self.player.equip(self.player.storage["health_module"])
+        for _ in range(2):
+            self.player.hp = 1
+            self.game.heal_player()
+        stack = self.player.storage["health_module"]
+        self.assertEqual((stack.count, stack.uses, self.player.weight), (1, 2, 8))
+        self.assertIs(self.player.equipped_med, stack)
+        self.check()
+
+        self.game.rewind.mark("drop")
+        self.player.pick_up(self.med())
+        self.game.do_drop(stack)
+        floor = self.player.current_room.items["health_module"]  # the boot sector's own, which the drop joins
+        self.assertEqual(floor.count, 2)
+        self.assertEqual(stack.count, 1)
+        self.check()
+        self.game.undo()
+        self.assertEqual(stack.count, 1)
+        self.assertEqual(floor.count, 1)
+        self.check()
+
+    def test_stacks_are_saved(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "save.bin")
+            game = Game(ui=HeadlessUI(), seed=0, save_path=path)
+            game.initialise_game()
+            stock = game.world.rooms["a0"].items["health_module"]  # saves only restore items of the world
+            for uses in (1, 3, 3):
+                med = stock.unit()
+                med.uses = uses
+                game.player.pick_up(med)
+            game.save()
+            game.saves.close()
+
+            loaded = Game(ui=HeadlessUI(), seed=0, save_path=path)
+            loaded.initialise_game()
+            stack = loaded.player.storage["health_module"]
+            self.assertEqual((stack.count, stack.uses, loaded.player.weight), (3, 1, 21))
+            loaded.saves.close()
@@ -0,0 +1,68 @@
+import copy
+import pickle
+import unittest
+
+from game_code.entities.characters.player import Player
+from game_code.entities.items.lore import Lore
+from game_code.entities.items.med import Med
+from game_code.entities.items.weapon import Weapon
+from game_code.game import Game
+from game_code.systems.asset_pack import asset
+from game_code.systems.headless_ui import HeadlessUI
+
+
+class TestItemPrototypes(unittest.TestCase):
+    """
+    This tests that items share their unchanging fields through prototypes while each keeps its own uses.
+    """
+    def test_shared_prototype(self):
+        first = Med("stim_patch", "A patch.", weight=3, heal=100, uses=1, max_uses=1)
+        second = Med("stim_patch", "A patch.", weight=3, heal=100, uses=1, max_uses=1)
+        self.assertIs(first.prototype, second.prototype)
+        self.assertIsNot(first.prototype, Med("stim_patch", "A patch.", weight=3, heal=50, uses=1, max_uses=1).prototype)
+        self.assertIsNot(first.prototype, Weapon("stim_patch", "A patch.", weight=3, damage=100).prototype)
+        self.assertFalse(hasattr(first, "__dict__"))
+
+        lore = Lore("cache_fragment.log", asset("item/cache_fragment.log"), weight=4,
+                    content=asset("lore/cache_fragment.log"))
+        self.assertIs(lore.prototype, Lore("cache_fragment.log", asset("item/cache_fragment.log"), weight=4,
+                                           content=asset("lore/cache_fragment.log")).prototype)
+        self.assertIsInstance(lore.content, str)
+
+    def test_instances_keep_their_own_state(self):
+        med = Med("stim_patch", "A patch.", weight=3, heal=100, uses=2, max_uses=2)
+        player = Player("Test", "", hp=10, max_hp=100, attack_power=5)
+        other = med.copy()
+        self.assertEqual(med.use(player), ("HP recovered: 10+90 --> 100/100", "keep"))
+        self.assertEqual((med.uses, other.uses), (1, 2))
+        self.assertIs(med.prototype, other.prototype)
+
+        loaded = pickle.loads(pickle.dumps(med))
+        self.assertEqual(loaded.uses, 1)
+        self.assertIs(loaded.prototype, med.prototype)
+
+        heavier = copy.copy(med)
+        heavier.weight = 30  # only this med changes
+        self.assertEqual((heavier.weight, med.weight), (30, 3))
+
+    def test_game_uses_prototype_items(self):
+        game = Game(ui=HeadlessUI(), seed=0)
+        game.initialise_game()
+        player = game.player
+        blade = Weapon("blade", "A blade.", weight=5, damage=77)
+        player.pick_up(blade)
+        self.assertEqual([label for _, label, _ in game.storage_handler.get_item_actions(blade)], ["Equip", "Drop"])
+        player.equip(blade)
+        self.assertEqual(player.attack_power, 77)
+
+        med = Med("stim_patch", "A patch.", weight=3, heal=100, uses=2, max_uses=2)
+        player.pick_up(med)
+        before = game.state_hash.value
+        player.hp -= 50
+        med.use(player)
+        self.assertEqual(game.state_hash.value, game.state_hash.compute(player, game.world))
+        self.assertNotEqual(game.state_hash.value, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
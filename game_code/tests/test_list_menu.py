@@ -0,0 +1,69 @@
+import curses
+import unittest
+
+from game_code.entities.items.lore import Lore
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.systems.list_menu import ListMenu
+
+
+class TestListMenu(unittest.TestCase):
+    """
+    This tests that long item menus show one page at a time and every item can be chosen.
+    """
+    def setUp(self):
+        self.ui = HeadlessUI()
+        self.items = {f"log_{i}": i for i in range(1, 1001)}
+
+    def choose(self, *keys):
+        """
+        Press keys in a new menu, as its ListScreen does.
+        :return: The chosen item, "back" or "escape", or None if the keys ran out first.
+        """
+        self.menu = ListMenu(self.ui, self.items, "Pick an item:")
+        for key in keys:
+            outcome = self.menu.handle(key)
+            if outcome in ("back", "escape"):
+                return outcome
+            if outcome not in (None, "changed"):
+                return self.items[outcome[1]]
+        return None
+
+    def test_only_the_page_is_drawn(self):
+        self.assertIsNone(self.choose())
+        self.assertEqual(self.menu.lines(), ["Pick an item:", ">[1] log_1"] + [f" [{i}] log_{i}" for i in range(2, 10)]
+                         + ["Page 1/112  [B] Back"])
+
+    def test_numbers(self):
+        self.assertEqual(self.choose("1", "2", "3"), 123)  # no longer number starts with 123
+        self.assertEqual(self.choose("5", "\n"), 5)
+        self.assertEqual(self.choose("0", "1", "0", "0", "0"), 1000)  # 0 is not an item, so it is dropped
+
+    def test_cursor(self):
+        self.assertEqual(self.choose(*[curses.KEY_DOWN] * 10, "\n"), 11)
+        self.assertEqual(self.choose(curses.KEY_NPAGE, curses.KEY_NPAGE, curses.KEY_UP, "\n"), 18)
+        self.assertEqual(self.choose(curses.KEY_UP, "\n"), 1)
+
+    def test_filter(self):
+        self.assertEqual(self.choose("/", "4", "2", "\n", "2", "\n"), 142)  # 20 matches, so "2" waits for Enter
+        self.assertIn("Filter: /42 (20 found)", self.menu.lines())
+        self.assertEqual(self.choose("/", "9", "9", "9", "\b", "\b", "\n", "\n"), 9)
+        self.assertEqual(self.choose("/", "x", "ESC", "2", "\n"), 2)
+
+    def test_back_and_escape(self):
+        self.assertEqual(self.choose("b"), "back")
+        self.assertEqual(self.choose("ESC"), "escape")
+
+    def test_take_from_a_full_room(self):
+        game = Game(ui=HeadlessUI(), seed=0)
+        game.initialise_game()
+        room = game.player.current_room
+        for i in range(12):
+            room.add_item(Lore(f"note_{i}.log", "", weight=1, content=""))
+        game.ui.push_input("1", "2")
+        game.display_items()
+        self.assertIn("note_9.log", game.player.storage)
+
+
+if __name__ == "__main__":
+    unittest.main()
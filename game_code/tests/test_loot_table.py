@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+from game_code.entities.characters.monster import Monster
+from game_code.entities.items.lore import Lore
+from game_code.entities.items.med import Med
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI, InputExhausted
+from game_code.systems.loot_table import LootTable, stream
+
+
+class TestLootTable(unittest.TestCase):
+    """
+    This tests that loot tables drop items with their weights and replay from a seed.
+    """
+    def setUp(self):
+        self.med = Med("stim_patch", "", weight=3, heal=100, uses=1, max_uses=1)
+        self.log = Lore("scrap.log", "", weight=4, content="")
+        self.table = LootTable([(6, None), (3, self.med), (1, self.log), (0, self.med)])
+
+    def test_weights(self):
+        counts = self.table.counts(stream(0, "loot"), 100000)
+        self.assertEqual(set(counts), {None, "stim_patch", "scrap.log"})
+        for name, share in ((None, 0.6), ("stim_patch", 0.3), ("scrap.log", 0.1)):
+            self.assertAlmostEqual(counts[name] / 100000, share, delta=0.01)
+
+    def test_drops_replay_and_are_copies(self):
+        first = [self.table.drop(stream(7, "loot")) for _ in range(3)]
+        again = [self.table.drop(stream(7, "loot")) for _ in range(3)]
+        self.assertEqual([item and item.name for item in first], [item and item.name for item in again])
+        self.assertEqual(self.table.sample(stream(7, "loot"), 50), self.table.sample(stream(7, "loot"), 50))
+
+        rng = stream(1, "loot")
+        meds = [item for item in (self.table.drop(rng) for _ in range(50)) if isinstance(item, Med)]
+        self.assertTrue(meds)
+        self.assertTrue(all(med is not self.med for med in meds))  # meds change, so each drop is its own
+
+    def test_needs_an_entry(self):
+        with self.assertRaises(ValueError):
+            LootTable([(0, self.med)])
+
+
+class TestLootDrops(unittest.TestCase):
+    """
+    This tests that defeated monsters and solved puzzles roll their loot from the game's loot stream.
+    """
+    def new_game(self, seed=0, save_path=None):
+        game = Game(ui=HeadlessUI(), seed=seed, save_path=save_path)
+        game.initialise_game()
+        return game
+
+    def test_monster_and_puzzle_drops(self):
+        game = self.new_game()
+        log = Lore("scrap.log", "", weight=4, content="")
+        monster = Monster("ant", "", hp=10, max_hp=10, attack_power=1, reward=None, loot=LootTable([(1, log)]))
+        game.player.current_room.add_monster(monster)
+        game.ui.push_input("1")
+        try:
+            game.do_fight("ant")
+        except InputExhausted:
+            pass  # back on the game screen, waiting for the next key
+        self.assertIn("scrap.log", game.player.storage)
+
+        game.move("north")
+        game.player.current_room.puzzle.loot = LootTable([(1, Lore("other.log", "", weight=4, content=""))])
+        game.ui.push_input("0")
+        game.puzzle_handler.do_solve()
+        self.assertIn("phantom_key", game.player.storage)
+        self.assertIn("other.log", game.player.storage)
+
+    def test_drops_ignore_other_rolls(self):
+        table = self.new_game().world.rooms["b0"].monsters["glitch_beast"].loot
+        drops = []
+        for escapes in (0, 5):
+            game = self.new_game(seed=3)
+            for _ in range(escapes):
+                game.rng.random()  # e.g. escape attempts
+            drops.append([item and item.name for item in (table.drop(game.loot_rng) for _ in range(20))])
+        self.assertEqual(drops[0], drops[1])
+
+    def test_dropped_items_are_saved(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "save.bin")
+            game = self.new_game(save_path=path)
+            stim_patch = next(item for item in game.world.rooms["b0"].monsters["glitch_beast"].loot.prototypes()
+                              if item.name == "stim_patch")
+            game.player.pick_up(stim_patch.copy())
+            game.save()
+            game.saves.close()
+
+            loaded = self.new_game(save_path=path)
+            self.assertEqual(loaded.player.storage["stim_patch"].uses, 1)
+            self.assertIsNot(loaded.player.storage["stim_patch"], stim_patch)
+            loaded.saves.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
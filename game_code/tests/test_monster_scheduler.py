@@ -0,0 +1,153 @@
+import unittest
+
+from game_code.entities.characters.monster import Monster
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.systems.monster_scheduler import MonsterScheduler
+from game_code.systems.timer_wheel import TimerWheel
+from game_code.world.world_builder import WorldBuilder
+from game_code.world.world_generator import WorldGenerator
+
+
+def drone(name="drone"):
+    return Monster(name, "", hp=100, max_hp=100, attack_power=10, reward=None)
+
+
+class TestTimerWheel(unittest.TestCase):
+    """
+    This tests that the timer wheel hands out items on the tick they are due, including past the end of the ring.
+    """
+    def test_due_ticks(self):
+        wheel = TimerWheel(slots=4)
+        wheel.schedule(1, "a")
+        wheel.schedule(5, "b")  # same slot as "a", one ring later
+        wheel.schedule(0, "c")  # never in the past
+        self.assertEqual(len(wheel), 3)
+        due = {}
+        for _ in range(6):
+            items = wheel.advance()
+            due[wheel.now] = items
+        self.assertEqual(due, {1: ["a", "c"], 2: [], 3: [], 4: [], 5: ["b"], 6: []})
+        self.assertEqual(len(wheel), 0)
+
+
+class TestMonsterScheduler(unittest.TestCase):
+    """
+    This tests that scheduled monsters patrol, chase, wander and respawn.
+    """
+    def setUp(self):
+        self.world = WorldBuilder()
+        self.boot_sector = self.world.build()
+        self.rooms = self.world.rooms
+
+    def test_patrol(self):
+        scheduler = MonsterScheduler(self.world)
+        monster = drone()
+        scheduler.add(monster, self.boot_sector, "patrol", period=2, route=("north", "south"))
+        visited = []
+        for _ in range(6):
+            for moved, _, room in scheduler.tick():
+                visited.append(room.name)
+        self.assertEqual(visited, ["lost_cache", "boot_sector", "lost_cache"])
+        self.assertIs(self.rooms["a1"].monsters["drone"], monster)
+
+    def test_chase_and_locks(self):
+        player = Game(ui=HeadlessUI()).player
+        player.current_room = self.rooms["b0"]
+        scheduler = MonsterScheduler(self.world, player)
+        scheduler.add(drone(), self.rooms["a1"], "chase")
+        scheduler.tick()  # next door to boot_sector only, so it wanders there
+        self.assertIn("drone", self.boot_sector.monsters)
+        scheduler.tick()
+        self.assertIn("drone", self.rooms["b0"].monsters)
+        scheduler.tick()
+        self.assertIn("drone", self.rooms["b0"].monsters)  # stays with the player
+
+        scheduler = MonsterScheduler(self.world)
+        scheduler.add(drone("ghost"), self.boot_sector, "patrol", route=("east",))
+        scheduler.tick()
+        self.assertIn("ghost", self.boot_sector.monsters)  # the phantom node is locked
+
+    def test_blocking_monsters_only_guard(self):
+        scheduler = MonsterScheduler(self.world)
+        beast = self.rooms["b0"].monsters["glitch_beast"]
+        with self.assertRaises(ValueError):
+            scheduler.add(beast, self.rooms["b0"], "wander")
+        scheduler.add(beast, self.rooms["b0"], "guard", respawn=3)
+        scheduler.tick()
+        self.assertIs(self.rooms["b0"].blocker("east"), beast)
+
+    def test_respawn(self):
+        scheduler = MonsterScheduler(self.world)
+        beast = self.rooms["b0"].monsters["glitch_beast"]
+        scheduler.add(beast, self.rooms["b0"], "guard", respawn=3)
+        beast.hp = 0
+        self.rooms["b0"].remove_monster(beast)
+        for _ in range(3):
+            scheduler.tick()
+        self.assertNotIn("glitch_beast", self.rooms["b0"].monsters)
+        scheduler.tick()
+        respawned = self.rooms["b0"].monsters["glitch_beast"]
+        self.assertIsNot(respawned, beast)
+        self.assertEqual(respawned.hp, respawned.max_hp)
+        self.assertIs(self.rooms["b0"].blocker("east"), respawned)
+
+    def test_wanderers_stay_in_loaded_rooms(self):
+        world = WorldGenerator(10000, seed=1)
+        start = world.build()
+        world.resolve(start)
+        scheduler = MonsterScheduler(world, seed=0)
+        for i in range(50):
+            scheduler.add(drone(f"drone_{i}"), start)
+        for _ in range(100):
+            scheduler.tick()
+        self.assertEqual(len(world.loaded), 1)
+        self.assertEqual(len(start.monsters), 50 + sum(1 for m in start.monsters.values() if m.name.startswith("glitch")))
+
+    def test_game_ticks_and_undo(self):
+        game = Game(ui=HeadlessUI(), seed=0)
+        game.initialise_game()
+        game.scheduler = MonsterScheduler(game.world, game.player)
+        monster = drone()
+        wanderer = game.scheduler.add(monster, game.world.rooms["a1"], "patrol", route=("south", "north"))
+        before = game.state_hash.canonical(game.player, game.world)
+
+        game.input_handler.handle("i")  # one turn of the game loop
+        game.tick_monsters()
+        self.assertIs(game.player.current_room.monsters.get("drone"), monster)
+        self.assertIn("drone wanders in.", game.ui.logs)
+
+        game.undo()
+        self.assertEqual(game.state_hash.canonical(game.player, game.world), before)
+        game.scheduler.tick()  # found back in the lost cache, where rewinding put it
+        self.assertIs(wanderer.room, game.world.rooms["a1"])
+        self.assertIs(wanderer.monster, monster)
+
+    def test_world_monsters_are_scheduled(self):
+        game = Game(ui=HeadlessUI(), seed=0)
+        game.initialise_game()
+        self.assertEqual(len(game.scheduler), 1)
+        for _ in range(2):
+            game.tick_monsters()
+        self.assertIn("stray_process", game.world.rooms["d0"].monsters)
+        self.assertNotIn("stray_process", game.world.rooms["d1"].monsters)
+        self.assertEqual(game.state_hash.value, game.state_hash.compute(game.player, game.world))
+
+    def test_forked_worlds_move_their_own_copies(self):
+        template = Game(ui=HeadlessUI(), seed=0).pristine()
+        game = Game(ui=HeadlessUI(), seed=0)
+        game.template = template
+        game.initialise_game()
+        fork = game.fork()
+        for _ in range(2):
+            fork.tick_monsters()
+        self.assertIn("stray_process", fork.world.lookup("fractured_archive").monsters)
+        for world in (template[0], game.world):
+            self.assertIn("stray_process", world.lookup("obsolete_hub").monsters)
+            self.assertNotIn("stray_process", world.lookup("fractured_archive").monsters)
+        for each in (game, fork):
+            self.assertEqual(each.state_hash.value, each.state_hash.compute(each.player, each.world))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from game_code.entities.characters.player import Player
+from game_code.entities.room import Room
+from game_code.game import Game
+from game_code.systems.recorder import MirrorScreen, play, record
+from game_code.systems.remote_ui import RemoteScreen, RemoteUI
+from game_code.systems.text_ui import TextUI
+from game_code.tests.test_remote_ui import Terminal
+
+
+class TestRecorder(unittest.TestCase):
+    """
+    This tests that recordings are written in chunks as asciicast v2 and replay to the screen that was recorded.
+    """
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "game.cast")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def session(self, ui):
+        ui.delay = lambda seconds: None
+        ui.set_typing_speed(0)
+        player = Player(*Game.PLAYER)
+        for i in range(5):
+            ui.redraw_game(Room(f"room_{i}", f"ROOM {i}\nA dusty sector."), player)
+            ui.display_text(f"Log entry {i} recovered.", typing=True)
+
+    def replayed(self, height, width):
+        out = io.StringIO()
+        play(self.path, out, speed=None)
+        terminal = Terminal(height, width)
+        terminal.feed(out.getvalue())
+        return terminal.lines()
+
+    def test_remote_session(self):
+        ui = RemoteUI(lambda data: None, height=20, width=60)
+        ui.start_screen()
+        recorder = record(ui, self.path, title="run")
+        self.session(ui)
+        ui.screen.flush()
+        recorder.close()
+
+        with open(self.path, encoding="utf-8") as file:
+            header, *events = [json.loads(line) for line in file]
+        self.assertEqual(header["version"], 2)
+        self.assertEqual((header["width"], header["height"], header["title"]), (60, 20, "run"))
+        self.assertGreater(len(events), 80)  # about a frame per typed character
+        self.assertEqual(recorder.writes, 1)  # but written at once
+        times = [event[0] for event in events]
+        self.assertEqual(times, sorted(times))
+        self.assertEqual(self.replayed(20, 60), ui.screen.shadow)
+
+    def test_local_session_is_mirrored(self):
+        ui = TextUI()
+        ui.screen = window = RemoteScreen(lambda data: None, 20, 60)  # stands in for the curses window
+        window.nodelay(True)
+        ui.started = True
+        recorder = record(ui, self.path)
+        self.assertIsInstance(ui.screen, MirrorScreen)
+        self.session(ui)
+        recorder.close()
+        window.flush()
+        self.assertEqual(self.replayed(20, 60), window.shadow)
+
+    def test_replay_speed(self):
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write('{"version": 2, "width": 10, "height": 2}\n[0.5, "o", "a"]\n[2.5, "o", "b"]\n[2.5, "o", "c"]\n')
+        for speed, delays in ((1, [0.5, 2.0]), (10, [0.05, 0.2]), (None, [])):
+            slept = []
+            out = io.StringIO()
+            play(self.path, out, speed=speed, sleep=slept.append)
+            self.assertEqual([round(delay, 6) for delay in slept], delays)
+            self.assertTrue(out.getvalue().startswith("abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import curses
+import re
+import unittest
+
+from game_code.entities.characters.player import Player
+from game_code.entities.room import Room
+from game_code.game import Game
+from game_code.systems.remote_ui import FrameDecoder, RemoteUI
+
+SEQUENCE = re.compile(r"\x1b\[(\??)([0-9;]*)([A-Za-z])|([\r\n\b])|([^\x1b\r\n\b]+)")
+
+
+class Terminal:
+    """
+    Just enough of a terminal to check what a client shows.
+    """
+    def __init__(self, height, width):
+        self.rows = [[" "] * width for _ in range(height)]
+        self.y = self.x = 0
+
+    def feed(self, text):
+        for private, args, command, control, chars in SEQUENCE.findall(text):
+            numbers = [int(n) if n else 1 for n in args.split(";")] if args else [1]
+            if chars:
+                for char in chars:
+                    self.rows[self.y][self.x] = char
+                    self.x = min(self.x + 1, len(self.rows[0]) - 1)
+            elif control == "\r":
+                self.x = 0
+            elif control == "\n":
+                self.y += 1
+            elif control == "\b":
+                self.x -= 1
+            elif private:
+                continue
+            elif command == "H":
+                self.y, self.x = numbers[0] - 1, (numbers[1] if len(numbers) > 1 else 1) - 1
+            elif command == "G":
+                self.x = numbers[0] - 1
+            elif command == "C":
+                self.x += numbers[0]
+            elif command == "D":
+                self.x -= numbers[0]
+            elif command == "B":
+                self.y += numbers[0]
+            elif command == "K":
+                self.rows[self.y][self.x:] = [" "] * (len(self.rows[0]) - self.x)
+            elif command == "J":
+                self.rows = [[" "] * len(row) for row in self.rows]
+
+    def lines(self):
+        return ["".join(row) for row in self.rows]
+
+
+class TestRemoteUI(unittest.TestCase):
+    """
+    This tests that remote sessions send only the changed cells and that the client ends up showing the game.
+    """
+    def setUp(self):
+        self.output = []
+        self.ui = RemoteUI(self.output.append, height=30, width=100, compress=True)
+        self.ui.delay = lambda seconds: None
+        self.ui.set_typing_speed(0)
+        self.ui.start_screen()
+        self.screen = self.ui.screen
+
+    def client(self):
+        self.screen.flush()
+        terminal, decoder = Terminal(30, 100), FrameDecoder()
+        terminal.feed(decoder.feed(b"".join(self.output)).decode("utf-8"))
+        return terminal.lines()
+
+    def test_client_shows_the_game(self):
+        self.ui.toggle_typing(False)  # typing reads keys, which would eat the scripted ones
+        self.ui.feed(b"x" + b"t1" + b"2" + b"\x1b[B" + b"i")
+        self.ui.feed(b"\x1bq")
+        game = Game(ui=self.ui)
+        self.assertEqual(game.run(), "quit")
+        self.assertIn("health_module", game.player.storage)
+        self.assertEqual(self.client(), self.screen.shadow)
+        self.assertIn("[Q] Quit", "".join(self.client()))  # the pause menu
+
+    def test_minimal_output(self):
+        self.ui.display_text("hello")
+        frames = len(self.output)
+        self.ui.display_text("typing", typing=True)
+        typed = self.output[frames:]
+        self.assertEqual(len(typed), 6)  # a frame per character
+        self.assertEqual(sum(map(len, typed)), 6 * 2 + 2)  # a character and a frame header each, and one move
+
+        self.ui.redraw_game(Room("a_room", "A ROOM\nwith a view"), Player(*Game.PLAYER))
+        self.ui.get_key()
+        frames = len(self.output)
+        self.ui.redraw_game(Room("a_room", "A ROOM\nwith a view"), Player(*Game.PLAYER))  # cleared, drawn the same
+        self.ui.get_key()
+        self.assertEqual(len(self.output), frames)
+        self.assertEqual(self.client(), self.screen.shadow)
+
+    def test_keys(self):
+        self.ui.feed(b"\x1b[A\x1bq\r\n/\x1b[6~")
+        keys = [self.ui.get_key() for _ in range(5)]
+        self.assertEqual(keys, [curses.KEY_UP, "ESC", "q", "\n", "/"])
+        self.assertEqual(self.ui.get_key(), curses.KEY_NPAGE)
+        self.assertEqual(self.ui.get_key(), -1)
+        self.ui.toggle_typing(False)  # or typing the prompt reads the keys
+        self.ui.feed(b"ab\x7fc\r")
+        self.assertEqual(self.ui.get_text(), "ac")
+
+
+if __name__ == "__main__":
+    unittest.main()
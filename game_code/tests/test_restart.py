@@ -0,0 +1,48 @@
+import unittest
+from unittest import mock
+
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI
+
+
+class TestRestart(unittest.TestCase):
+    """
+    This tests that restarts fork the pristine world template and keep the UI session.
+    """
+    def setUp(self):
+        self.game = Game(ui=HeadlessUI(), seed=0)
+        self.game.initialise_game()
+
+    def test_restart_from_template(self):
+        game = self.game.restart()
+        game.initialise_game()
+        game.ui.push_input("2")  # don't equip
+        game.take_item(game.player.current_room.items["fragmented_blade"])
+        game.move("south")
+        self.assertIn("fragmented_blade", game.player.storage)
+
+        again = game.restart()
+        again.initialise_game()
+        self.assertIs(again.ui, self.game.ui)
+        self.assertIs(again.template, game.template)
+        self.assertEqual(again.player.storage, {})
+        self.assertEqual(again.player.current_room.name, "boot_sector")
+        self.assertIn("fragmented_blade", again.player.current_room.items)
+        self.assertEqual(again.state_hash.value, again.state_hash.compute(again.player, again.world))
+        self.assertEqual(again.state_hash.value, self.game.pristine()[2])
+        _, start_room, _ = again.template
+        self.assertIn("fragmented_blade", start_room.items)  # the template is never changed
+        self.assertEqual(set(again.world.own), {"boot_sector"})
+
+    def test_run_restarts_in_one_session(self):
+        ui = HeadlessUI()
+        ui.push_input("ESC", "r", "ESC", "r", "ESC", "q")
+        with mock.patch.object(ui, "start_screen") as started, mock.patch.object(ui, "print_welcome") as welcomed:
+            self.assertEqual(Game(ui=ui, seed=0).run(), "quit")
+        self.assertEqual(started.call_count, 1)
+        self.assertEqual(welcomed.call_count, 1)  # restarts skip the intro
+        self.assertFalse(ui.inputs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI, InputExhausted
+from game_code.systems.rewind import Rewind
+
+
+class TestRewind(unittest.TestCase):
+    """
+    This tests that rewinding actions puts the game back exactly as it was.
+    """
+    def setUp(self):
+        self.game = Game(ui=HeadlessUI(), seed=0)
+        self.game.initialise_game()
+        self.player = self.game.player
+        self.room = self.player.current_room
+
+    def snapshot(self):
+        return self.game.state_hash.canonical(self.player, self.game.world)
+
+    def test_undo_drop(self):
+        blade = self.room.items["fragmented_blade"]
+        self.game.rewind.mark("take")
+        self.player.pick_up(blade)
+        self.player.equip(blade)
+        before = self.snapshot()
+
+        self.game.rewind.mark("drop")
+        self.game.do_drop(blade)
+        self.assertIn("fragmented_blade", self.room.items)
+
+        self.game.undo()
+        self.assertEqual(self.snapshot(), before)
+        self.assertIs(self.player.equipped_weapon, blade)
+        self.assertEqual(self.player.attack_power, 150)
+        self.assertNotIn("fragmented_blade", self.room.items)
+
+    def test_undo_failed_retreat_and_unlock(self):
+        start = self.snapshot()
+        start_hash = self.game.state_hash.value
+        self.game.rewind.mark("unlock")
+        self.room.unlock_exit("east")
+        self.game.move("south")
+        monster = self.player.current_room.monsters["glitch_beast"]
+
+        self.game.rng.seed(0)  # first roll is above ESCAPE_CHANCE
+        self.game.ui.push_input("1", "3")
+        try:
+            self.game.do_fight("glitch_beast")
+        except InputExhausted:
+            pass  # the fight waits for the next action
+        self.assertEqual(monster.hp, 400)
+        self.assertEqual(self.player.hp, 200)  # hit once per turn by 150
+
+        self.assertEqual(self.game.rewind.undo(1), ["retreat glitch_beast"])
+        self.assertEqual(self.player.hp, 350)
+        self.game.undo(10)
+        self.assertEqual(self.snapshot(), start)
+        self.assertEqual(self.game.state_hash.value, start_hash)
+        self.assertEqual(self.room.locked_exits["east"], "unlock_c0")
+
+    def test_undo_after_fork(self):
+        before = self.snapshot()
+        self.game.rewind.mark("unlock")
+        self.room.unlock_exit("east")
+        self.game.rewind.mark("take")
+        self.player.pick_up(self.room.items["health_module"])
+        self.game.move("north")
+        fork = self.game.fork()
+        after = fork.state_hash.canonical(fork.player, fork.world)
+
+        self.game.undo(10)
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(self.game.state_hash.value, self.game.state_hash.compute(self.player, self.game.world))
+        room = self.player.current_room
+        self.assertIs(room, self.game.world.lookup(room.name))  # the game's own copy, not the shared room
+        self.assertIn("health_module", room.items)
+        self.assertIn("east", room.locked_exits)
+
+        self.assertEqual(fork.state_hash.canonical(fork.player, fork.world), after)  # the fork is left alone
+        self.assertEqual(fork.state_hash.value, fork.state_hash.compute(fork.player, fork.world))
+        self.assertIn("health_module", fork.player.storage)
+
+    def test_ring_is_bounded(self):
+        rewind = Rewind(self.game.state_hash, action_limit=5, delta_limit=8)
+        self.game.state_hash.listeners = [rewind]
+        for i in range(20):
+            rewind.mark(f"hit {i}")
+            self.player.hp -= 1
+            self.player.hp -= 1
+        self.assertEqual(len(rewind), 4)
+        self.assertLessEqual(rewind.size, 8)
+        self.assertEqual(rewind.undo(10), ["hit 19", "hit 18", "hit 17", "hit 16"])
+        self.assertEqual(self.player.hp, 468)
@@ -0,0 +1,53 @@
+import pickle
+import unittest
+
+from game_code.entities.characters.monster import Monster
+from game_code.entities.characters.player import Player
+from game_code.entities.items.key import Key
+from game_code.world.world_builder import WorldBuilder
+
+
+class TestRoom(unittest.TestCase):
+    """
+    This test checks that the exit line of a room's description and the exit blockers follow its exits, locks
+    and monsters.
+    """
+    def setUp(self):
+        self.world = WorldBuilder()
+        self.boot_sector = self.world.build()
+
+    def test_exit_line(self):
+        self.assertEqual(self.boot_sector.describe_exits(), "Exits: NORTH -> Lost Cache, SOUTH -> Glitch Pit")
+        self.assertTrue(self.boot_sector.describe().rstrip().endswith("Exits: NORTH -> Lost Cache, SOUTH -> Glitch Pit"))
+        self.assertIn("EAST -> Data Well", self.world.rooms["b0"].describe())  # locked but not secret
+        self.assertEqual(self.world.rooms["d2"].describe_exits(), "")
+
+    def test_phantom_key_reveals_exit(self):
+        player = Player("Test", "", hp=50, max_hp=100, attack_power=50)
+        player.set_current_room(self.boot_sector)
+        key = Key("phantom_key", "", weight=4, key_id="unlock_c0")
+        key.use(player)
+        self.assertTrue(self.boot_sector.describe_exits().endswith("EAST -> Phantom Node"))
+
+        self.boot_sector.lock_exit("east", "unlock_c0")
+        self.assertNotIn("Phantom Node", self.boot_sector.describe())
+
+    def test_blocker_index(self):
+        glitch_pit = self.world.rooms["b0"]
+        beast = glitch_pit.monsters["glitch_beast"]
+        self.assertIs(glitch_pit.blocker("east"), beast)
+        self.assertIsNone(glitch_pit.blocker("west"))
+
+        wall = Monster("wall", "", 10, 10, 1, None, blocks_exit="east")
+        glitch_pit.add_monster(wall)
+        self.assertIs(glitch_pit.blocker("east"), beast)  # the first blocker in the room wins
+        glitch_pit.remove_monster(beast)
+        self.assertIs(glitch_pit.blocker("east"), wall)
+        self.assertEqual(glitch_pit.copy().blocker("east").name, "wall")
+        self.assertEqual(pickle.loads(pickle.dumps(glitch_pit.monsters)).blockers["east"].name, "wall")
+        glitch_pit.monsters.pop("wall")  # rewinds change the dictionary directly
+        self.assertIsNone(glitch_pit.blocker("east"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import asyncio
+import unittest
+
+from game_code.systems.room_actors import ActorWorld
+
+
+class TestRoomActors(unittest.TestCase):
+    """
+    This tests that rooms run as actors which serialise their own changes and only exist while they are in use.
+    """
+    def test_players_move_and_see_each_other(self):
+        async def scenario():
+            world = ActorWorld()
+            ada = await world.join("ada")
+            bob = await world.join("bob")
+            self.assertEqual(await world.look(*ada), ["ada", "bob"])
+            self.assertEqual(await world.move(*ada, "north"), "moved")
+            self.assertEqual(ada[1].current_room.name, "lost_cache")
+            self.assertEqual(await world.look(*ada), ["ada"])
+            self.assertEqual(await world.look(*bob), ["bob"])
+            self.assertEqual(await world.move(*bob, "east"), "locked")
+            self.assertEqual(await world.move(*bob, "up"), "no exit")
+
+        asyncio.run(scenario())
+
+    def test_idle_actors_are_dropped(self):
+        async def scenario():
+            world = ActorWorld()
+            ada = await world.join("ada")
+            await world.move(*ada, "north")
+            await world.move(*ada, "south")
+            await world.move(*ada, "north")
+            await asyncio.sleep(0)  # let the last actors finish
+            self.assertEqual(world.running(), 0)
+            self.assertEqual(sorted(world.actors), ["lost_cache"])
+            await world.leave(*ada)
+            await asyncio.sleep(0)
+            self.assertEqual(world.actors, {})
+
+        asyncio.run(scenario())
+
+    def test_same_item_has_one_winner(self):
+        async def scenario():
+            world = ActorWorld()
+            ada, bob = await world.join("ada"), await world.join("bob")
+            return await asyncio.gather(world.take(*ada, "health_module"), world.take(*bob, "health_module"))
+
+        self.assertEqual(sorted(asyncio.run(scenario())), ["gone", "taken"])
+
+    def test_moving_player_cannot_act_in_the_room_left(self):
+        async def scenario():
+            world = ActorWorld()
+            ada = await world.join("ada")
+            start = ada[1].current_room
+            replies = await asyncio.gather(world.move(*ada, "north"), world.take(*ada, "health_module"))
+            self.assertEqual(replies, ["moved", "not here"])
+            self.assertNotIn("health_module", ada[1].storage)
+            self.assertIn("health_module", start.items)
+
+        asyncio.run(scenario())
+
+    def test_solving_puzzle_gives_reward(self):
+        async def scenario():
+            world = ActorWorld()
+            ada = await world.join("ada")
+            await world.move(*ada, "north")
+            self.assertEqual(await world.solve(*ada, "1"), "incorrect")
+            self.assertEqual(await world.solve(*ada, "0"), "solved")
+            self.assertEqual(await world.solve(*ada, "0"), "gone")
+            self.assertIn("phantom_key", ada[1].storage)
+
+        asyncio.run(scenario())
+
+    def test_full_mailbox_makes_senders_wait(self):
+        async def scenario():
+            world = ActorWorld()
+            actor = world.actor(world.start_room)
+            actor.mailbox = asyncio.Queue(2)
+            players = [await world.join(f"p{i}") for i in range(8)]
+            replies = await asyncio.gather(*(world.look(*player) for player in players))
+            self.assertEqual(replies, [[f"p{i}" for i in range(8)]] * 8)
+            with self.assertRaises(ValueError):
+                await world.send(world.start_room, "dance", *players[0])
+
+        asyncio.run(scenario())
+
+    def test_messages_are_handled_in_batches(self):
+        async def scenario():
+            world = ActorWorld()
+            players = [await world.join(f"p{i}") for i in range(20)]
+            actor = world.actor(world.start_room)
+            actor.BATCH_SIZE, actor.mailbox = 4, asyncio.Queue(8)
+            ticks, handled, waiting = [0], [], []
+            handle = actor.handle
+
+            def counted(message):
+                handled.append(ticks[0])
+                waiting.append(actor.senders)
+                return handle(message)
+
+            async def ticker():  # runs whenever the actor yields, i.e. between batches
+                while True:
+                    ticks[0] += 1
+                    await asyncio.sleep(0)
+
+            actor.handle = counted
+            task = asyncio.create_task(ticker())
+            await asyncio.gather(*(world.look(*player) for player in players))
+            task.cancel()
+            return handled, waiting
+
+        handled, waiting = asyncio.run(scenario())
+        self.assertEqual(len(handled), 20)
+        batches = [handled.count(tick) for tick in sorted(set(handled))]
+        self.assertLessEqual(max(batches), 4)
+        self.assertGreaterEqual(len(batches), 5)
+        self.assertGreater(max(waiting), 0)  # senders waited on the full mailbox
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import tempfile
+import unittest
+import zlib
+
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.systems.save_manager import FULL, HEADER, MAGIC, SaveManager
+from game_code.world.world_generator import WorldGenerator
+
+
+class TestSave(unittest.TestCase):
+    """
+    This tests that saves and autosaves restore the exact game state.
+    """
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "save.bin")
+        self.game = self.new_game()
+        self.player = self.game.player
+
+    def tearDown(self):
+        self.game.saves.close()
+        self.folder.cleanup()
+
+    def new_game(self):
+        game = Game(ui=HeadlessUI(), save_path=self.path)
+        game.initialise_game()
+        return game
+
+    def snapshot(self, game):
+        return game.state_hash.canonical(game.player, game.world)
+
+    def play(self):
+        """
+        Pick up and equip the blade, use the phantom key and walk into the glitch pit.
+        """
+        room = self.player.current_room
+        blade = room.items["fragmented_blade"]
+        self.player.pick_up(blade)
+        self.player.equip(blade)
+        self.game.move("south")
+        self.player.current_room.monsters["glitch_beast"].hp = 123
+        self.game.move("north")
+        room.unlock_exit("east")
+        room.update_description("A changed boot sector.")
+
+    def test_save_and_load(self):
+        self.play()
+        self.game.save()
+
+        loaded = self.new_game()
+        self.assertEqual(self.snapshot(loaded), self.snapshot(self.game))
+        self.assertEqual(loaded.state_hash.value, self.game.state_hash.value)
+        self.assertEqual(loaded.player.current_room.description, "A changed boot sector.")
+        self.assertIs(loaded.player.equipped_weapon, loaded.player.storage["fragmented_blade"])
+
+    def test_autosave_deltas(self):
+        self.play()
+        self.game.saves.checkpoint(self.game)  # the unlock happened after the last move
+        self.game.saves.flush()
+        self.assertTrue(os.path.getsize(self.path + ".log") > 0)
+
+        loaded = self.new_game()
+        self.assertEqual(self.snapshot(loaded), self.snapshot(self.game))
+        self.assertEqual(loaded.saves.deltas, 2)
+
+    def test_corrupt_tail_is_ignored(self):
+        self.game.move("south")
+        self.game.saves.flush()
+        expected = self.snapshot(self.game)
+        self.player.current_room.monsters["glitch_beast"].hp = 1
+        self.game.move("north")
+        self.game.saves.close()
+
+        with open(self.path + ".log", "r+b") as file:
+            file.seek(-3, os.SEEK_END)
+            file.write(b"\0\0\0")  # a torn write of the last delta
+
+        loaded = self.new_game()
+        self.assertEqual(self.snapshot(loaded), expected)
+
+    def stack(self, count):
+        med = self.player.current_room.items["health_module"]
+        self.player.pick_up(med)
+        med.count, med.uses = count, 1
+        return med
+
+    def test_stack_is_one_record(self):
+        med = self.stack(1)
+        single = len(self.game.saves.encode(self.player, list(self.game.world.current_rooms())))
+        med.count = 500
+        size = len(self.game.saves.encode(self.player, list(self.game.world.current_rooms())))
+        self.assertLessEqual(size, single + 1)  # only the count grows, by a byte
+        self.game.save()
+
+        loaded = self.new_game()
+        self.assertEqual(self.snapshot(loaded), self.snapshot(self.game))
+        med = loaded.player.storage["health_module"]
+        self.assertEqual((med.count, med.uses), (500, 1))
+
+    def test_version_1_saves_load(self):
+        class Version1(SaveManager):
+            @staticmethod
+            def encode_items(writer, items):  # a record per item, the top one first
+                writer.uint(sum(item.count for item in items.values()))
+                for item in items.values():
+                    uses = getattr(item, "uses", -1)
+                    for _ in range(item.count):
+                        writer.string(item.name)
+                        writer.uint(uses + 1)
+                        uses = getattr(item, "max_uses", -1)
+
+        self.stack(3)
+        data = zlib.compress(Version1(None).encode(self.player, list(self.game.world.current_rooms())))
+        with open(self.path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, 1, FULL, len(data), 0, zlib.crc32(data)) + data)
+        open(self.path + ".log", "wb").close()
+
+        loaded = self.new_game()
+        self.assertEqual(self.snapshot(loaded), self.snapshot(self.game))
+        med = loaded.player.storage["health_module"]
+        self.assertEqual((med.count, med.uses), (3, 1))
+
+    def test_generated_world(self):
+        self.game.saves.close()
+        self.game = Game(ui=HeadlessUI(), save_path=self.path)
+        self.game.world = WorldGenerator(100000, seed=3)
+        self.game.initialise_game()
+        for direction in ("east", "east", "south"):
+            self.game.move(direction)
+        self.game.player.current_room.kernel_unlock = True
+        self.game.save()
+
+        loaded = Game(ui=HeadlessUI(), save_path=self.path)
+        loaded.world = WorldGenerator(100000, seed=3)
+        loaded.initialise_game()
+        self.assertEqual(loaded.player.current_room.name, self.game.player.current_room.name)
+        self.assertTrue(loaded.player.current_room.kernel_unlock)
+        self.assertLess(os.path.getsize(self.path), 1000)  # only the loaded rooms are saved
+
+
+if __name__ == "__main__":
+    unittest.main()
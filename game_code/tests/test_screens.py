@@ -0,0 +1,67 @@
+import curses
+import unittest
+from unittest import mock
+
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI, InputExhausted
+from game_code.systems.storage_handler import StorageScreen
+
+
+class TestScreens(unittest.TestCase):
+    """
+    This tests that menus, fights and the pause menu are screens on one stack, read by one loop.
+    """
+    def setUp(self):
+        self.game = Game(ui=HeadlessUI(), seed=0)
+        self.game.initialise_game()
+        self.player = self.game.player
+        self.player.pick_up(self.player.current_room.items["fragmented_blade"])
+
+    def test_storage_round_trips_do_not_nest(self):
+        self.game.ui.push_input(*["1", "b"] * 3000, "b")
+        self.game.input_handler.handle("s")  # used to recurse once per round trip
+        self.assertEqual(len(self.game.screens), 0)
+        self.assertFalse(self.game.ui.inputs)
+
+    def test_back_redraws_from_cache(self):
+        lines = StorageScreen.lines
+        with mock.patch.object(StorageScreen, "lines", autospec=True, side_effect=lines) as drawn:
+            self.game.ui.push_input("1", "b", "1", "b")
+            with self.assertRaises(InputExhausted):
+                self.game.storage_handler.show_player_storage()
+            self.assertEqual(drawn.call_count, 1)
+            self.assertIn(">[1] fragmented_blade (W:24)", self.game.ui.logs)
+
+            self.game.ui.push_input("1", "1", "b", "b")  # equip, then back to the item and the storage
+            with self.assertRaises(InputExhausted):
+                self.game.storage_handler.show_player_storage()
+            self.assertEqual(drawn.call_count, 3)  # the state changed, so the storage is drawn again
+        self.assertEqual(self.player.attack_power, 150)
+
+    def test_pause_over_a_menu(self):
+        self.game.ui.push_input("ESC", "ESC")
+        with self.assertRaises(InputExhausted):
+            self.game.storage_handler.show_player_storage()
+        self.assertFalse(self.game.pause)
+        self.assertIn(">[1] fragmented_blade (W:24)", self.game.ui.logs)  # back on the storage menu
+
+        self.game.ui.push_input("ESC", "q")
+        self.game.storage_handler.show_player_storage()
+        self.assertEqual(len(self.game.screens), 0)
+
+    def test_play_through_the_stack(self):
+        self.game.initialise_game = lambda: None  # keep the blade picked up in setUp
+        self.game.ui.push_input(curses.KEY_DOWN, curses.KEY_RIGHT, "ESC", "ESC")
+        with self.assertRaises(InputExhausted):
+            self.game.play()
+        logs = list(self.game.ui.logs)  # the fight, drawn again on resuming
+        self.assertTrue(logs[0].startswith("glitch_beast HP:"))
+        self.assertEqual(logs[-4:], ["Choose your action:", "[1] Attack", "[2] Heal", "[3] Retreat"])
+        self.assertIsNotNone(self.game.active_combat)
+
+        self.game.ui.push_input("ESC", "q")
+        self.assertEqual(self.game.play(), "quit")
+
+
+if __name__ == "__main__":
+    unittest.main()
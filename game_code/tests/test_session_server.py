@@ -0,0 +1,50 @@
+import asyncio
+import json
+import unittest
+
+from game_code.game import Game
+from game_code.systems.control import parse
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.systems.session_server import Session, SessionServer
+
+
+class TestSessionServer(unittest.TestCase):
+    """
+    This tests that sessions are played a request at a time, keeping fights open between requests, and served
+    over TCP.
+    """
+    def play(self, session, request):
+        return session.play(parse(json.dumps(request)))
+
+    def test_fight_across_requests(self):
+        session = Session(Game(ui=HeadlessUI()).pristine(), seed=0)
+        self.play(session, {"batch": [{"cmd": "action", "name": "take"}, {"cmd": "choose", "index": 2},
+                                      {"cmd": "key", "key": "1"}]})
+        answer = self.play(session, {"batch": [{"cmd": "move", "direction": "south"},
+                                               {"cmd": "move", "direction": "east"}]})
+        self.assertEqual(answer["state"]["screen"], "CombatScreen")
+        self.assertEqual(answer["state"]["hud"]["weapon"], "fragmented_blade")
+        for _ in range(3):
+            answer = self.play(session, {"cmd": "choose", "index": 1})
+        self.assertEqual(answer["state"]["screen"], "GameScreen")
+        self.assertEqual(answer["state"]["room"]["monsters"], {})
+        self.assertIn("data_key", answer["state"]["storage"])
+
+        answer = self.play(session, {"batch": [{"cmd": "move", "direction": "west"}, {"cmd": "fly"}]})
+        self.assertFalse(answer["ok"])
+        self.assertTrue(answer["results"][0]["ok"])
+
+    def test_serve(self):
+        async def run():
+            server = SessionServer()
+            address = await server.start()
+            reader, writer = await asyncio.open_connection(*address)
+            writer.write(b'{"cmd": "move", "direction": "north"}\n{"cmd": "stats"}\n')
+            moved, stats = json.loads(await reader.readline()), json.loads(await reader.readline())
+            writer.close()
+            await server.close()
+            return moved, stats
+
+        moved, stats = asyncio.run(run())
+        self.assertEqual(moved["state"]["room"]["name"], "lost_cache")
+        self.assertEqual((stats["sessions"], stats["started"], stats["actions"]), (1, 1, 1))
@@ -0,0 +1,76 @@
+import curses
+import unittest
+from collections import Counter
+
+from game_code.systems.sharding import ShardedWorld, cut_edges, partition
+from game_code.world.world_builder import WorldBuilder
+from game_code.world.world_generator import WorldGenerator
+
+
+class TestPartition(unittest.TestCase):
+    """
+    This tests that worlds are split into balanced shards with few exits between them.
+    """
+    def test_grid_shards_are_balanced_and_compact(self):
+        graph = WorldGenerator(1024).graph()
+        for shards in (2, 4, 8):
+            owner = partition(graph, shards)
+            self.assertEqual(set(owner), set(graph))
+            self.assertEqual(set(Counter(owner.values()).values()), {1024 // shards})
+            # close to cutting the 32 x 32 grid into stripes, where splitting it at random would cut half its exits
+            self.assertLessEqual(cut_edges(graph, owner), 48 * (shards - 1))
+
+    def test_stock_world(self):
+        world = WorldBuilder()
+        world.build()
+        graph = world.graph()
+        owner = partition(graph, 2)
+        self.assertEqual(sorted(Counter(owner.values()).values()), [5, 6])
+        self.assertLessEqual(cut_edges(graph, owner), 2)
+
+
+class TestShardedWorld(unittest.TestCase):
+    """
+    This tests that sessions are handed off between shard processes without losing their state.
+    """
+    def start(self, shards, owner=None):
+        world = ShardedWorld(WorldBuilder, shards, owner)
+        self.addCleanup(world.close)
+        return world
+
+    def test_handoff_keeps_player(self):
+        world = WorldBuilder()
+        world.build()
+        owner = {name: 0 for name in world.graph()}
+        owner["lost_cache"] = 1
+        sharded = self.start(2, owner)
+
+        session = sharded.join("ada")
+        room, logs = sharded.play(session, ["t", "1", "2", curses.KEY_UP])
+        self.assertEqual(room, "lost_cache")
+        self.assertEqual(logs, ["Moving north..."])  # the log shard 0 wrote before the handoff
+        self.assertEqual((sharded.location[session], sharded.handoffs), (1, 1))
+
+        room, _ = sharded.play(session, [curses.KEY_DOWN, curses.KEY_UP, curses.KEY_DOWN])
+        self.assertEqual((room, sharded.location[session], sharded.handoffs), ("boot_sector", 0, 4))
+
+        player = sharded.leave(session)
+        self.assertIn("health_module", player.storage)
+        self.assertIsNone(player.current_room)
+        self.assertNotIn(session, sharded.location)
+
+    def test_same_result_as_one_process(self):
+        keys = [curses.KEY_UP, "p", "0", curses.KEY_DOWN, curses.KEY_DOWN, curses.KEY_UP, "t", "1", "2"]
+        results = []
+        for shards in (1, 3):
+            sharded = self.start(shards)
+            sessions = [sharded.join(name) for name in ("ada", "bob")]
+            rooms = sharded.step({session: keys for session in sessions})
+            players = [sharded.leave(session) for session in sessions]
+            results.append(([rooms[session][0] for session in sessions],
+                            [sorted(player.storage) for player in players]))
+        self.assertEqual(results[0], results[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
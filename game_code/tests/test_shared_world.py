@@ -0,0 +1,99 @@
+import threading
+import unittest
+
+from game_code.systems.shared_world import SharedWorld
+
+
+class TestSharedWorld(unittest.TestCase):
+    """
+    This tests that players sharing a world resolve conflicts the same way whatever order they act in.
+    """
+    def race(self, seed, order, action, arg, setup=None):
+        world = SharedWorld(seed=seed)
+        players = [world.join(name) for name in ("ada", "bob", "cy")]
+        if setup:
+            setup(world, players)
+        for i in order:
+            world.submit(*players[i], action, arg)
+        return world, players, world.tick()
+
+    def test_same_item_has_one_deterministic_winner(self):
+        for seed in range(5):
+            winners = set()
+            for order in ((0, 1, 2), (2, 1, 0), (1, 2, 0)):
+                world, players, events = self.race(seed, order, "take", "health_module")
+                taken = [event.player for event in events if event.result == "taken"]
+                self.assertEqual(len(taken), 1)
+                self.assertEqual(sorted(event.result for event in events), ["gone", "gone", "taken"])
+                winners.add(taken[0])
+            self.assertEqual(len(winners), 1)  # arrival order doesn't matter
+
+    def test_take_from_the_resolved_room(self):
+        world = SharedWorld()
+        player_id, ada = world.join("ada")
+        for direction in ("north", "south"):  # back into the boot sector through a relocation
+            world.submit(player_id, ada, "move", direction)
+            world.tick()
+        self.assertEqual(world.players_in(ada.current_room), ["ada"])
+        world.submit(player_id, ada, "take", "health_module")
+        self.assertEqual(world.tick()[0].result, "taken")
+        self.assertIn("health_module", ada.storage)
+        self.assertNotIn("health_module", world.shared(ada.current_room).room.items)
+
+    def test_actions_queued_in_a_room_left(self):
+        world = SharedWorld()
+        player_id, ada = world.join("ada")
+        world.submit(player_id, ada, "take", "health_module")
+        world.relocate(player_id, ada, world.start_room.get_exit("north"))  # as if a tick moved them meanwhile
+        self.assertEqual(world.tick()[0].result, "left")
+        self.assertNotIn("health_module", ada.storage)
+        self.assertIn("health_module", world.start_room.items)
+
+    def test_killing_blow_is_deterministic(self):
+        def into_glitch_pit(world, players):
+            for player in players:
+                world.submit(*player, "move", "south")
+            world.tick()
+            monster = players[0][1].current_room.monsters["glitch_beast"]
+            monster.hp = 10  # any hit kills it
+
+        killers = set()
+        for order in ((0, 1, 2), (2, 0, 1)):
+            world, players, events = self.race(3, order, "attack", "glitch_beast", into_glitch_pit)
+            killed = [event for event in events if event.result == "killed"]
+            self.assertEqual(len(killed), 1)
+            killer = next(player for _, player in players if player.name == killed[0].player)
+            self.assertIn("data_key", killer.storage)
+            killers.add(killed[0].player)
+        self.assertEqual(len(killers), 1)
+
+    def test_players_see_each_other(self):
+        world = SharedWorld()
+        ada = world.join("ada")
+        world.join("bob")
+        world.submit(*ada, "move", "north")
+        world.tick()
+        self.assertEqual(world.players_in(ada[1].current_room), ["ada"])
+        self.assertEqual(world.players_in(world.start_room), ["bob"])
+
+    def test_concurrent_submits(self):
+        world = SharedWorld()
+        players = [world.join(f"p{i}") for i in range(32)]
+
+        def act(chunk):
+            for player in chunk:
+                world.submit(*player, "move", "north" if player[0] % 2 else "south")
+
+        threads = [threading.Thread(target=act, args=(players[i::4],)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        events = world.tick()
+        self.assertEqual(len(events), 32)
+        self.assertEqual(len(world.players_in(world.world.rooms["a1"])), 16)
+        self.assertEqual(len(world.players_in(world.world.rooms["b0"])), 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
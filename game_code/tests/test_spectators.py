@@ -0,0 +1,122 @@
+import socket
+import threading
+import unittest
+
+from game_code.entities.characters.player import Player
+from game_code.entities.room import Room
+from game_code.game import Game
+from game_code.systems.remote_ui import RemoteUI
+from game_code.systems.spectators import SpectatorHub
+from game_code.tests.test_remote_ui import Terminal
+
+
+class TestSpectators(unittest.TestCase):
+    """
+    This tests that viewers are sent each frame once encoded, and that viewers who fall behind are resynced.
+    """
+    def setUp(self):
+        self.ui = RemoteUI(lambda data: None, height=20, width=60)
+        self.ui.toggle_typing(False)
+        self.ui.start_screen()
+        self.hub = SpectatorHub(self.ui.screen, limit=2048)
+        self.player = Player(*Game.PLAYER)
+        self.pairs = []
+
+    def tearDown(self):
+        self.hub.close()
+        for _, client in self.pairs:
+            client.close()
+
+    def viewer(self):
+        server, client = socket.socketpair()
+        self.pairs.append((self.hub.add(server), client))
+        return self.pairs[-1]
+
+    def play(self, rounds):
+        for i in range(rounds):
+            self.ui.redraw_game(Room(f"room_{i}", f"ROOM {i}\n" + "~" * (i % 40)), self.player)
+            self.player.hp -= 1
+            self.ui.draw_hud(self.player)
+            self.ui.display_text(f"Line {i}")
+            self.ui.get_key()  # sends the frame
+
+    def read(self, pair):
+        spectator, client = pair
+        client.setblocking(False)
+        data = b""
+        while True:
+            self.hub.pump()
+            try:
+                chunk = client.recv(65536)
+            except BlockingIOError:
+                if not spectator.queue:
+                    return data
+                continue
+            data += chunk
+
+    def shown(self, data):
+        terminal = Terminal(20, 60)
+        terminal.feed(data.decode("utf-8"))
+        return terminal.lines()
+
+    def test_viewers_see_the_session(self):
+        first = self.viewer()
+        self.play(3)
+        late = self.viewer()  # starts from a keyframe
+        self.play(3)
+        for pair in (first, late):
+            self.assertEqual(self.shown(self.read(pair)), self.ui.screen.shadow)
+
+    def test_viewer_joining_during_a_frame(self):
+        sending, release = threading.Event(), threading.Event()
+
+        class Stall:
+            def publish(self, frame):
+                sending.set()
+                release.wait(5)
+
+        self.ui.screen.listeners.insert(0, Stall())  # holds the game's thread after the shadow is updated
+        game = threading.Thread(target=self.play, args=(1,))
+        game.start()
+        self.assertTrue(sending.wait(5))
+        pairs = []
+        joining = threading.Thread(target=lambda: pairs.append(self.viewer()))
+        joining.start()
+        joining.join(0.2)
+        self.assertTrue(joining.is_alive())  # the server's thread waits for the frame to be sent
+        release.set()
+        game.join()
+        joining.join()
+        self.ui.screen.listeners.pop(0)
+        self.play(2)
+        self.assertEqual(self.shown(self.read(pairs[0])), self.ui.screen.shadow)
+
+    def test_slow_viewer_is_resynced(self):
+        slow = self.viewer()
+        slow[0].sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1024)
+        fast = self.viewer()
+        for _ in range(30):
+            self.play(5)
+            self.read(fast)  # only the fast viewer reads
+            self.assertLessEqual(slow[0].pending, self.hub.limit)
+        self.assertGreater(slow[0].resyncs, 0)
+        self.assertEqual(fast[0].resyncs, 0)
+        self.assertEqual(self.shown(self.read(slow)), self.ui.screen.shadow)
+
+    def test_frames_are_shared(self):
+        viewers = [self.viewer()[0] for _ in range(50)]
+        for spectator in viewers:
+            spectator.queue.clear()  # as if the keyframes were sent
+        frame = b"\x1b[1;1Hshared"
+        self.hub.publish(frame)
+        self.assertFalse(any(spectator.queue for spectator in viewers))  # all sent straight away
+        for _, client in self.pairs:
+            self.assertTrue(client.recv(65536).endswith(frame))
+
+        viewers[0].sock.close()
+        self.hub.publish(frame)  # the closed viewer is dropped
+        self.assertEqual(len(self.hub.spectators), 49)
+
+
+if __name__ == "__main__":
+    unittest.main()
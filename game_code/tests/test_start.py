@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from game_code.start import Loader
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.world.world_builder import WorldBuilder
+
+
+class TestStart(unittest.TestCase):
+    """
+    This tests that start.py loads the game in the background and doesn't show the intro twice.
+    """
+    def test_loaded_game_skips_intro_and_build(self):
+        ui = HeadlessUI()
+        with tempfile.TemporaryDirectory() as folder:
+            loader = Loader(ui, save_path=os.path.join(folder, "save.bin"))
+            loader.start()
+            game = loader.result()
+            self.assertIs(game.ui, ui)
+            self.assertFalse(game.intro)
+
+            with mock.patch.object(ui, "print_welcome") as welcomed, \
+                    mock.patch.object(WorldBuilder, "build") as built:
+                game.initialise_game()
+            welcomed.assert_not_called()
+            built.assert_not_called()
+            self.assertEqual(game.player.current_room.name, "boot_sector")
+            self.assertEqual(game.state_hash.value, game.state_hash.compute(game.player, game.world))
+
+    def test_errors_reach_the_waiting_thread(self):
+        with mock.patch("game_code.game.Game.build_world", side_effect=OSError("no pack")):
+            loader = Loader(HeadlessUI())
+            loader.start()
+            with self.assertRaises(OSError):
+                loader.result()
+
+
+if __name__ == "__main__":
+    unittest.main()
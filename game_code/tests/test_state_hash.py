@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from game_code.ai.labyrinth_env import LabyrinthEnv
+from game_code.systems.state_hash import StateHash
+
+
+class TestStateHash(unittest.TestCase):
+    """
+    This tests that the tracked hash always matches a hash computed from scratch.
+    """
+    def setUp(self):
+        self.env = LabyrinthEnv()
+        self.env.reset(seed=0)
+
+    def action(self, kind, arg=None):
+        return self.env.actions.index((kind, arg))
+
+    def check(self, env):
+        game = env.game
+        self.assertEqual(game.state_hash.value, game.state_hash.compute(game.player, game.world))
+
+    def test_random_play_with_forks(self):
+        rng = random.Random(0)
+        envs = [self.env]
+        for _ in range(300):
+            env = rng.choice(envs)
+            if rng.random() < 0.1:
+                envs.append(env.fork())
+            env.step(int(rng.choice(env.action_mask().nonzero()[0])))
+            if env.game.player.is_alive():
+                self.check(env)
+
+    def test_same_state_same_hash(self):
+        other = self.env.fork()
+        self.assertEqual(self.env.game.state_hash.value, other.game.state_hash.value)
+
+        self.env.step(self.action("take", 0))
+        self.env.step(self.action("take", 0))
+        other.step(self.action("take", 1))
+        other.step(self.action("take", 0))
+
+        # both hold the same items, picked up in a different order
+        self.assertEqual(self.env.game.state_hash.value, other.game.state_hash.value)
+        game = self.env.game
+        self.assertEqual(game.state_hash.canonical(game.player, game.world),
+                         other.game.state_hash.canonical(other.game.player, other.game.world))
+
+    def test_change_changes_hash(self):
+        before = self.env.game.state_hash.value
+        self.env.game.player.hp -= 1
+        self.assertNotEqual(self.env.game.state_hash.value, before)
+        self.env.game.player.hp += 1
+        self.assertEqual(self.env.game.state_hash.value, before)
+
+    def test_128_bits(self):
+        game = self.env.game
+        state_hash = StateHash(bits=128)
+        state_hash.track(game.player, game.world)
+        self.env.step(self.action("move", "north"))
+        self.assertEqual(state_hash.value, state_hash.compute(game.player, game.world))
+        self.assertGreater(state_hash.value.bit_length(), 64)
@@ -0,0 +1,86 @@
+import random
+import unittest
+
+from game_code.game import Game
+from game_code.systems.headless_ui import HeadlessUI
+from game_code.world.world_generator import WorldGenerator
+
+
+class TestWorldGenerator(unittest.TestCase):
+    """
+    This tests that generated worlds only load the rooms that are used and unload unchanged ones, hash the same
+    whatever is loaded, and can be forked.
+    """
+    def setUp(self):
+        self.game = Game(ui=HeadlessUI())
+        self.world = self.game.world = WorldGenerator(1000000, seed=1, cache_size=8)
+        self.game.initialise_game()
+        self.player = self.game.player
+
+    def walk(self, steps, seed=0, game=None):
+        game = game or self.game
+        rng = random.Random(seed)
+        for _ in range(steps):
+            room = game.player.current_room
+            game.player.current_room = game.world.resolve(room.exits[rng.choice(sorted(room.exits))])
+
+    def test_build_is_lazy(self):
+        self.assertLess(len(self.world.rooms), 10)  # the start room and the stubs of its neighbours
+        self.assertEqual(len(self.world.loaded), 1)
+
+    def test_unchanged_rooms_are_unloaded(self):
+        start = self.player.current_room
+        start.kernel_unlock = True
+        self.walk(200)
+        self.assertLessEqual(len(self.world.loaded), 9)
+        self.assertIn(0, self.world.kept)  # changed, so it isn't unloaded
+        self.assertFalse(start.is_stub())
+        self.assertEqual(self.game.state_hash.value, self.game.state_hash.compute(self.player, self.world))
+
+    def test_hash_does_not_depend_on_loaded_rooms(self):
+        game = Game(ui=HeadlessUI())
+        game.world = WorldGenerator(1000000, seed=1, cache_size=1000)
+        game.initialise_game()
+        self.player.current_room.kernel_unlock = True
+        game.player.current_room.kernel_unlock = True
+        self.walk(200)
+        self.walk(50, seed=1, game=game)
+        for each in (self.game, game):
+            each.player.current_room = each.world.resolve(each.world.lookup("sector_0"))
+        self.assertGreater(len(game.world.loaded), len(self.world.loaded))
+        self.assertEqual(self.game.state_hash.value, game.state_hash.value)
+        self.assertEqual(game.state_hash.value, game.state_hash.compute(game.player, game.world))
+
+    def test_fork(self):
+        self.walk(20)
+        self.player.current_room.kernel_unlock = True
+        fork = self.game.fork()
+        self.assertEqual(fork.state_hash.value, self.game.state_hash.value)
+        room = fork.player.current_room
+        self.assertIsNot(room, self.player.current_room)
+        room.kernel_unlock = False
+        self.walk(100, seed=1, game=fork)  # drops the fork's unchanged copies, keeping the changed one
+        self.assertLessEqual(len(fork.world.own), 9)
+        fork.player.current_room = fork.world.resolve(fork.world.lookup(room.name))
+
+        self.assertTrue(self.player.current_room.kernel_unlock)
+        self.assertIs(self.world.lookup(room.name), self.player.current_room)
+        self.assertIs(fork.world.lookup(room.name), room)
+        for game in (self.game, fork):
+            self.assertEqual(game.state_hash.value, game.state_hash.compute(game.player, game.world))
+        self.assertNotEqual(fork.state_hash.value, self.game.state_hash.value)
+
+    def test_reloaded_room_is_the_same(self):
+        world = WorldGenerator(1000, seed=2)
+        world.build()
+        room = world.room(5)
+        items = sorted(room.items)
+        monsters = sorted(room.monsters)
+        room.unload()
+        self.assertTrue(room.is_stub())
+        self.assertEqual(sorted(room.items), items)
+        self.assertEqual(sorted(room.monsters), monsters)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,16 +6,29 @@ from game_code.entities.items.upgrade import Upgrade
 from game_code.entities.items.weapon import Weapon
 from game_code.entities.puzzle import Puzzle
 from game_code.entities.room import Room
+from game_code.systems.asset_pack import asset
+from game_code.systems.loot_table import LootTable
 
 
 class WorldBuilder:
     """
     Responsible for building every room, item, monster, puzzle in the game; as well as their connections.
+    Their text lives in assets/world.txt and is referenced by asset id.
+    A built world can be forked, after which rooms are shared between the forks and copied the first time
+    a fork needs to change them (copy-on-write).
     """
+    MAX_LAYERS = 8  # forks deeper than this merge their shared layers
 
     def __init__(self):
         self.rooms = {}
 
+        # copy-on-write state, only used once the world has been forked
+        self.base = None  # rooms by name as they were built
+        self.layers = ()  # rooms copied by ancestor forks (newest first), these are never changed again
+        self.own = {}  # rooms this world has copied and may change
+        self.state_hash = None  # the StateHash that rooms copied by this world report to
+        self.names = None  # rooms by name before the world is forked, built on first lookup
+
     def build(self):
         """
         Creates all rooms, connects them with exits,
@@ -24,198 +37,27 @@ class WorldBuilder:
         """
 
         # build rooms
-        a0 = Room(
-            "boot_sector",
-            """
-            
-| BOOT SECTOR |
-
-System booting...
-[ Initialising user shell ]
-[ Loading visual layer    ]
-[ Syncing input streams   ]
-    
-A plain-looking room forms around you, like the world is still loading.
- Bits of code fall from the ceiling. Something small glints on the floor.
-
-Exits: NORTH -> Lost Cache, SOUTH -> Glitch Pit
-            """
-        )
+        a0 = Room("boot_sector", asset("room/boot_sector"))
 
-        a1 = Room(
-            "lost_cache",
-            """
-            
-| LOST CACHE |
-
-< Rebuilding item data ... 12% >
-< Warning: corrupted fragment >
-        
-Piles of old memory blocks are stacked everywhere. 
-Some flicker, some don't load at all. A small terminal hums quietly. 
-Something useful might be buried here.
-
-Exits: SOUTH -> Boot Sector
-            """
-        )
+        a1 = Room("lost_cache", asset("room/lost_cache"))
 
-        b0 = Room(
-            "glitch_pit",
-            """
-            
-| GLITCH PIT |
-                                    
-..+....>:>:..///...;;....;_///..<
-||.,,,;....;_///..<---------------
-                            
-!! Terrain error: mesh failed to load !!
-A twitching, half-rendered monster notices you.
-                          
-The ground seems unreliable here. Tiles appear late, and some just 
-blink in and out of existence. This area feels dangerous.
-
-Exits: NORTH -> Boot Sector, EAST -> Data Well, WEST -> Dead Pixels
-            """
-        )
+        b0 = Room("glitch_pit", asset("room/glitch_pit"))
 
-        b1 = Room(
-            "data_well",
-            """
-            
-| DATA WELL |
-        
-010101... 011001... 010110...
-A terminal nearby flashes: "LOG AVAILABLE"
-                        
-A column of falling numbers spills from the ceiling like a waterfall.
-Binary streams flow along the floor. 
-A puzzle seems to be woven into the data flow itself.
-
-Exits: WEST -> Glitch Pit, SOUTH -> Corrupted Arsenal
-            """
-        )
+        b1 = Room("data_well", asset("room/data_well"))
 
-        b2 = Room(
-            "corrupted_arsenal",
-            """
-            
-| CORRUPTED ARSENAL |
-    
-[ locked slot       ]
-[ missing texture   ]
-[ weapon_error_4F   ]
-           
-Rusty-looking digital weapon models float in the air, 
-but many fail to render correctly. A larger puzzle device sparks occasionally.
-Your backpack system activates when entering this place.
-
-Exits: NORTH -> Data Well, EAST -> Gatekeeper Node
-            """
-        )
+        b2 = Room("corrupted_arsenal", asset("room/corrupted_arsenal"))
 
-        b3 = Room(
-            "dead_pixels",
-            """
-            
-| DEAD PIXELS |
-                     
-            . . .     . # .   . . # # .    . # . .               
-            #   . # .   . .   # .   #     .    .               
-            .   # # .   .   # #     .      # . . .    
-                              
-The walls here have broken into scattered pixel noise.  
- Black and white squares flicker without a pattern.    
-        It feels like an unfinished part of the mysterious labyrinth.         
-                                                        
-Exits: EAST -> Glitch Pit                              
-            """
-        )
+        b3 = Room("dead_pixels", asset("room/dead_pixels"))
 
-        c0 = Room(
-            "phantom_node",
-            """
-            
-| PHANTOM NODE |
-
-You feel watched.
-A strange object hovers silently.
-    
-This room shouldn't exist...  
-Its walls are only half-there, fading in and out like a memory.
-    
-A doorway flickers in and out of existence, revealing a direct
-link to a powerful presence deeper in the system...
-
-Exits: SOUTH -> Gatekeeper Node, WEST -> Boot Sector
-            """,
-            locked=True
-        )
+        c0 = Room("phantom_node", asset("room/phantom_node"), locked=True)
 
-        c2 = Room(
-            "gatekeeper_node",
-            """
-            
-| GATEKEEPER NODE |
-
-The creature roars and the whole room shudders.
-                
-A massive corrupted guardian blocks the path ahead.
-It flickers between frames, unfinished and unstable.
-    
-This fight is unavoidable.
-
-Exits: WEST -> Corrupted Arsenal, EAST -> Fractured Archive
-            """
-        )
+        c2 = Room("gatekeeper_node", asset("room/gatekeeper_node"))
 
-        d0 = Room(
-            "fractured_archive",
-            """
-            
-| FRACTURED ARCHIVE |
-                                    
-[ log_04: missing timestamp ]
-[ memory chunk corrupted    ]
-                                    
-Broken bits of past events float around like ghosts.
-Some logs replay wrong. Others don't load at all.
-
-Exits: WEST -> Gatekeeper Node, NORTH -> Obsolete Hub
-            """
-        )
+        d0 = Room("fractured_archive", asset("room/fractured_archive"))
 
-        d1 = Room(
-            "obsolete_hub",
-            """
-            
-| OBSOLETE HUB |
-
-< deprecated_module >
-< legacy API called >
- < unsupported format >
-                                
-This room feels outdated. Old system functions lie everywhere,  
-half-functional and flickering.
-        
-A console sits in the centre, but it needs a decryption item.
-
-Exits: SOUTH -> Fractured Archive, NORTH -> System Kernel
-            """
-        )
+        d1 = Room("obsolete_hub", asset("room/obsolete_hub"))
 
-        d2 = Room(
-            "system_kernel",
-            """
-            
-| SYSTEM KERNEL |
-                                    
-Everything is suddenly calm.  
-The glitches are gone. The room is clean and bright.
-
-A door of pure white light waits for you.
-The path leads you back, back to the real world.
-            """
-        )
+        d2 = Room("system_kernel", asset("room/system_kernel"))
 
         self.rooms = {"a0": a0, "a1": a1, "b0": b0, "b1": b1, "b2": b2, "b3": b3,
                       "c0": c0, "c2": c2, "d0": d0, "d1": d1, "d2": d2
@@ -225,9 +67,114 @@ The path leads you back, back to the real world.
         self.place_items()
         self.place_puzzles()
         self.place_monsters()
+        self.place_loot()
 
         return a0
 
+    def fork(self):
+        """
+        Creates an independent world that shares every room with this one.
+        Both worlds stop changing the shared rooms, so each one copies a room the next time it is entered.
+        This takes time proportional to the rooms that were copied since the last fork, not to the world size.
+        :return: The forked world.
+        """
+        if self.base is None:
+            self.base = {room.name: room for room in self.rooms.values()}
+        self.share_own()
+
+        world = WorldBuilder()
+        world.rooms = self.rooms
+        world.base = self.base
+        world.layers = self.layers
+        return world
+
+    def share_own(self):
+        """
+        Turn the rooms this world has copied into a layer shared with its forks, which no world changes again.
+        :return: None
+        """
+        if self.own:
+            self.layers = (self.own,) + self.layers
+            self.own = {}
+
+        if len(self.layers) > self.MAX_LAYERS:
+            merged = {}
+            for layer in reversed(self.layers):
+                merged.update(layer)
+            self.layers = (merged,)
+
+    def new(self):
+        """
+        An unbuilt world like this one, e.g. to build the template of a new run from.
+        :return: The world.
+        """
+        return WorldBuilder()
+
+    def resolve(self, room):
+        """
+        Returns this world's version of a room that can be changed freely.
+        :param room: Any version of the room, such as one reached through an exit.
+        :return: The room owned by this world.
+        """
+        if self.base is None:
+            return room  # never forked, so every room belongs to this world
+
+        own = self.own.get(room.name)
+        if own is None:
+            own = self.lookup(room.name).copy()
+            self.own[room.name] = own
+            if self.state_hash is not None:
+                self.state_hash.adopt_room(own)
+        return own
+
+    def lookup(self, name):
+        """
+        Find the latest version of a room without copying it.
+        :param name: The name of the room.
+        :return: The room, which must not be changed unless it is owned by this world.
+        """
+        if self.base is None:
+            if self.names is None or len(self.names) != len(self.rooms):
+                self.names = {room.name: room for room in self.rooms.values()}
+            return self.names[name]
+        room = self.own.get(name)
+        if room is not None:
+            return room
+        for layer in self.layers:
+            room = layer.get(name)
+            if room is not None:
+                return room
+        return self.base[name]
+
+    def current_rooms(self):
+        """
+        The latest version of every room, which must not be changed unless resolved first.
+        :return: Iterable of rooms.
+        """
+        if self.base is None:
+            return self.rooms.values()
+        return (self.lookup(name) for name in self.base)
+
+    def baseline(self, room):
+        """
+        The room as it was built, which its state is hashed against (see StateHash.features).
+        :return: None, since every room of a built world is hashed in full.
+        """
+        return None
+
+    def graph(self):
+        """
+        The room graph with exits treated as two-way, used to split the world into shards.
+        :return: Dictionary of room name to the set of names of the rooms next to it.
+        """
+        rooms = list(self.current_rooms())
+        graph = {room.name: set() for room in rooms}
+        for room in rooms:
+            for next_room in room.exits.values():
+                graph[room.name].add(next_room.name)
+                graph[next_room.name].add(room.name)
+        return graph
+
     def link_rooms(self):
         """
         Creates directional exits between rooms.
@@ -288,14 +235,13 @@ The path leads you back, back to the real world.
         # boot sector
         fragmented_blade = Weapon(
             "fragmented_blade",
-            "A weak blade formed from unstable data shards.",
+            asset("item/fragmented_blade"),
             damage=150,
             weight=24
         )
         health_module = Med(
             "health_module",
-            "A compact utility that repairs corrupted user data. "
-            "\nActivating it restores a portion of your health.",
+            asset("item/health_module"),
             weight=7,
             heal=200,
             uses=3,
@@ -308,46 +254,24 @@ The path leads you back, back to the real world.
         # dead pixels
         first_corruption = Lore(
             "first_corruption.log",
-            "A corrupted monster's log containing forgotten memories.",
+            asset("item/first_corruption.log"),
             weight=4,
-            content="""Memory Fragment Recovered: The First Corruption
-
-Corruption log: Severity Red.
-
-An unknown signal entered the simulation.
-A user connection was forcibly hijacked.
-Subsystems responded by sealing pathways and
-creating defensive entities to contain the breach.
-
-The system was trying to protect you…
-or protect itself from you.
-            """
+            content=asset("lore/first_corruption.log")
         )
         self.rooms["b3"].add_item(first_corruption)
 
         # data well
         scan_module = Upgrade(
             "scan_module",
-            "Allows you to read corrupted logs and system terminals.",
+            asset("item/scan_module"),
             weight=8,
             upgrade_type="scan"
         )
         data_chip = Lore(
             "data_chip.log",
-            "A broken memory chip containing a fragment of origins.",
+            asset("item/data_chip.log"),
             weight=4,
-            content="""Memory Fragment Recovered: The Fall of the System
-
-Users once navigated freely here.
-This labyrinth was never meant to imprison —
-it was a learning environment,
-a controlled simulation for exploring unstable data structures.
-
-Then something changed.
-The system kernel fractured,
-and the world began rewriting itself without supervision.
-            """
-
+            content=asset("lore/data_chip.log")
         )
         self.rooms["b1"].add_item(scan_module)
         self.rooms["b1"].add_item(data_chip)
@@ -355,7 +279,7 @@ and the world began rewriting itself without supervision.
         # corrupted arsenal
         backpack_upgrade = Upgrade(
             "storage_expansion",
-            "Upgrades your inventory capacity using adaptive memory compression.",
+            asset("item/storage_expansion"),
             weight=8,
             upgrade_type="storage"
         )
@@ -365,7 +289,7 @@ and the world began rewriting itself without supervision.
         # fractured archive
         decrypter = Key(
             "decrypter",
-            "Required to operate the final console in the Obsolete Hub.",
+            asset("item/decrypter"),
             weight=8,
             key_id="decrypt"
         )
@@ -379,11 +303,11 @@ and the world began rewriting itself without supervision.
         # lost cache
         puzzle_a1 = Puzzle(
             name="reconstruction",
-            prompt="Reconstruct the missing byte: 101_01 → what number completes the sequence?",
+            prompt=asset("puzzle/reconstruction"),
             solution="0",
             reward=Key(
                 "phantom_key",
-                "A strange shard that faints in and out of existence.",
+                asset("item/phantom_key"),
                 weight=4,
                 key_id="unlock_c0"
             )
@@ -393,11 +317,11 @@ and the world began rewriting itself without supervision.
         # data well
         puzzle_b1 = Puzzle(
             name="binary_code",
-            prompt="Decode the binary sequence: 0100 0001 = ? (ASCII)",
+            prompt=asset("puzzle/binary_code"),
             solution="A",
             reward=Weapon(
                 name="debugging_lance",
-                description="A long digital spear forged from stabilised error logs.\nIt hums with corrective energy.",
+                description=asset("item/debugging_lance"),
                 weight=32,
                 damage=300
             )  # reward is a weapon that defeats data_wraith
@@ -407,11 +331,11 @@ and the world began rewriting itself without supervision.
         # corrupted arsenal
         puzzle_b2 = Puzzle(
             name="kernel_repair",
-            prompt="Repair the corrupted kernel header: K_RN_L → fill the missing letters.",
+            prompt=asset("puzzle/kernel_repair"),
             solution="KERNEL",  # accepting "KERNEL" in game logic is easy too
             reward=Med(
                 name="health_container",
-                description="A large utility that immensely repairs corrupted user data. Activating it restores a large portion of your health.",
+                description=asset("item/health_container"),
                 heal=500,
                 weight=8,
                 uses=4,
@@ -423,10 +347,10 @@ and the world began rewriting itself without supervision.
         # phantom node
         puzzle_c0 = Puzzle(
             name="faded_data",
-            prompt="A whisper: 'What remains when memory fades?'",
+            prompt=asset("puzzle/faded_data"),
             solution="echo",
             reward=Med("health_package",
-                       "An extremely large utility that repairs all corruption.\nActivating it restores health to maximum.",
+                       asset("item/health_package"),
                        heal=-1,
                        weight=12,
                        uses=5,
@@ -438,23 +362,13 @@ and the world began rewriting itself without supervision.
         # obsolete hub
         puzzle_d1 = Puzzle(
             name="kernel_bypass",
-            prompt="Enter the decryption key: XOR(7, 12) = ?",
+            prompt=asset("puzzle/kernel_bypass"),
             solution="11",
             reward=Lore(
                 "fractured.log",
-                "A corrupted log showing pieces of the system's history.",
+                asset("item/fractured.log"),
                 weight=4,
-                content="""Memory Fragment Recovered: The Truth
-
-The labyrinth was not corrupted by accident.
-Someone rewrote the rules.
-Someone wanted you trapped.
-
-And the Gatekeeper…
-was created from your own user profile.
-
-It was built to keep you from remembering why.
-                """
+                content=asset("lore/fractured.log")
             )  # unlocks passage to System Kernel
         )
         self.rooms["d1"].puzzle = puzzle_d1
@@ -467,13 +381,13 @@ It was built to keep you from remembering why.
         # glitch pit
         glitch_beast = Monster(
             name="glitch_beast",
-            description="A twitching creature made of broken meshes and flickering polygons.",
+            description=asset("monster/glitch_beast"),
             hp=450,
             max_hp=450,
             attack_power=150,
             reward=Key(
                 "data_key",
-                "A glowing access shard designed to unlock the Data Well gateway.",
+                asset("item/data_key"),
                 weight=8,
                 key_id="4rch1ve"
             ),
@@ -484,13 +398,13 @@ It was built to keep you from remembering why.
         # data well
         data_wraith = Monster(
             name="data_wraith",
-            description="A humanoid shape made of streaming binary. Its form shifts unpredictably.",
+            description=asset("monster/data_wraith"),
             hp=650,
             max_hp=650,
             attack_power=160,
             reward=Upgrade(
                 "integrity_recompiler",
-                description="An ancient subsystem tool once used by the system administrators. It rewrites part of your core, patching deep corruption and increases your maximum health.",
+                description=asset("item/integrity_recompiler"),
                 weight=16,
                 upgrade_type="health"
             ),
@@ -501,13 +415,13 @@ It was built to keep you from remembering why.
         # corrupted arsenal
         corrupted_drone = Monster(
             name="corrupted_drone",
-            description="A floating defense unit, its casing fractured and emitting sparks.",
+            description=asset("monster/corrupted_drone"),
             hp=700,
             max_hp=700,
             attack_power=300,
             reward=Weapon(
                 "kernels_edge",
-                "A powerful blade formed from unstable data.",
+                asset("item/kernels_edge"),
                 damage=800,
                 weight=64
             ),
@@ -518,11 +432,11 @@ It was built to keep you from remembering why.
         # phantom node
         echo_shade = Monster(
             name="echo_shade",
-            description="A faint silhouette, like a shadow of code that never fully loads.",
+            description=asset("monster/echo_shade"),
             hp=800,
             max_hp=800,
             attack_power=200,
-            reward=Weapon("code_breaker", "A powerful system weapon designed to destroy all data.", weight=32,
+            reward=Weapon("code_breaker", asset("item/code_breaker"), weight=32,
                           damage=1500),
             blocks_exit="south"
         )
@@ -531,13 +445,11 @@ It was built to keep you from remembering why.
         # gatekeeper node
         gatekeeper = Monster(
             name="gatekeeper",
-            description=(
-                "A massive corrupted guardian flickering between frames. It guards the kernel path."
-            ),
+            description=asset("monster/gatekeeper"),
             hp=1500,
             max_hp=1500,
             attack_power=500,
-            reward=Key("kernel_key", "A critical system key dropped by the Gatekeeper.", weight=16, key_id="k3rn3l"),
+            reward=Key("kernel_key", asset("item/kernel_key"), weight=16, key_id="k3rn3l"),
             blocks_exit="east"
         )
         self.rooms["c2"].add_monster(gatekeeper)
@@ -545,26 +457,52 @@ It was built to keep you from remembering why.
         # fractured archive
         memory_phantom = Monster(
             name="memory_phantom",
-            description="A ghost formed from corrupted logs and broken memories.",
+            description=asset("monster/memory_phantom"),
             hp=700,
             max_hp=700,
             attack_power=350,
             reward=Lore("origin_gatekeeper.log",
-                        "A corrupted log revealing the origins of the gatekeeper.",
+                        asset("item/origin_gatekeeper.log"),
                         weight=4,
-                        content="""Memory Fragment Recovered: Origin of the Gatekeeper
-
-Architect Note:
-If the kernel is ever compromised,
-an autonomous guardian will be instantiated.
-
-It will not understand trust.
-It will not negotiate.
-
-It will defend the kernel until the system resets…
-or until it is destroyed.
-                        """
+                        content=asset("lore/origin_gatekeeper.log")
                         ),
             blocks_exit="north"
         )
         self.rooms["d0"].add_monster(memory_phantom)
+
+        # obsolete hub, patrolling down to the fractured archive and back
+        stray_process = Monster(
+            name="stray_process",
+            description=asset("monster/stray_process"),
+            hp=400,
+            max_hp=400,
+            attack_power=120,
+            reward=None,
+            behaviour="patrol",
+            route=("south", "north"),
+            period=2
+        )
+        self.rooms["d1"].add_monster(stray_process)
+
+    def place_loot(self):
+        """
+        Give every monster and puzzle a drop table rolled on top of its fixed reward.
+        :return: None
+        """
+        stim_patch = Med("stim_patch", asset("item/stim_patch"), weight=3, heal=100, uses=1, max_uses=1)
+        cache_fragment = Lore(
+            "cache_fragment.log",
+            asset("item/cache_fragment.log"),
+            weight=4,
+            content=asset("lore/cache_fragment.log")
+        )
+        overflow_saber = Weapon("overflow_saber", asset("item/overflow_saber"), weight=40, damage=1000)
+
+        # nothing drops most of the time and the saber is rare
+        monster_loot = LootTable([(50, None), (25, stim_patch), (20, cache_fragment), (5, overflow_saber)])
+        puzzle_loot = LootTable([(60, None), (30, stim_patch), (10, cache_fragment)])
+        for room in self.rooms.values():
+            for monster in room.monsters.values():
+                monster.loot = monster_loot
+            if room.puzzle:
+                room.puzzle.loot = puzzle_loot
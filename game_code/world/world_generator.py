@@ -0,0 +1,289 @@
+import math
+import random
+from collections import OrderedDict
+
+from game_code.entities.characters.monster import Monster
+from game_code.entities.items.key import Key
+from game_code.entities.items.lore import Lore
+from game_code.entities.items.med import Med
+from game_code.entities.items.weapon import Weapon
+from game_code.entities.puzzle import Puzzle
+from game_code.entities.room import Room
+from game_code.systems.loot_table import LootTable
+from game_code.systems.state_hash import StateHash
+from game_code.world.world_builder import WorldBuilder
+
+
+class WorldGenerator(WorldBuilder):
+    """
+    Builds large grid-shaped worlds from a seed, used for testing and benchmarking at scale.
+    The same size and seed always build the same world.
+
+    Rooms are created as stubs and only get their description, exits, items, monsters and puzzle the first
+    time they are used, so building costs the same for any size. Each room is generated from its own seed,
+    which lets the least recently entered rooms be unloaded back to stubs (keeping at most CACHE_SIZE loaded)
+    as long as they are the same as when they were generated. Startup time and memory depend on the rooms visited.
+    Rooms are hashed by how they differ from how they were generated, so unloading a room doesn't change the hash.
+
+    Forks share the rooms generated so far, see fork.
+    """
+    ITEM_CHANCE = 0.3
+    MONSTER_CHANCE = 0.1
+    PUZZLE_CHANCE = 0.05
+    LOCK_CHANCE = 0.02
+    CACHE_SIZE = 256  # loaded rooms kept before unchanged ones are unloaded
+
+    def __init__(self, size=1000, seed=0, cache_size=CACHE_SIZE):
+        super().__init__()
+        self.size = size
+        self.seed = seed
+        self.width = max(1, math.isqrt(size - 1) + 1)
+        self.cache_size = cache_size
+        self.loaded = OrderedDict()  # loaded rooms by index, least recently entered first
+        self.kept = {}  # loaded rooms that changed, which are checked again once they are entered
+        self.loot = LootTable([
+            (60, None),
+            (20, Med("stim_patch", "A single-use patch that mends a little corruption.",
+                     weight=3, heal=100, uses=1, max_uses=1)),
+            (10, Med("health_module", "A compact utility that repairs corrupted user data.",
+                     weight=7, heal=200, uses=3, max_uses=3)),
+            (8, Lore("stray_cache.log", "A scrap of a log.", weight=4,
+                     content="Memory fragment: the labyrinth keeps rewriting itself.")),
+            (2, Weapon("overflow_saber", "A blade that spills past its own bounds.", weight=40, damage=1000)),
+        ])  # shared by every generated monster and puzzle
+
+    def build(self):
+        """
+        Creates the starting room; every other room is created when an exit leads to it.
+        :return: The starting room.
+        """
+        self.rooms = {}
+        self.loaded.clear()
+        self.kept.clear()
+        return self.room(0)
+
+    def fork(self):
+        """
+        Creates an independent world that shares every room with this one, like WorldBuilder.fork. On the first
+        fork the rooms generated so far, changed or not, are handed to a base world that only loads and unloads
+        them. From then on each world copies a room when it enters it, and when the room is unloaded drops the copy
+        if it is the same as the room it was copied from, so a fork keeps at most cache_size copies it hasn't changed.
+        :return: The forked world.
+        """
+        if self.base is None:
+            self.base = WorldGenerator(self.size, self.seed, self.cache_size)
+            self.base.loot = self.loot
+            self.base.rooms, self.base.loaded, self.base.kept = self.rooms, self.loaded, self.kept
+            for room in self.rooms.values():
+                room.__dict__["loader"] = self.base  # stubs are loaded by the base from now on
+            self.loaded, self.kept = OrderedDict(), {}
+        self.share_own()
+        self.loaded.clear()  # its copies are shared now
+        self.kept.clear()
+
+        world = WorldGenerator(self.size, self.seed, self.cache_size)
+        world.loot = self.loot
+        world.rooms = self.rooms
+        world.base = self.base
+        world.layers = self.layers
+        return world
+
+    def new(self):
+        return WorldGenerator(self.size, self.seed, self.cache_size)
+
+    def room(self, i):
+        """
+        Returns room i, creating its stub if it doesn't exist yet.
+        :param i: The index of the room.
+        :return: The room.
+        """
+        if self.base is not None:
+            return self.base.room(i)
+        room = self.rooms.get(f"r{i}")
+        if room is None:
+            room = self.rooms[f"r{i}"] = Room.stub(f"sector_{i}", self)
+            room.__dict__["index"] = i
+        return room
+
+    def lookup(self, name):
+        prefix, _, index = name.rpartition("_")
+        if prefix != "sector" or not index.isdigit() or int(index) >= self.size:
+            raise KeyError(name)
+        if self.base is None:
+            return self.room(int(index))
+        room = self.own.get(name)
+        if room is None:
+            room = self.shared(name)
+        return room
+
+    def shared(self, name):
+        """
+        A forked world's latest version of a room that it hasn't copied, which other forks can see too.
+        :return: The room, which must not be changed.
+        """
+        for layer in self.layers:
+            room = layer.get(name)
+            if room is not None:
+                return room
+        return self.base.room(int(name.rpartition("_")[2]))
+
+    def current_rooms(self):
+        """
+        Every loaded room; stubs still hold their generated contents, so they are left out.
+        :return: Iterable of rooms.
+        """
+        if self.base is None:
+            return [*self.loaded.values(), *self.kept.values()]
+        names = dict.fromkeys(room.name for room in self.base.current_rooms())
+        for layer in self.layers:
+            names.update(dict.fromkeys(layer))
+        names.update(dict.fromkeys(self.own))
+        return [self.lookup(name) for name in names]
+
+    def resolve(self, room):
+        """
+        Called when the player enters a room, which marks it as recently used and unloads old rooms.
+        A forked world copies the room first, unless it has already.
+        :return: The room.
+        """
+        index = room.__dict__["index"]
+        if self.base is not None and room.name not in self.own:
+            shared = self.shared(room.name)
+            if shared is self.base.room(index):
+                shared = self.base.resolve(shared)  # loads the stub
+            room = self.own[room.name] = shared.copy()
+            if self.state_hash is not None:
+                self.state_hash.adopt_room(room)  # the same state as the room it replaces, so the hash stays
+            self.loaded[index] = room
+        elif self.base is not None:
+            room = self.own[room.name]
+            if index in self.kept:
+                self.loaded[index] = self.kept.pop(index)
+        elif room.is_stub():
+            self.materialize(room)
+        elif index in self.kept:
+            self.loaded[index] = self.kept.pop(index)
+        self.loaded.move_to_end(index)
+        self.evict()
+        return room
+
+    def materialize(self, room):
+        """
+        Generate a stub's contents, which are the same every time it is loaded.
+        :param room: The room stub.
+        :return: None
+        """
+        i = room.__dict__["index"]
+        self.generate(i, room)
+        self.loaded[i] = room
+        if self.state_hash is not None:
+            self.state_hash.adopt_room(room)
+
+    def generate(self, i, room):
+        Room.__init__(room, room.name, self.describe_room(i))
+        self.link_room(i, room)
+        self.place_room_contents(random.Random(self.seed * self.size + i), i, room)
+
+    def baseline(self, room):
+        """
+        A freshly generated copy of a room, which its state is hashed against.
+        :return: The room.
+        """
+        fresh = Room.stub(room.name, None)
+        self.generate(room.__dict__["index"], fresh)
+        return fresh
+
+    def unchanged(self, room, original=None):
+        """
+        Check a loaded room against the room it would be loaded as again.
+        :param original: The room it was copied from, if it is a forked world's copy; otherwise it is checked
+        against a freshly generated copy.
+        :return: True if unloading the room and loading it again gives the same state.
+        """
+        if original is None:
+            original = self.baseline(room)
+        if (room.description_updated, room.description) != (original.description_updated, original.description):
+            return False
+        state_hash = self.state_hash or StateHash()
+        return set(state_hash.room_features(room)) == set(state_hash.room_features(original))
+
+    def evict(self):
+        """
+        Unload the least recently entered rooms until at most cache_size are loaded.
+        Rooms that changed are kept aside instead, so each room is checked once per visit.
+        :return: None
+        """
+        while len(self.loaded) > self.cache_size:
+            i, room = self.loaded.popitem(last=False)
+            if self.base is not None:
+                if self.unchanged(room, self.shared(room.name)):
+                    del self.own[room.name]  # the room it was copied from is the same
+                else:
+                    self.kept[i] = room
+            elif self.unchanged(room):
+                room.unload()
+            else:
+                self.kept[i] = room
+
+    def describe_room(self, i):
+        return f"\n| SECTOR {i} |\n\nA generated block of the labyrinth, humming with stray data.\n"
+
+    def neighbours(self, i):
+        """
+        The grid neighbours of room i, worked out without loading it.
+        :return: Iterator of direction and room index.
+        """
+        steps = {"north": -self.width, "south": self.width, "west": -1, "east": 1}
+        for direction, step in steps.items():
+            j = i + step
+            if not 0 <= j < self.size:
+                continue
+            if direction in ("east", "west") and j // self.width != i // self.width:
+                continue  # don't wrap around the edge of the grid
+            yield direction, j
+
+    def link_room(self, i, room):
+        """
+        Connect a room to its grid neighbours.
+        :return: None
+        """
+        for direction, j in self.neighbours(i):
+            room.set_exit(direction, self.room(j))
+
+    def graph(self):
+        """
+        The room graph of the whole grid, built from indices so no room is loaded.
+        :return: Dictionary of room name to the set of names of the rooms next to it.
+        """
+        return {f"sector_{i}": {f"sector_{j}" for _, j in self.neighbours(i)} for i in range(self.size)}
+
+    def place_room_contents(self, rng, i, room):
+        """
+        Randomly place items, a monster, a puzzle and a lock in a room.
+        :return: None
+        """
+        if rng.random() < self.ITEM_CHANCE:
+            room.add_item(self.random_item(rng, i))
+        if i and rng.random() < self.MONSTER_CHANCE:
+            room.add_monster(Monster(
+                f"glitch_{i}", "A half-rendered creature.", hp=300, max_hp=300, attack_power=60,
+                reward=self.random_item(rng, i), blocks_exit=rng.choice(list(room.exits)), loot=self.loot
+            ))
+        if rng.random() < self.PUZZLE_CHANCE:
+            a, b = rng.randrange(16), rng.randrange(16)
+            room.puzzle = Puzzle(f"checksum_{i}", f"XOR({a}, {b}) = ?", str(a ^ b),
+                                 reward=self.random_item(rng, i), loot=self.loot)
+        if i and rng.random() < self.LOCK_CHANCE:
+            room.lock_exit(rng.choice(list(room.exits)), f"lock_{i}")
+            room.add_item(Key(f"key_{i}", "A generated access shard.", weight=2, key_id=f"lock_{i}"))
+
+    def random_item(self, rng, i):
+        kind = rng.randrange(3)
+        if kind == 0:
+            return Med("health_module", "A compact utility that repairs corrupted user data.",
+                       weight=7, heal=200, uses=3, max_uses=3)
+        if kind == 1:
+            return Weapon("fragmented_blade", "A weak blade formed from unstable data shards.",
+                          weight=24, damage=150)
+        return Lore(f"fragment_{i}.log", "A corrupted log.", weight=4,
+                    content=f"Memory fragment {i}: the labyrinth keeps rewriting itself.")